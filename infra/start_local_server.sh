@@ -13,6 +13,9 @@ fi
 cd $APP_NAME
 . ./requirements.txt
 pip install --no-cache-dir -r requirements.txt --root-user-action=ignore 
+if [ -f requirements-dev.txt ]; then
+  pip install --no-cache-dir -r requirements-dev.txt --root-user-action=ignore
+fi
 
 # ローカルサーバーを起動
 chalice local --host=0.0.0.0 --port=8000 --stage local
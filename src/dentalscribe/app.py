@@ -1,10 +1,9 @@
 from os import environ
 import json
 import logging
-from chalicelib.config import Config
 from chalicelib.service_container import ServiceContainer
 from chalicelib.utils.logger import setup_logging
-from chalicelib.constants import TRANSCRIPTION_DESTINATION_KEY_PREFIX, TRANSCRIBE_DESTINATION_FILENAME
+from chalicelib.constants import TRANSCRIPTION_SOURCE_KEY_PREFIX, TRANSCRIPTION_DESTINATION_KEY_PREFIX, TRANSCRIBE_DESTINATION_FILENAME
 from chalice import Chalice
 
 setup_logging()
@@ -33,12 +32,32 @@ def create_voice2soap_job():
 
 @app.route('/jobs/voice2soap/{job_id}', methods=['GET'], api_key_required=api_key_required)
 def get_voice2soap_job(job_id):
-    return ServiceContainer.get_job_service().get_voice2soap_job(job_id)
+    # 処理中に子ジョブの文字起こしテキストも取得する場合は include_transcripts=true を指定する
+    include_transcripts = (app.current_request.query_params or {}).get('include_transcripts', '').lower() == 'true'
+    return ServiceContainer.get_job_service().get_voice2soap_job(job_id, include_transcripts)
+
+@app.route('/jobs/voice2soap/{job_id}/events-token', methods=['GET'], api_key_required=api_key_required)
+def issue_voice2soap_job_events_token(job_id):
+    return ServiceContainer.get_job_event_service().issue_voice2soap_job_events_token(job_id)
+
+# EventSourceはAPIキーのヘッダーを送れないため、events-tokenで発行したトークン（クエリパラメータ）で認証する
+@app.route('/jobs/voice2soap/{job_id}/events', methods=['GET'])
+def get_voice2soap_job_events(job_id):
+    # EventSourceの再接続時はLast-Event-IDヘッダー、初回接続時はクエリパラメータで再開位置を受け取る
+    request = app.current_request
+    query_params = request.query_params or {}
+    last_event_id = request.headers.get('last-event-id') or query_params.get('last_event_id')
+    return ServiceContainer.get_job_event_service().get_voice2soap_job_events(job_id, query_params.get('token'), last_event_id)
 
 ######################
 # s3 event handlers  #
 ######################
 
+@app.on_s3_event(bucket=environ["S3_BUCKET"], events=["s3:ObjectCreated:*"], prefix=TRANSCRIPTION_SOURCE_KEY_PREFIX)
+def on_s3_transcription_source_object_created(event):
+    size = event.to_dict()["Records"][0]["s3"]["object"].get("size")
+    ServiceContainer.get_storage_service().confirm_upload(event.key, size=size)
+
 @app.on_s3_event(bucket=environ["S3_BUCKET"], events=["s3:ObjectCreated:*"], prefix=TRANSCRIPTION_DESTINATION_KEY_PREFIX, suffix=TRANSCRIBE_DESTINATION_FILENAME)
 def on_s3_transcribe_destination_object_created(event):
     ServiceContainer.get_job_service().complete_transcribe_job(event.key)
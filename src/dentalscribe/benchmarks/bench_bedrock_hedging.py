@@ -0,0 +1,120 @@
+"""
+Bedrock呼び出しのヘッジ・フェイルオーバーのベンチマーク（ローカルの偽の呼び出し先を使用）
+
+応答時間の分布が裾の重い偽の呼び出し先に対して、
+1つの呼び出し先のみ / ヘッジあり（2リージョン）/ 先頭がスロットリングする場合のフェイルオーバーを比較し、
+レイテンシーのパーセンタイルと、ヘッジで増えたリクエストの割合を表示する。
+
+実行方法（src/dentalscribe で実行）:
+    python -m benchmarks.bench_bedrock_hedging [--requests 400] [--slow-rate 0.02]
+"""
+import argparse
+import io
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List
+from botocore.exceptions import ClientError
+from chalicelib.clients.aws.bedrock_router import BedrockEndpoint, BedrockRouter
+
+
+class FakeBedrockRuntime:
+    """invoke_modelのみを持つ偽のbedrock-runtimeクライアント"""
+
+    def __init__(self, latency: Callable[[], float], throttle_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        with self._lock:
+            self.calls += 1
+            throttled = self._random.random() < self.throttle_rate
+        if throttled:
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Too many requests"},
+                 "ResponseMetadata": {"HTTPStatusCode": 429}},
+                "InvokeModel",
+            )
+        time.sleep(self.latency())
+        payload = {"content": [{"text": "{}"}], "usage": {"input_tokens": 1, "output_tokens": 1}}
+        return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+
+
+def tail_latency(base_seconds: float, slow_seconds: float, slow_rate: float, seed: int) -> Callable[[], float]:
+    """大半はbase_seconds前後、slow_rateの割合でslow_seconds前後かかる分布"""
+    generator = random.Random(seed)
+    lock = threading.Lock()
+
+    def sample() -> float:
+        with lock:
+            slow = generator.random() < slow_rate
+            jitter = generator.uniform(0.8, 1.2)
+        return (slow_seconds if slow else base_seconds) * jitter
+
+    return sample
+
+
+def run(router: BedrockRouter, clients: List[FakeBedrockRuntime], requests: int) -> None:
+    def invoke(endpoint: BedrockEndpoint) -> Dict:
+        response = endpoint.client.invoke_model(modelId=endpoint.model_id, body="{}")
+        return json.loads(response["body"].read())
+
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        router.invoke("invoke_model", invoke)
+        latencies.append(time.perf_counter() - started)
+
+    # 採用されなかったリクエストの完了を待ってから集計する
+    time.sleep(0.5)
+    quantiles = statistics.quantiles(latencies, n=100)
+    extra = sum(client.calls for client in clients) / requests - 1
+    print(
+        f"    p50 {quantiles[49] * 1000:7.1f} ms  p95 {quantiles[94] * 1000:7.1f} ms  "
+        f"p99 {quantiles[98] * 1000:7.1f} ms  max {max(latencies) * 1000:7.1f} ms  extra requests {extra:6.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="シナリオごとのリクエスト数")
+    parser.add_argument("--base-ms", type=float, default=20, help="通常の応答時間[ms]")
+    parser.add_argument("--slow-ms", type=float, default=400, help="遅い応答の応答時間[ms]")
+    parser.add_argument("--slow-rate", type=float, default=0.02, help="遅い応答の割合（ヘッジのパーセンタイル未満とする）")
+    args = parser.parse_args()
+
+    base, slow = args.base_ms / 1000, args.slow_ms / 1000
+    # フェイルオーバーのたびに出る警告は表示しない
+    logging.getLogger("chalicelib").setLevel(logging.ERROR)
+
+    def endpoint(region: str, seed: int, throttle_rate: float = 0.0) -> BedrockEndpoint:
+        client = FakeBedrockRuntime(tail_latency(base, slow, args.slow_rate, seed), throttle_rate, seed)
+        return BedrockEndpoint(region, "fake.model", client)
+
+    scenarios = {
+        "single endpoint, no hedging": lambda: [endpoint("ap-northeast-1", 1)],
+        "two regions, hedged at p95": lambda: [endpoint("ap-northeast-1", 1), endpoint("us-west-2", 2)],
+        "primary throttles 30%, failover": lambda: [endpoint("ap-northeast-1", 1, 0.3), endpoint("us-west-2", 2)],
+    }
+    for name, build in scenarios.items():
+        endpoints = build()
+        hedge_percentile = 0 if name.startswith("single") else 95
+        router = BedrockRouter(
+            endpoints,
+            hedge_percentile=hedge_percentile,
+            hedge_default_delay_seconds=slow,
+            # スロットリングした呼び出し先を後回しにせず、毎回フェイルオーバーを計測する
+            cooldown_seconds=0,
+        )
+        print(f"{name}:")
+        run(router, [endpoint.client for endpoint in endpoints], args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+DynamoDBモデル変換のマイクロベンチマーク
+
+従来の変換（asdict + 値ごとの型判定）と、モデルごとに生成するModelCodecを比較する。
+
+実行方法（src/dentalscribe で実行）:
+    python -m benchmarks.bench_codec [--number 20000]
+"""
+import argparse
+import json
+import timeit
+from dataclasses import asdict
+from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.models.codec import ModelCodec
+from chalicelib.models.job import Job
+
+
+def build_job() -> Job:
+    """親ジョブ相当（子ジョブ射影あり）のサンプル"""
+    child_jobs = {
+        f"child-{index}": {
+            "index": index,
+            "upload_id": f"upload-{index:08d}",
+            "status": JobStatus.COMPLETED.value,
+            "transcription_text": "",
+        }
+        for index in range(3)
+    }
+    return Job(
+        job_type=JobType.VOICE_TO_SOAP,
+        job_status=JobStatus.IN_PROGRESS,
+        total_child_jobs=3,
+        completed_child_jobs=2,
+        failed_child_jobs=0,
+        reported_child_job_ids={"child-0", "child-1"},
+        child_jobs=child_jobs,
+        payload=json.dumps({"upload_ids": [f"upload-{index:08d}" for index in range(3)]}),
+        created_at="2025-01-01 00:00:00",
+        updated_at="2025-01-01 00:00:00",
+        ttl=1735657200,
+    )
+
+
+def legacy_encode(job: Job):
+    dict_data = {key: value for key, value in asdict(job).items() if value is not None}
+    return Job.as_item(dict_data)
+
+
+def legacy_decode(item):
+    return Job(**{key: Job._convert_from_dynamo_type(value) for key, value in item.items()})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="1計測あたりの実行回数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最小値を採用）")
+    args = parser.parse_args()
+
+    job = build_job()
+    codec = ModelCodec.for_model(Job)
+    item = codec.encode(job)
+
+    # 変換結果が従来と一致することを確認してから計測する
+    assert item == legacy_encode(job), "encoded item differs from legacy path"
+    assert Job(**codec.decode(item)) == legacy_decode(item), "decoded model differs from legacy path"
+
+    cases = [
+        ("encode", lambda: legacy_encode(job), lambda: codec.encode(job)),
+        ("decode", lambda: legacy_decode(item), lambda: Job(**codec.decode(item))),
+    ]
+
+    print(f"{'case':<8}{'legacy (us)':>14}{'codec (us)':>14}{'speedup':>10}")
+    for name, legacy, compiled in cases:
+        legacy_time = min(timeit.repeat(legacy, number=args.number, repeat=args.repeat)) / args.number
+        codec_time = min(timeit.repeat(compiled, number=args.number, repeat=args.repeat)) / args.number
+        print(f"{name:<8}{legacy_time * 1e6:>14.2f}{codec_time * 1e6:>14.2f}{legacy_time / codec_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+ハンドラーごとの初期化（import）時間の計測
+
+各Chaliceハンドラーが初回呼び出しまでに読み込むモジュールを
+`python -X importtime` で計測し、合計時間・モジュール数・時間のかかった上位モジュールを表示する。
+計測は毎回新しいプロセスで行う（コールドスタート相当）。
+
+実行方法（src/dentalscribe で実行）:
+    python -m benchmarks.bench_importtime [--repeat 5] [--top 5]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+# ハンドラー → 初回呼び出しまでに生成されるサービス・クライアント（AWSへの通信は行わない）
+SETUP = "import app; from chalicelib.clients.aws import AWSClients; "
+SCENARIOS: Dict[str, str] = {
+    "app (module load)": "import app",
+    "api: GET storages/*": SETUP + "app.ServiceContainer.get_storage_service(); AWSClients.get_dynamodb()",
+    "api: GET jobs/voice2soap/{job_id}": SETUP + "app.ServiceContainer.get_job_service(); AWSClients.get_dynamodb()",
+    "api: GET jobs/voice2soap/{job_id}/events": SETUP + "app.ServiceContainer.get_job_event_service(); AWSClients.get_dynamodb()",
+    "api: POST jobs/voice2soap": SETUP + "app.ServiceContainer.get_job_service(); AWSClients.get_dynamodb(); AWSClients.get_s3(); AWSClients.get_sqs()",
+    "s3: transcribe destination": SETUP + "app.ServiceContainer.get_job_service(); AWSClients.get_dynamodb(); AWSClients.get_s3(); AWSClients.get_sqs()",
+    "sqs: job queue": SETUP + "app.ServiceContainer.get_job_service().voice2soap_job_handler; AWSClients.get_dynamodb(); AWSClients.get_sqs()",
+}
+
+# 計測用のダミー環境変数（設定済みの値は上書きしない）
+DUMMY_ENV = {
+    "S3_BUCKET": "bench-bucket",
+    "SQS_JOB_QUEUE": "bench-queue",
+    "SQS_JOB_FAILED_QUEUE": "bench-failed-queue",
+    "BEDROCK_REGION": "ap-northeast-1",
+    "BEDROCK_MODEL_ID": "bench-model",
+    "DYNAMODB_JOB_TABLE": "bench-jobs",
+    "DYNAMODB_UPLOAD_TABLE": "bench-uploads",
+    "AUTHORIZER_LAMBDA_ARN": "arn:aws:lambda:ap-northeast-1:000000000000:function:bench",
+    "AWS_DEFAULT_REGION": "ap-northeast-1",
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(code: str, env: Dict[str, str], baseline: Set[str] = frozenset()) -> Tuple[int, List[Tuple[int, str]], Set[str]]:
+    """
+    1回計測する（baselineのモジュール＝インタープリター起動時に読み込まれるものは除く）
+
+    Returns:
+        (importの合計時間[us], [(累積時間[us], トップレベルのモジュール名)], 読み込まれたモジュール名)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Failed to run {code!r}:\n{completed.stderr[-2000:]}")
+
+    total = 0
+    top_level = []
+    modules = set()
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        if module in baseline:
+            continue
+        modules.add(module)
+        total += int(self_us)
+        # インデントが1つのものがそのコードから直接importされたモジュール
+        if len(indent) == 1:
+            top_level.append((int(cumulative_us), module))
+    return total, top_level, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="シナリオごとの計測回数（中央値を表示）")
+    parser.add_argument("--top", type=int, default=5, help="表示する上位モジュール数")
+    args = parser.parse_args()
+
+    env = {**DUMMY_ENV, **os.environ}
+    baseline = measure("pass", env)[2]
+
+    # 初回はバイトコードのキャッシュ生成を含むため計測から除く
+    for code in SCENARIOS.values():
+        measure(code, env)
+
+    for name, code in SCENARIOS.items():
+        totals = []
+        top_level, modules = [], set()
+        for _ in range(args.repeat):
+            total, top_level, modules = measure(code, env, baseline)
+            totals.append(total)
+
+        print(f"{name}: {statistics.median(totals) / 1000:.1f} ms ({len(modules)} modules)")
+        for cumulative_us, module in sorted(top_level, reverse=True)[:args.top]:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+話者ターンの組み立て（TranscriptUtil.build_speaker_turns）のベンチマーク
+
+従来の単語ごとのループ（単語とつなぎ文字を貯めてから連結）と、itemsの列をNumPyの配列演算で処理する現在の実装を、
+単語数ごとに比較する。従来の実装は話者ターンの信頼度を持たないため、信頼度以外が一致することを確認してから計測する。
+
+実行方法（src/dentalscribe で実行）:
+    python -m benchmarks.bench_speaker_turns [--items 1000 10000 50000] [--repeat 7]
+"""
+import argparse
+import gc
+import random
+import time
+from typing import Any, Callable, Dict, List
+from chalicelib.utils.transcript import TranscriptUtil
+
+WORDS = ["歯", "が", "痛い", "です", "右", "下", "の", "奥歯", "冷たい", "もの", "で", "しみる", "麻酔", "します"]
+
+
+def build_transcribe_result(item_count: int, seed: int = 0) -> Dict[str, Any]:
+    """item_count件のitems（約1割が句読点、話者は2〜3人）を持つTranscribe結果"""
+    generator = random.Random(seed)
+    items = []
+    speaker = 0
+    start = 0.0
+    for index in range(item_count):
+        if index and generator.random() < 0.1:
+            items.append({"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": "。"}]})
+            continue
+        if generator.random() < 0.08:
+            speaker = generator.randrange(3)
+        items.append({
+            "type": "pronunciation",
+            "start_time": f"{start:.3f}",
+            "end_time": f"{start + 0.25:.3f}",
+            "alternatives": [{"confidence": f"{generator.uniform(0.3, 1):.4f}", "content": generator.choice(WORDS)}],
+            "speaker_label": f"spk_{speaker}",
+        })
+        start += 0.3
+    return {"results": {"items": items}}
+
+
+def legacy_build_speaker_turns(transcribe_result: Dict[str, Any], separator: str = " ") -> List[Dict[str, Any]]:
+    """従来の実装（単語ごとのループ）"""
+    results = transcribe_result.get("results", {})
+
+    speaker_by_start_time = {}
+    for segment in results.get("speaker_labels", {}).get("segments", []):
+        for segment_item in segment.get("items", []):
+            speaker_by_start_time[segment_item.get("start_time")] = segment_item.get("speaker_label")
+
+    turns = []
+    current = None
+    for item in results.get("items", []):
+        alternatives = item.get("alternatives") or [{}]
+        content = alternatives[0].get("content", "")
+
+        if item.get("type") == "punctuation":
+            if current is not None:
+                current["words"].append(content)
+                current["glue"].append("")
+            continue
+
+        speaker = item.get("speaker_label") or speaker_by_start_time.get(item.get("start_time"))
+        start_time = float(item.get("start_time", 0.0))
+        end_time = float(item.get("end_time", start_time))
+
+        if current is None or current["speaker"] != speaker:
+            current = {"speaker": speaker, "start_time": start_time, "end_time": end_time, "words": [], "glue": []}
+            turns.append(current)
+
+        current["words"].append(content)
+        current["glue"].append(separator if len(current["words"]) > 1 else "")
+        current["end_time"] = end_time
+
+    return [
+        {
+            "speaker": turn["speaker"],
+            "start_time": turn["start_time"],
+            "end_time": turn["end_time"],
+            "text": "".join(glue + word for glue, word in zip(turn["glue"], turn["words"])),
+        }
+        for turn in turns
+    ]
+
+
+def best_seconds(function: Callable[[], Any], repeat: int) -> float:
+    """repeat回のうち最短の実行時間（GCによるばらつきを除くため、計測中はGCを止める）"""
+    function()
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000], help="itemsの件数")
+    parser.add_argument("--repeat", type=int, default=7, help="計測回数（最小値を採用）")
+    args = parser.parse_args()
+
+    print(f"{'items':>8}{'separator':>11}{'turns':>8}{'legacy (ms)':>13}{'current (ms)':>14}{'speedup':>9}")
+    for item_count in args.items:
+        transcribe_result = build_transcribe_result(item_count)
+        for separator in ("", " "):
+            turns = TranscriptUtil.build_speaker_turns(transcribe_result, separator)
+            expected = legacy_build_speaker_turns(transcribe_result, separator)
+            assert [{key: value for key, value in turn.items() if key != "confidence"} for turn in turns] == expected, \
+                "speaker turns differ from legacy path"
+
+            legacy_time = best_seconds(lambda: legacy_build_speaker_turns(transcribe_result, separator), args.repeat)
+            current_time = best_seconds(lambda: TranscriptUtil.build_speaker_turns(transcribe_result, separator), args.repeat)
+            print(f"{item_count:>8}{separator!r:>11}{len(turns):>8}{legacy_time * 1000:>13.2f}"
+                  f"{current_time * 1000:>14.2f}{legacy_time / current_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
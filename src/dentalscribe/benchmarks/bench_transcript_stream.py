@@ -0,0 +1,98 @@
+"""
+Transcribe結果（transcript.json）からの全文テキスト取得のベンチマーク
+
+従来の取得（get_json_object で全体を読み込み・デコード・解析してから extract_text）と、
+get_json_path による逐次読み出しを、録音の長さごとにピークメモリ（tracemalloc）と処理時間で比較する。
+S3の本文はメモリ上のStreamingBodyで代替する（通信時間は含まない）。
+
+実行方法（src/dentalscribe で実行）:
+    python -m benchmarks.bench_transcript_stream [--minutes 10 30 60 120] [--items-first]
+"""
+import argparse
+import io
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+from botocore.response import StreamingBody
+from chalicelib.clients.aws.s3 import S3Client
+from chalicelib.utils.transcript import TranscriptUtil
+
+# 日本語の診察の発話速度の目安（単語/秒）
+WORDS_PER_SECOND = 3.0
+WORDS = ["歯", "が", "痛い", "です", "右", "下", "の", "奥歯", "冷たい", "もの", "で", "しみる", "麻酔", "します"]
+
+
+def build_transcript(minutes: float, items_first: bool, seed: int = 0) -> bytes:
+    """minutes分の録音に相当するTranscribe結果のJSON（バイト列）"""
+    generator = random.Random(seed)
+    items = []
+    for index in range(int(minutes * 60 * WORDS_PER_SECOND)):
+        start = index / WORDS_PER_SECOND
+        items.append({
+            "id": index,
+            "type": "pronunciation",
+            "alternatives": [{"confidence": f"{generator.uniform(0.5, 1):.3f}", "content": generator.choice(WORDS)}],
+            "start_time": f"{start:.3f}",
+            "end_time": f"{start + 0.3:.3f}",
+            "speaker_label": f"spk_{index // 20 % 2}",
+        })
+    text = "".join(item["alternatives"][0]["content"] for item in items)
+    transcripts = [{"transcript": text}]
+
+    # Transcribeの出力ではtranscriptsがitemsより前に来る。--items-firstは最後まで読む必要がある場合の比較用
+    results = {"items": items, "transcripts": transcripts} if items_first else {"transcripts": transcripts, "items": items}
+    return json.dumps({"jobName": "benchmark", "status": "COMPLETED", "results": results}, ensure_ascii=False).encode("utf-8")
+
+
+class FakeS3:
+    """get_objectのみを持つ偽のs3クライアント"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def get_object(self, Bucket: str, Key: str) -> Dict:
+        return {"Body": StreamingBody(io.BytesIO(self.data), len(self.data))}
+
+
+def measure(function: Callable[[], str]) -> Tuple[str, int, float]:
+    """(結果, ピークメモリ[byte], 処理時間[秒])。tracemalloc自体が遅くするため、処理時間は別に計測する"""
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    function()
+    return result, peak, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 30, 60, 120], help="録音の長さ[分]")
+    parser.add_argument("--items-first", action="store_true", help="itemsをtranscriptsより前に置く")
+    args = parser.parse_args()
+
+    s3_client = S3Client.__new__(S3Client)
+
+    print(f"{'minutes':>8}{'size (MB)':>11}{'legacy peak (MB)':>18}{'stream peak (MB)':>18}"
+          f"{'legacy (ms)':>13}{'stream (ms)':>13}")
+    for minutes in args.minutes:
+        data = build_transcript(minutes, args.items_first)
+        s3_client.client = FakeS3(data)
+
+        legacy_text, legacy_peak, legacy_time = measure(
+            lambda: TranscriptUtil.extract_text(s3_client.get_json_object("bucket", "transcript.json"))
+        )
+        stream_text, stream_peak, stream_time = measure(
+            lambda: s3_client.get_json_path("bucket", "transcript.json", TranscriptUtil.TEXT_PATH, default="")
+        )
+        assert stream_text == legacy_text, "streamed text differs from legacy path"
+
+        print(f"{minutes:>8g}{len(data) / 2**20:>11.1f}{legacy_peak / 2**20:>18.1f}{stream_peak / 2**20:>18.2f}"
+              f"{legacy_time * 1000:>13.1f}{stream_time * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,73 @@
-from chalicelib.clients.aws.s3 import S3Client
-from chalicelib.clients.aws.dynamodb import DynamoDBClient
-from chalicelib.clients.aws.transcribe import TranscribeClient
-from chalicelib.clients.aws.bedrock import BedrockClient
-from chalicelib.clients.aws.sqs import SQSClient
+from typing import TYPE_CHECKING, Dict, Optional
+from chalicelib.clients.aws.registry import ClientRegistry
+
+if TYPE_CHECKING:
+    from chalicelib.clients.aws.s3 import S3Client
+    from chalicelib.clients.aws.dynamodb import DynamoDBClient
+    from chalicelib.clients.aws.transcribe import TranscribeClient
+    from chalicelib.clients.aws.bedrock import BedrockClient
+    from chalicelib.clients.aws.sqs import SQSClient
 
 
 class AWSClients:
-    """AWSクライアントのファクトリークラス"""
-    
-    def __init__(self):
-        self._s3_client = None
-        self._dynamodb_client = None  
-        self._transcribe_client = None
-        self._bedrock_client = None
-        self._sqs_client = None
-    
-    def get_s3(self) -> S3Client:
-        if self._s3_client is None:
-            self._s3_client = S3Client()
-        return self._s3_client
-    
-    def get_dynamodb(self) -> DynamoDBClient:
-        if self._dynamodb_client is None:
-            self._dynamodb_client = DynamoDBClient()
-        return self._dynamodb_client
-    
-    def get_transcribe(self) -> TranscribeClient:
-        if self._transcribe_client is None:
-            self._transcribe_client = TranscribeClient()
-        return self._transcribe_client
-    
-    def get_bedrock(self) -> BedrockClient:
-        if self._bedrock_client is None:
-            self._bedrock_client = BedrockClient()
-        return self._bedrock_client
-    
-    def get_sqs(self) -> SQSClient:
-        if self._sqs_client is None:
-            self._sqs_client = SQSClient()
-        return self._sqs_client
+    """
+    AWSクライアントのファクトリークラス（コンテナ内で共有）
+
+    クライアントのモジュールは初回取得時にimportする（使わないクライアントは読み込まない）。
+    """
+
+    _s3_client = None
+    _dynamodb_client = None
+    _transcribe_client = None
+    _bedrock_client = None
+    _bedrock_model_clients: Dict[str, 'BedrockClient'] = {}
+    _sqs_client = None
+
+    @classmethod
+    def get_s3(cls) -> 'S3Client':
+        if cls._s3_client is None:
+            from chalicelib.clients.aws.s3 import S3Client
+            cls._s3_client = S3Client()
+        return cls._s3_client
+
+    @classmethod
+    def get_dynamodb(cls) -> 'DynamoDBClient':
+        if cls._dynamodb_client is None:
+            from chalicelib.clients.aws.dynamodb import DynamoDBClient
+            cls._dynamodb_client = DynamoDBClient()
+        return cls._dynamodb_client
+
+    @classmethod
+    def get_transcribe(cls) -> 'TranscribeClient':
+        if cls._transcribe_client is None:
+            from chalicelib.clients.aws.transcribe import TranscribeClient
+            cls._transcribe_client = TranscribeClient()
+        return cls._transcribe_client
+
+    @classmethod
+    def get_bedrock(cls, text_model_id: Optional[str] = None, endpoints: Optional[str] = None) -> 'BedrockClient':
+        """
+        Args:
+            text_model_id: 既定（BEDROCK_MODEL_ID）以外のモデルを使う場合に指定
+                （既定の呼び出し先の各リージョンで呼び出し、既定の呼び出し先をフォールバックとする）
+            endpoints: 呼び出し先を指定する場合（「リージョン/モデルID」のカンマ区切り、優先順）
+        """
+        if cls._bedrock_client is None:
+            from chalicelib.clients.aws.bedrock import BedrockClient
+            cls._bedrock_client = BedrockClient()
+        if not endpoints and (not text_model_id or text_model_id == cls._bedrock_client.get_text_model_id()):
+            return cls._bedrock_client
+
+        key = endpoints or text_model_id
+        client = cls._bedrock_model_clients.get(key)
+        if client is None:
+            from chalicelib.clients.aws.bedrock import BedrockClient
+            client = cls._bedrock_model_clients.setdefault(key, BedrockClient(text_model_id=text_model_id, endpoints=endpoints))
+        return client
+
+    @classmethod
+    def get_sqs(cls) -> 'SQSClient':
+        if cls._sqs_client is None:
+            from chalicelib.clients.aws.sqs import SQSClient
+            cls._sqs_client = SQSClient()
+        return cls._sqs_client
@@ -1,25 +1,22 @@
 from typing import Optional
-import boto3
-from botocore.config import Config
 from chalicelib.config import Config as AppConfig
+from chalicelib.clients.aws.registry import ClientRegistry
 
 class BaseAWSClient:
     def __init__(self, service_name: str, region: Optional[str] = None, max_retries: Optional[int] = None, retry_mode: Optional[str] = None):
+        self.service_name = service_name
         self.config = self._build_config(region, max_retries, retry_mode)
-        self.aws_config = AppConfig.get_aws_config()
-        self.client = boto3.client(
+        self.aws_settings = AppConfig.get_aws_settings()
+        # boto3クライアントはコンテナ内で共有（ウォームスタート時は再構築しない）
+        self.client = ClientRegistry.get_client(
             service_name,
-            config=self.config
+            region=region,
+            max_retries=max_retries,
+            retry_mode=retry_mode
         )
 
     def _build_config(self, region: Optional[str] = None, max_retries: Optional[int] = None, retry_mode: Optional[str] = None):
-        return Config(
-            region_name=region or AppConfig.get_aws_config()['DEFAULT_REGION'],
-            retries={
-                'max_attempts': max_retries or AppConfig.get_aws_config()['MAX_RETRIES'],
-                'mode': retry_mode or AppConfig.get_aws_config()['RETRY_MODE']
-            }
-        )
+        return ClientRegistry.build_config(self.service_name, region, max_retries, retry_mode)
 
     def get_region(self):
         return self.config.region_name
@@ -1,12 +1,22 @@
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 import json
-import boto3
 from chalicelib.clients.aws.base import BaseAWSClient
+from chalicelib.clients.aws.bedrock_router import BedrockEndpoint, BedrockRouter
+from chalicelib.clients.aws.registry import ClientRegistry
 from chalicelib.config import Config as AppConfig
-from chalicelib.exceptions import BedrockError
+from chalicelib.exceptions import BedrockError, BedrockThrottlingError
+from chalicelib.utils.rate_limiter import DynamoDBBucketStore, InMemoryBucketStore, TokenBucketRateLimiter
+from chalicelib.utils.token_util import TokenUtil
+from botocore.exceptions import ClientError
 
 
 class BedrockClient(BaseAWSClient):
+    # Bedrock側でスロットリングされた場合に再実行するまでの秒数
+    THROTTLED_RETRY_AFTER_SECONDS = 30
+
+    # レートリミッターのテーブルが未設定の場合はコンテナ内で状態を共有する
+    _local_bucket_store = InMemoryBucketStore()
+
     def __init__(
         self,
         region: Optional[str] = None,
@@ -14,7 +24,13 @@ class BedrockClient(BaseAWSClient):
         max_retries: Optional[int] = None,
         retry_mode: Optional[str] = None,
         text_model_id: Optional[str] = None,
+        endpoints: Optional[str] = None,
     ):
+        """
+        Args:
+            text_model_id: 既定（BEDROCK_MODEL_ID）以外のモデルを使う場合に指定（BedrockEndpoint.tier_targets参照）
+            endpoints: 呼び出し先を指定する場合（「リージョン/モデルID」のカンマ区切り、優先順）
+        """
         super().__init__(
             service_name="bedrock-runtime",
             region=region,
@@ -22,10 +38,18 @@ class BedrockClient(BaseAWSClient):
             retry_mode=retry_mode or "adaptive",
         )
         self.embedding_config = self._build_config(region=embedding_region)
-        self.embedding_client = boto3.client(
-            "bedrock-runtime", config=self.embedding_config
+        self.embedding_client = ClientRegistry.get_client(
+            "bedrock-runtime", region=embedding_region
+        )
+        self.endpoints = self._build_endpoints(region, text_model_id, endpoints, max_retries, retry_mode or "adaptive")
+        self.text_model_id = self.endpoints[0].model_id
+        self.router = BedrockRouter(
+            self.endpoints,
+            hedge_percentile=self.aws_settings.bedrock_hedge_percentile,
+            hedge_default_delay_seconds=self.aws_settings.bedrock_hedge_default_delay_seconds,
+            cooldown_seconds=self.aws_settings.bedrock_endpoint_cooldown_seconds,
+            max_wait_seconds=self.aws_settings.bedrock_rate_limit_max_wait_seconds,
         )
-        self.text_model_id = text_model_id or AppConfig.get_aws_config()["BEDROCK_MODEL_ID"]
 
     def get_embedding_region(self):
         return self.embedding_config.region_name
@@ -39,39 +63,111 @@ class BedrockClient(BaseAWSClient):
     def get_text_model_id(self):
         return self.text_model_id
 
+    def _build_endpoints(
+        self,
+        region: Optional[str],
+        text_model_id: Optional[str],
+        endpoints: Optional[str],
+        max_retries: Optional[int],
+        retry_mode: str,
+    ) -> List[BedrockEndpoint]:
+        """
+        呼び出し先を優先順に生成する
+
+        - endpointsを指定した場合はその呼び出し先
+        - リージョンを指定した場合、またはBEDROCK_ENDPOINTSが未設定の場合は、そのリージョンのモデル（既定以外のモデルを指定した場合は既定のモデルをフォールバックとする）
+        - それ以外はBEDROCK_ENDPOINTS（既定以外のモデルを指定した場合は、その各リージョンのモデルと既定の呼び出し先）
+        """
+        if endpoints:
+            targets = BedrockEndpoint.parse_list(endpoints)
+        else:
+            if region or not self.aws_settings.bedrock_endpoints:
+                default_targets = [(self.get_text_region(), self.aws_settings.bedrock_model_id)]
+            else:
+                default_targets = BedrockEndpoint.parse_list(self.aws_settings.bedrock_endpoints)
+            targets = BedrockEndpoint.tier_targets(text_model_id, default_targets) if text_model_id else default_targets
+
+        rate_limit_table = self.aws_settings.dynamodb_rate_limit_table
+        endpoints = []
+        for endpoint_region, model_id in targets:
+            endpoints.append(BedrockEndpoint(
+                region=endpoint_region,
+                model_id=model_id,
+                client=ClientRegistry.get_client(
+                    "bedrock-runtime", region=endpoint_region, max_retries=max_retries, retry_mode=retry_mode
+                ),
+                rate_limiter=TokenBucketRateLimiter(
+                    bucket_id=f"bedrock#{endpoint_region}#{model_id}",
+                    requests_per_minute=self.aws_settings.bedrock_requests_per_minute,
+                    tokens_per_minute=self.aws_settings.bedrock_tokens_per_minute,
+                    store=DynamoDBBucketStore(rate_limit_table) if rate_limit_table else BedrockClient._local_bucket_store,
+                ),
+            ))
+        return endpoints
+
     def generate_text(
         self,
         context: List[str],
         stop_sequences=None,
         max_tokens=8192,
         temperature=1,
+        system: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+        tool: Optional[Dict[str, Any]] = None,
     ) -> Tuple[str, int, int]:
-        try:
-            response = self.client.invoke_model(
-                modelId=self.text_model_id,
+        """
+        Args:
+            system: システムプロンプト（Claudeではプロンプトキャッシュの対象とする）
+            usage: 指定した場合、キャッシュを含むトークン数を書き込む（_count_fallback_model_response参照）
+            tool: 指定した場合、このツールの呼び出しを強制し、ツールの入力（JSON）をテキストとして返す（Claudeのみ）
+
+        Raises:
+            BedrockThrottlingError: 呼び出し容量が不足している場合
+        """
+        def invoke(endpoint: BedrockEndpoint) -> Dict[str, Any]:
+            response = endpoint.client.invoke_model(
+                modelId=endpoint.model_id,
                 accept="application/json",
                 contentType="application/json",
                 body=self.__generate_invoke_model_body(
-                    self.text_model_id,
+                    endpoint.model_id,
                     context,
                     stop_sequences,
                     max_tokens,
                     temperature,
+                    system,
+                    tool,
                 ),
             )
 
             print(response)
 
-            response_body = json.loads(response["body"].read().decode("utf-8"))
+            return json.loads(response["body"].read().decode("utf-8"))
 
-            text =  response_body["content"][0]["text"]
+        try:
+            tokens = self._estimate_cost(context, system, max_tokens)
+            response_body, endpoint = self.router.invoke(
+                "invoke_model",
+                invoke,
+                tokens=tokens,
+                used_tokens=lambda body: self._used_tokens(body.get("usage", {})),
+            )
+            endpoint.rate_limiter.settle(tokens, self._used_tokens(response_body.get("usage", {})))
+
+            text = self._content_text(response_body["content"])
             input_tokens = response_body["usage"]["input_tokens"]
             output_tokens = response_body["usage"]["output_tokens"]
+            if usage is not None:
+                usage.update(self._usage_tokens(response_body["usage"]))
+                self._count_fallback_model_response(usage, endpoint)
 
             return text, input_tokens, output_tokens
 
+        except BedrockThrottlingError:
+            raise
         except Exception as e:
             print(f"Error generating text: {str(e)}")
+            self._raise_if_throttled(e)
             raise BedrockError(message="Failed to generate text", details={"error": str(e)})
 
     def generate_embedding(self, text: str, dimensions=1024) -> Tuple[List[float], int]:
@@ -97,19 +193,156 @@ class BedrockClient(BaseAWSClient):
         stop_sequences=None,
         max_tokens=8192,
         temperature=1,
+        system: Optional[str] = None,
+        tool: Optional[Dict[str, Any]] = None,
     ):
-        bedrock_response = self.client.invoke_model_with_response_stream(
-            modelId=self.text_model_id,
-            body=self.__generate_invoke_model_body(
-                self.text_model_id,
-                context,
-                stop_sequences,
-                max_tokens,
-                temperature,
-            ),
+        """
+        応答のストリームを開始する
+
+        フェイルオーバー・ヘッジの対象はストリームの開始（最初の応答が届くまで）とする。
+
+        Returns:
+            (イベントストリーム, 応答した呼び出し先, 確保したトークン数)。
+            使用量の確定後に endpoint.rate_limiter.settle(確保したトークン数, 使用量) で精算する
+        """
+        def invoke(endpoint: BedrockEndpoint):
+            bedrock_response = endpoint.client.invoke_model_with_response_stream(
+                modelId=endpoint.model_id,
+                body=self.__generate_invoke_model_body(
+                    endpoint.model_id,
+                    context,
+                    stop_sequences,
+                    max_tokens,
+                    temperature,
+                    system,
+                    tool,
+                ),
+            )
+            return bedrock_response.get("body")
+
+        tokens = self._estimate_cost(context, system, max_tokens)
+        body, endpoint = self.router.invoke(
+            "invoke_model_with_response_stream",
+            invoke,
+            tokens=tokens,
+            discard=lambda stream: stream.close(),
+            # 最初の応答の時点で閉じたストリームは、入力分のみを使用したとみなす
+            used_tokens=lambda stream: tokens - max_tokens,
+        )
+        return body, endpoint, tokens
+
+    def stream_text(
+        self,
+        context: List[str],
+        stop_sequences=None,
+        max_tokens=8192,
+        temperature=1,
+        usage: Optional[Dict[str, int]] = None,
+        system: Optional[str] = None,
+        tool: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """
+        生成されたテキストを届いた順に返すジェネレーター
+
+        呼び出し側がジェネレーターを閉じた（途中でbreakした）場合はストリームを閉じ、以降の受信を打ち切る。
+
+        Args:
+            usage: 指定した場合、input_tokens / output_tokens（キャッシュの読み書きを含む）を書き込む（_count_fallback_model_response参照）
+            system: システムプロンプト（Claudeではプロンプトキャッシュの対象とする）
+            tool: 指定した場合、このツールの呼び出しを強制し、ツールの入力（JSON）の断片を届いた順に返す（Claudeのみ）
+        """
+        usage = usage if usage is not None else {}
+        try:
+            body, endpoint, tokens = self.stream_message(context, stop_sequences, max_tokens, temperature, system, tool)
+        except BedrockThrottlingError:
+            raise
+        except Exception as e:
+            self._raise_if_throttled(e)
+            raise BedrockError(message="Failed to start text stream", details={"error": str(e)})
+        self._count_fallback_model_response(usage, endpoint)
+
+        # 使用量が届く前に閉じた場合の精算用に、受信したテキストを残す
+        received = []
+        try:
+            for event in body:
+                chunk = event.get("chunk")
+                if not chunk:
+                    continue
+                data = json.loads(chunk["bytes"])
+                event_type = data.get("type")
+
+                if event_type == "message_start":
+                    usage.update(self._usage_tokens(data["message"]["usage"]))
+                elif event_type == "content_block_delta":
+                    # ツールの入力はinput_json_deltaのpartial_jsonで届く
+                    text = data["delta"].get("text") or data["delta"].get("partial_json")
+                    if text:
+                        received.append(text)
+                        yield text
+                elif event_type == "message_delta":
+                    usage["output_tokens"] = data.get("usage", {}).get("output_tokens", 0)
+                elif "outputText" in data:
+                    # Titan
+                    received.append(data["outputText"])
+                    yield data["outputText"]
+        finally:
+            body.close()
+            used_usage = dict(usage)
+            # message_startが届く前に閉じた場合（Titanを含む）は、入力を見積もりのまま精算する
+            used_usage.setdefault("input_tokens", tokens - max_tokens)
+            # message_deltaが届く前に閉じた場合（途中で打ち切った場合を含む）は、受信した出力の見積もりで精算する
+            used_usage.setdefault("output_tokens", TokenUtil.estimate_tokens("".join(received)))
+            endpoint.rate_limiter.settle(tokens, self._used_tokens(used_usage))
+
+    def _count_fallback_model_response(self, usage: Dict[str, int], endpoint: BedrockEndpoint) -> None:
+        """
+        先頭の呼び出し先と異なるモデルが応答した場合、usageのfallback_model_responsesに加算する
+
+        呼び出し元は、先頭のモデルIDで生成結果をキャッシュする前にこれを確認する（別のモデルの結果を混ぜないため）。
+        """
+        if endpoint.model_id != self.text_model_id:
+            usage["fallback_model_responses"] = usage.get("fallback_model_responses", 0) + 1
+
+    @staticmethod
+    def _estimate_cost(context: List[str], system: Optional[str], max_tokens: int) -> int:
+        """レートリミッターから確保するトークン数（見積もり入力＋max_tokens）"""
+        return sum(TokenUtil.estimate_tokens(message) for message in context) + TokenUtil.estimate_tokens(system or "") + max_tokens
+
+    def _raise_if_throttled(self, error: Exception) -> None:
+        """Bedrock側のスロットリング（botocoreの再試行後）はBedrockThrottlingErrorとして送出する"""
+        if isinstance(error, ClientError) and error.response["Error"]["Code"] == "ThrottlingException":
+            raise BedrockThrottlingError(
+                message="Bedrock throttled the request",
+                retry_after=self.THROTTLED_RETRY_AFTER_SECONDS,
+                details={"error": str(error)},
+            ) from error
+
+    @staticmethod
+    def _content_text(content: List[Dict[str, Any]]) -> str:
+        """応答のcontentから、ツールの入力（JSON）またはテキストを取り出す"""
+        for block in content:
+            if block.get("type") == "tool_use":
+                return json.dumps(block.get("input", {}), ensure_ascii=False)
+        return "".join(block.get("text", "") for block in content if block.get("type", "text") == "text")
+
+    @staticmethod
+    def _used_tokens(response_usage: Dict[str, Any]) -> int:
+        """レートリミッターで精算する使用量（キャッシュの読み書きを含む入力＋出力）"""
+        return (
+            (response_usage.get("input_tokens") or 0)
+            + (response_usage.get("cache_read_input_tokens") or 0)
+            + (response_usage.get("cache_creation_input_tokens") or 0)
+            + (response_usage.get("output_tokens") or 0)
         )
 
-        return bedrock_response.get("body")
+    @staticmethod
+    def _usage_tokens(response_usage: Dict[str, Any]) -> Dict[str, int]:
+        """応答のusageから入力トークン数とプロンプトキャッシュの読み書きトークン数を取り出す"""
+        return {
+            "input_tokens": response_usage.get("input_tokens", 0),
+            "cache_read_input_tokens": response_usage.get("cache_read_input_tokens") or 0,
+            "cache_creation_input_tokens": response_usage.get("cache_creation_input_tokens") or 0,
+        }
 
     def __generate_invoke_model_body(
         self,
@@ -118,15 +351,17 @@ class BedrockClient(BaseAWSClient):
         stop_sequences=None,
         max_tokens=1000,
         temperature=1,
+        system: Optional[str] = None,
+        tool: Optional[Dict[str, Any]] = None,
     ):
         if "claude" in model_id:
             return self.__generate_invoke_claude_model_body(
-                context, stop_sequences, max_tokens, temperature
+                context, stop_sequences, max_tokens, temperature, system, tool
             )
 
         elif "titan" in model_id:
             return self.__generate_invoke_titan_model_body(
-                context, stop_sequences, max_tokens, temperature
+                context, stop_sequences, max_tokens, temperature, system
             )
 
     def __generate_invoke_claude_model_body(
@@ -135,6 +370,8 @@ class BedrockClient(BaseAWSClient):
         stop_sequences=None,
         max_tokens=1000,
         temperature=1,
+        system: Optional[str] = None,
+        tool: Optional[Dict[str, Any]] = None,
     ):
         messages = []
 
@@ -153,6 +390,15 @@ class BedrockClient(BaseAWSClient):
             "temperature": temperature,
         }
 
+        if system:
+            # 固定のシステムプロンプトはプロンプトキャッシュの対象とし、2回目以降は入力トークンの処理を省く
+            body["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+        if tool:
+            # 構造化出力: ツールの呼び出しを強制し、スキーマに沿った入力として応答させる
+            body["tools"] = [tool]
+            body["tool_choice"] = {"type": "tool", "name": tool["name"]}
+
         if stop_sequences:
             body["stop_sequences"] = stop_sequences
 
@@ -166,8 +412,9 @@ class BedrockClient(BaseAWSClient):
         stop_sequences=None,
         max_tokens=1000,
         temperature=1,
+        system: Optional[str] = None,
     ):
-        input_text = "User: "
+        input_text = f"{system}\n\nUser: " if system else "User: "
 
         for i, message in enumerate(context):
             if i % 2 == 0:
@@ -0,0 +1,285 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from botocore.exceptions import ClientError, HTTPClientError
+from chalicelib.constants import BEDROCK_INFERENCE_PROFILE_PREFIXES
+from chalicelib.exceptions import BedrockThrottlingError
+from chalicelib.utils.latency_histogram import LatencyHistogram
+from chalicelib.utils.rate_limiter import TokenBucketRateLimiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BedrockEndpoint:
+    """
+    Bedrockの呼び出し先（リージョンとモデルの組）
+
+    呼び出し先ごとにboto3クライアント・レートリミッター・操作ごとのレイテンシーの分布を持つ。
+    clientはinvoke_model / invoke_model_with_response_stream を持つオブジェクトであればよい（ローカルの偽の呼び出し先に差し替えられる）。
+    """
+
+    def __init__(self, region: str, model_id: str, client: Any, rate_limiter: Optional[TokenBucketRateLimiter] = None):
+        self.region = region
+        self.model_id = model_id
+        self.client = client
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(f"bedrock#{region}#{model_id}", 0, 0)
+        self.latencies: Dict[str, LatencyHistogram] = {}
+        self.unavailable_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.region}/{self.model_id}"
+
+    def latency(self, operation: str) -> LatencyHistogram:
+        histogram = self.latencies.get(operation)
+        if histogram is None:
+            histogram = self.latencies.setdefault(operation, LatencyHistogram())
+        return histogram
+
+    @staticmethod
+    def parse_list(value: str) -> List[Tuple[str, str]]:
+        """
+        「リージョン/モデルID」のカンマ区切りを(リージョン, モデルID)のリストにする
+
+        Example:
+            "ap-northeast-1/anthropic.claude-3-5-sonnet-20240620-v1:0,us-west-2/anthropic.claude-3-5-sonnet-20240620-v1:0"
+        """
+        endpoints = []
+        for entry in value.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            region, separator, model_id = entry.partition("/")
+            if not separator or not region or not model_id:
+                raise ValueError(f"Invalid Bedrock endpoint (expected region/model_id): {entry}")
+            endpoints.append((region.strip(), model_id.strip()))
+        return endpoints
+
+    @staticmethod
+    def tier_targets(model_id: str, default_targets: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        既定以外のモデル（SOAP生成のルールのモデルなど）の呼び出し先を優先順に生成する
+
+        既定の呼び出し先の各リージョンでそのモデルを呼び出し、その後に既定の呼び出し先をフォールバックとして続ける。
+        既定のモデルIDが推論プロファイル（jp. / us. などの地域の接頭辞）の場合は、モデルIDの接頭辞をそれに合わせる。
+
+        Example:
+            ("jp.anthropic.claude-haiku-x", [("ap-northeast-1", "jp.anthropic.claude-sonnet-x"), ("us-west-2", "us.anthropic.claude-sonnet-x")])
+            → [("ap-northeast-1", "jp.anthropic.claude-haiku-x"), ("us-west-2", "us.anthropic.claude-haiku-x"),
+               ("ap-northeast-1", "jp.anthropic.claude-sonnet-x"), ("us-west-2", "us.anthropic.claude-sonnet-x")]
+        """
+        _, base_model_id = BedrockEndpoint._split_profile_prefix(model_id)
+        targets = []
+        for region, default_model_id in default_targets:
+            prefix, _ = BedrockEndpoint._split_profile_prefix(default_model_id)
+            targets.append((region, f"{prefix}{base_model_id}" if prefix else model_id))
+        targets.extend(default_targets)
+        # 同じ呼び出し先は最初のもののみ残す
+        return list(dict.fromkeys(targets))
+
+    @staticmethod
+    def _split_profile_prefix(model_id: str) -> Tuple[str, str]:
+        """モデルIDを推論プロファイルの地域の接頭辞（"jp." など。ない場合は空文字）と残りに分ける"""
+        prefix, separator, rest = model_id.partition(".")
+        if separator and prefix in BEDROCK_INFERENCE_PROFILE_PREFIXES:
+            return f"{prefix}.", rest
+        return "", model_id
+
+
+class BedrockRouter:
+    """
+    順序付きの呼び出し先に対するフェイルオーバーとヘッジ
+
+    - 利用可能な呼び出し先のうち先頭に送信し、スロットリング・5xx・通信エラーの場合は次の呼び出し先に切り替える。
+      失敗した呼び出し先はcooldown_seconds秒の間、順序を後回しにする。
+    - 応答がヘッジ遅延（その呼び出し先・操作のレイテンシーのhedge_percentileパーセンタイル）を過ぎても届かない場合は、
+      次の呼び出し先にも送信し、先に成功した応答を採用する。採用しなかった応答はdiscardに渡して破棄する。
+      送信済みのリクエストは取り消せないため、ヘッジした分はused_tokensで求めた使用量で精算する。
+      失敗したリクエストは確保したトークンを全て戻す。採用した応答の精算は呼び出し元が行う。
+    - レートリミッターの容量がない呼び出し先は飛ばす。どの呼び出し先にも容量がない場合は、
+      先頭の呼び出し先で最大max_wait_seconds秒待機し、それでも確保できなければBedrockThrottlingErrorを送出する。
+    """
+
+    RETRYABLE_ERROR_CODES = {
+        "ThrottlingException",
+        "ServiceUnavailableException",
+        "InternalServerException",
+        "ModelNotReadyException",
+        "ModelTimeoutException",
+    }
+
+    # ヘッジ遅延にパーセンタイルを使う最小の計測数（これ未満はhedge_default_delay_secondsを使う）
+    HEDGE_MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        endpoints: List[BedrockEndpoint],
+        hedge_percentile: float = 95,
+        hedge_default_delay_seconds: float = 60,
+        cooldown_seconds: float = 30,
+        max_wait_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not endpoints:
+            raise ValueError("At least one Bedrock endpoint is required")
+        self.endpoints = endpoints
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default_delay_seconds = hedge_default_delay_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.clock = clock
+
+    def invoke(
+        self,
+        operation: str,
+        call: Callable[[BedrockEndpoint], T],
+        tokens: int = 0,
+        discard: Optional[Callable[[T], None]] = None,
+        used_tokens: Optional[Callable[[T], int]] = None,
+    ) -> Tuple[T, BedrockEndpoint]:
+        """
+        呼び出し先を選んでcall(endpoint)を実行し、最初に成功した結果を返す
+
+        Args:
+            operation: レイテンシーを集計する操作名（応答全体と最初の応答までなど、分布の異なる操作を分ける）
+            tokens: レートリミッターから確保するトークン数
+            discard: 採用しなかった結果を破棄する処理（ストリームを閉じるなど）
+            used_tokens: 採用しなかった結果が実際に使用したトークン数（指定しない場合は確保したまま精算しない）
+
+        Returns:
+            (結果, 応答した呼び出し先)。応答した呼び出し先のトークンは、
+            呼び出し元が使用量の確定後に endpoint.rate_limiter.settle(tokens, 使用量) で精算する
+        """
+        candidates = self._ordered_endpoints()
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        pending: Dict[Future, BedrockEndpoint] = {}
+        retry_after: Optional[float] = None
+        last_error: Optional[Exception] = None
+
+        def launch() -> bool:
+            nonlocal retry_after
+            while candidates:
+                endpoint = candidates.pop(0)
+                wait_seconds = endpoint.rate_limiter.try_acquire(tokens)
+                if wait_seconds > 0:
+                    logger.info("Bedrock endpoint %s has no capacity for %.1f seconds", endpoint.name, wait_seconds)
+                    retry_after = wait_seconds if retry_after is None else min(retry_after, wait_seconds)
+                    continue
+                pending[executor.submit(self._timed_call, endpoint, operation, call)] = endpoint
+                return True
+            return False
+
+        try:
+            if not launch():
+                primary = self._ordered_endpoints()[0]
+                wait_seconds = primary.rate_limiter.acquire(tokens, self.max_wait_seconds)
+                if wait_seconds > 0:
+                    raise BedrockThrottlingError(
+                        message="Bedrock rate limit exceeded",
+                        retry_after=min(wait_seconds, retry_after or wait_seconds),
+                        details={"endpoint": primary.name, "tokens": tokens},
+                    )
+                pending[executor.submit(self._timed_call, primary, operation, call)] = primary
+
+            hedge_at = self._hedge_at(next(iter(pending.values())), operation)
+            while pending:
+                timeout = max(hedge_at - self.clock(), 0) if hedge_at is not None and candidates else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    hedge_at = None
+                    if launch():
+                        logger.info("Hedging Bedrock %s to %s", operation, list(pending.values())[-1].name)
+                    continue
+
+                for future in done:
+                    endpoint = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # 失敗したリクエストは生成していないため、確保したトークンを戻す
+                        endpoint.rate_limiter.settle(tokens, 0)
+                        if not self.is_retryable(e):
+                            raise
+                        logger.warning("Bedrock endpoint %s failed, failing over: %s", endpoint.name, e)
+                        endpoint.unavailable_until = self.clock() + self.cooldown_seconds
+                        last_error = e
+                        if not pending and launch() and hedge_at is not None:
+                            # 切り替え先の応答を基準にヘッジ遅延を計り直す
+                            hedge_at = self._hedge_at(next(iter(pending.values())), operation)
+                        continue
+
+                    return result, endpoint
+
+            if last_error is not None:
+                raise last_error
+            raise BedrockThrottlingError(message="Bedrock rate limit exceeded", retry_after=retry_after or 0)
+        finally:
+            # 採用しなかったリクエストは完了を待たずに破棄する
+            for future, endpoint in pending.items():
+                future.add_done_callback(
+                    lambda f, endpoint=endpoint: self._discard(f, endpoint, tokens, discard, used_tokens)
+                )
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def is_retryable(cls, error: Exception) -> bool:
+        """別の呼び出し先で再実行すべきエラー（スロットリング・5xx・通信エラー）かどうか"""
+        if isinstance(error, HTTPClientError):
+            return True
+        if isinstance(error, ClientError):
+            if error.response.get("Error", {}).get("Code") in cls.RETRYABLE_ERROR_CODES:
+                return True
+            return error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+        return False
+
+    def hedge_delay(self, endpoint: BedrockEndpoint, operation: str) -> float:
+        histogram = endpoint.latency(operation)
+        if histogram.count < self.HEDGE_MIN_SAMPLES:
+            return self.hedge_default_delay_seconds
+        return histogram.percentile(self.hedge_percentile)
+
+    def _hedge_at(self, endpoint: BedrockEndpoint, operation: str) -> Optional[float]:
+        if self.hedge_percentile <= 0:
+            return None
+        return self.clock() + self.hedge_delay(endpoint, operation)
+
+    def _ordered_endpoints(self) -> List[BedrockEndpoint]:
+        """利用可能な呼び出し先を設定順に、失敗直後の呼び出し先はその後ろに並べる"""
+        now = self.clock()
+        available = [endpoint for endpoint in self.endpoints if endpoint.unavailable_until <= now]
+        cooling_down = sorted(
+            (endpoint for endpoint in self.endpoints if endpoint.unavailable_until > now),
+            key=lambda endpoint: endpoint.unavailable_until,
+        )
+        return available + cooling_down
+
+    def _timed_call(self, endpoint: BedrockEndpoint, operation: str, call: Callable[[BedrockEndpoint], T]) -> T:
+        started = time.monotonic()
+        result = call(endpoint)
+        endpoint.latency(operation).record(time.monotonic() - started)
+        return result
+
+    @staticmethod
+    def _discard(
+        future: Future,
+        endpoint: BedrockEndpoint,
+        tokens: int,
+        discard: Optional[Callable[[Any], None]],
+        used_tokens: Optional[Callable[[Any], int]],
+    ) -> None:
+        """採用しなかった結果を破棄し、その呼び出し先で確保したトークンを精算する"""
+        if future.cancelled() or future.exception() is not None:
+            endpoint.rate_limiter.settle(tokens, 0)
+            return
+        result = future.result()
+        try:
+            if discard is not None:
+                discard(result)
+            if used_tokens is not None:
+                endpoint.rate_limiter.settle(tokens, used_tokens(result))
+        except Exception as e:
+            logger.warning("Failed to discard hedged Bedrock response: %s", e)
@@ -1,56 +1,258 @@
-from typing import Dict, Any, Optional, List
+import time
+import random
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, Optional, List
 from chalicelib.clients.aws.base import BaseAWSClient
 
+logger = logging.getLogger(__name__)
+
 class DynamoDBClient(BaseAWSClient):
     def __init__(self, region: Optional[str] = None):
         super().__init__('dynamodb', region)
         self.BATCH_SIZE = 25
+        self.BATCH_GET_SIZE = 100
+        self.MAX_UNPROCESSED_RETRIES = 5
+        self.TRANSACT_MAX_ITEMS = 100
 
-    def get_item(self, table_name, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        response = self.client.get_item(
-            TableName=table_name,
-            Key=key
-        )
+    def get_item(
+        self,
+        table_name,
+        key: Dict[str, Any],
+        consistent_read: bool = False,
+        projection_expression: Optional[str] = None,
+        expression_attribute_names: Optional[Dict[str, str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        params = {
+            "TableName": table_name,
+            "Key": key,
+            "ConsistentRead": consistent_read,
+        }
+        if projection_expression:
+            params["ProjectionExpression"] = projection_expression
+        if expression_attribute_names:
+            params["ExpressionAttributeNames"] = expression_attribute_names
+
+        response = self.client.get_item(**params)
 
         return response.get("Item", None)
     
-    def query_items(self, table_name, index_name: Optional[str], key_condition_expression: str, expression_attribute_values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def batch_get_items(self, table_name: str, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        複数のアイテムをBatchGetItemで一括取得する
+
+        Args:
+            table_name: テーブル名
+            keys: 取得するアイテムのキーのリスト
+
+        Returns:
+            取得できたアイテムのリスト（順序は保証されない）
+        """
+        items = []
+
+        for batch in self._chunk_list(keys, self.BATCH_GET_SIZE):
+            request_items = {table_name: {"Keys": batch}}
+
+            # 未処理のキーはバックオフしながら再試行
+            for attempt in range(self.MAX_UNPROCESSED_RETRIES + 1):
+                response = self.client.batch_get_item(RequestItems=request_items)
+                items.extend(response.get("Responses", {}).get(table_name, []))
+
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+                self._backoff(attempt)
+            else:
+                raise RuntimeError(f"Failed to get unprocessed keys from {table_name}")
+
+        return items
+
+    def query_pages(
+        self,
+        table_name,
+        index_name: Optional[str],
+        key_condition_expression: str,
+        expression_attribute_values: Dict[str, Any],
+        projection_expression: Optional[str] = None,
+        expression_attribute_names: Optional[Dict[str, str]] = None,
+        filter_expression: Optional[str] = None,
+        limit: Optional[int] = None,
+        consistent_read: bool = False,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Queryの結果をLastEvaluatedKeyに従ってページ単位で返すジェネレーター
+
+        Args:
+            projection_expression: 取得する属性（Noneの場合は全属性）
+            filter_expression: キー条件以外の絞り込み条件
+            limit: 返すアイテムの最大件数（Noneの場合は全件）
+        """
+        params = {
+            "TableName": table_name,
+            "KeyConditionExpression": key_condition_expression,
+            "ExpressionAttributeValues": expression_attribute_values,
+        }
         if index_name:
-            response = self.client.query(
-                TableName=table_name,
-                IndexName=index_name,
-                KeyConditionExpression=key_condition_expression,
-                ExpressionAttributeValues=expression_attribute_values
-            )
-        else:
-            response = self.client.query(
-                TableName=table_name,
-                KeyConditionExpression=key_condition_expression,
-                ExpressionAttributeValues=expression_attribute_values
-            )
-        return response.get("Items", [])
+            params["IndexName"] = index_name
+        if projection_expression:
+            params["ProjectionExpression"] = projection_expression
+        if expression_attribute_names:
+            params["ExpressionAttributeNames"] = expression_attribute_names
+        if filter_expression:
+            params["FilterExpression"] = filter_expression
+        if consistent_read:
+            params["ConsistentRead"] = True
+
+        yield from self._paginate(self.client.query, params, limit)
+
+    def query_items(self, table_name, index_name: Optional[str], key_condition_expression: str, expression_attribute_values: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+        """全ページのアイテムをまとめて返す（引数はquery_pagesと同じ）"""
+        return [
+            item
+            for page in self.query_pages(table_name, index_name, key_condition_expression, expression_attribute_values, **kwargs)
+            for item in page
+        ]
     
-    def filter_items(self, table_name, index_name: Optional[str], key: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def filter_items(self, table_name, index_name: Optional[str], key: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
         condition_expression = " AND ".join([f"{k} = :{k}" for k in key.keys()])
         expression_attribute_values = {f":{k}": v for k, v in key.items()}
-        return self.query_items(table_name, index_name, condition_expression, expression_attribute_values)
+        return self.query_items(table_name, index_name, condition_expression, expression_attribute_values, **kwargs)
 
+    def scan_pages(
+        self,
+        table_name,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        projection_expression: Optional[str] = None,
+        expression_attribute_names: Optional[Dict[str, str]] = None,
+        filter_expression: Optional[str] = None,
+        expression_attribute_values: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Scanの結果をページ単位で返すジェネレーター（segment指定時はそのセグメントのみ）"""
+        params = {"TableName": table_name}
+        if total_segments:
+            params["Segment"] = segment
+            params["TotalSegments"] = total_segments
+        if projection_expression:
+            params["ProjectionExpression"] = projection_expression
+        if expression_attribute_names:
+            params["ExpressionAttributeNames"] = expression_attribute_names
+        if filter_expression:
+            params["FilterExpression"] = filter_expression
+        if expression_attribute_values:
+            params["ExpressionAttributeValues"] = expression_attribute_values
 
+        yield from self._paginate(self.client.scan, params, limit)
 
-    def put_item(self, table_name, item: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.client.put_item(
-            TableName=table_name,
-            Item=item
-        )
+    def parallel_scan(self, table_name, total_segments: int = 4, **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        セグメント分割したScanを並列に実行し、取得できたページから順に返す（メンテナンス用）
+
+        Args:
+            table_name: テーブル名
+            total_segments: セグメント数（並列数）
+            kwargs: scan_pagesと同じ絞り込み・射影の引数
+        """
+        pages = queue.Queue(maxsize=total_segments * 2)
+        stop = threading.Event()
+        done = object()
+
+        def put(page) -> None:
+            # 呼び出し側が途中で読み込みをやめた場合はワーカーを止める
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def scan_segment(segment: int) -> None:
+            try:
+                for page in self.scan_pages(table_name, segment=segment, total_segments=total_segments, **kwargs):
+                    if stop.is_set():
+                        return
+                    put(page)
+            finally:
+                put(done)
+
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            futures = [executor.submit(scan_segment, segment) for segment in range(total_segments)]
+
+            try:
+                remaining = total_segments
+                while remaining:
+                    page = pages.get()
+                    if page is done:
+                        remaining -= 1
+                        continue
+                    yield page
+            finally:
+                stop.set()
+
+            # セグメント内で発生した例外を呼び出し元に伝える
+            for future in futures:
+                future.result()
+
+    def _paginate(self, operation, params: Dict[str, Any], limit: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """LastEvaluatedKeyがなくなるまで（またはlimit件に達するまで）ページを取得する"""
+        remaining = limit
+        while True:
+            if remaining is not None:
+                params["Limit"] = remaining
+
+            response = operation(**params)
+            items = response.get("Items", [])
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+
+            if items:
+                yield items
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key or remaining == 0:
+                return
+            params["ExclusiveStartKey"] = last_evaluated_key
+
+    def put_item(self, table_name, item: Dict[str, Any], condition_expression: Optional[str] = None) -> Dict[str, Any]:
+        params = {
+            "TableName": table_name,
+            "Item": item,
+        }
+        if condition_expression:
+            params["ConditionExpression"] = condition_expression
+
+        response = self.client.put_item(**params)
         return response
     
-    def update_item(self, table_name, key: Dict[str, Any], update_expression: str, expression_attribute_values: Dict[str, Any]) -> Dict[str, Any]:
-        response = self.client.update_item(
-            TableName=table_name,
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
+    def update_item(
+        self,
+        table_name,
+        key: Dict[str, Any],
+        update_expression: str,
+        expression_attribute_values: Dict[str, Any],
+        condition_expression: Optional[str] = None,
+        expression_attribute_names: Optional[Dict[str, str]] = None,
+        return_values: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        params = {
+            "TableName": table_name,
+            "Key": key,
+            "UpdateExpression": update_expression,
+        }
+        if expression_attribute_values:
+            params["ExpressionAttributeValues"] = expression_attribute_values
+        if condition_expression:
+            params["ConditionExpression"] = condition_expression
+        if expression_attribute_names:
+            params["ExpressionAttributeNames"] = expression_attribute_names
+        if return_values:
+            params["ReturnValues"] = return_values
+
+        response = self.client.update_item(**params)
         return response
     
     def delete_item(self, table_name, key: Dict[str, Any]) -> Dict[str, Any]:
@@ -64,46 +266,17 @@ class DynamoDBClient(BaseAWSClient):
     def bulk_update(self, table_name: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         複数のアイテムを一括更新する
-        
+
         Args:
             table_name: テーブル名
             items: 更新するアイテムのリスト
 
         Returns:
-            失敗したアイテムのリスト
+            再試行後も書き込めなかったアイテムのリスト
         """
-        failed_items = []
-
-        # バッチサイズごとに処理
-        for batch in self._chunk_list(items, self.BATCH_SIZE):
-            request_items = {
-                table_name: [
-                    {
-                        'PutRequest': {
-                            'Item': item
-                        }
-                    } for item in batch
-                ]
-            }
-
-            try:
-                response = self.client.batch_write_item(
-                    RequestItems=request_items,
-                    ReturnConsumedCapacity='NONE'
-                )
-
-                # 未処理のアイテムを再試行
-                unprocessed_items = response.get('UnprocessedItems', {}).get(table_name, [])
-                if unprocessed_items:
-                    failed_items.extend([
-                        item['PutRequest']['Item'] 
-                        for item in unprocessed_items
-                    ])
-
-            except Exception as e:
-                failed_items.extend(batch)
-
-        return failed_items
+        requests = [{'PutRequest': {'Item': item}} for item in items]
+        failed_requests = self._batch_write(table_name, requests)
+        return [request['PutRequest']['Item'] for request in failed_requests]
 
     def bulk_delete(self, table_name: str, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -114,40 +287,69 @@ class DynamoDBClient(BaseAWSClient):
             keys: 削除するアイテムのキーのリスト
 
         Returns:
-            失敗したキーのリスト
+            再試行後も削除できなかったキーのリスト
+        """
+        requests = [{'DeleteRequest': {'Key': key}} for key in keys]
+        failed_requests = self._batch_write(table_name, requests)
+        return [request['DeleteRequest']['Key'] for request in failed_requests]
+
+    def transact_put_items(self, table_name: str, items: List[Dict[str, Any]], condition_expression: Optional[str] = None) -> Dict[str, Any]:
+        """
+        複数のアイテムをTransactWriteItemsで全件成功または全件失敗として書き込む
+
+        Args:
+            table_name: テーブル名
+            items: 書き込むアイテムのリスト（最大TRANSACT_MAX_ITEMS件）
+            condition_expression: 各アイテムに適用する条件式
+        """
+        if len(items) > self.TRANSACT_MAX_ITEMS:
+            raise ValueError(f"TransactWriteItems supports up to {self.TRANSACT_MAX_ITEMS} items: {len(items)}")
+
+        transact_items = []
+        for item in items:
+            put = {'TableName': table_name, 'Item': item}
+            if condition_expression:
+                put['ConditionExpression'] = condition_expression
+            transact_items.append({'Put': put})
+
+        return self.client.transact_write_items(TransactItems=transact_items)
+
+    def _batch_write(self, table_name: str, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        BatchWriteItemで書き込み、未処理のリクエストはバックオフしながら再試行する
+
+        Returns:
+            再試行後も処理されなかったリクエストのリスト
         """
-        failed_keys = []
+        failed_requests = []
 
         # バッチサイズごとに処理
-        for batch in self._chunk_list(keys, self.BATCH_SIZE):
-            request_items = {
-                table_name: [
-                    {
-                        'DeleteRequest': {
-                            'Key': key
-                        }
-                    } for key in batch
-                ]
-            }
+        for batch in self._chunk_list(requests, self.BATCH_SIZE):
+            pending = batch
 
             try:
-                response = self.client.batch_write_item(
-                    RequestItems=request_items,
-                    ReturnConsumedCapacity='NONE'
-                )
-
-                # 未処理のアイテムを再試行
-                unprocessed_items = response.get('UnprocessedItems', {}).get(table_name, [])
-                if unprocessed_items:
-                    failed_keys.extend([
-                        item['DeleteRequest']['Key'] 
-                        for item in unprocessed_items
-                    ])
+                for attempt in range(self.MAX_UNPROCESSED_RETRIES + 1):
+                    response = self.client.batch_write_item(
+                        RequestItems={table_name: pending},
+                        ReturnConsumedCapacity='NONE'
+                    )
+
+                    pending = response.get('UnprocessedItems', {}).get(table_name, [])
+                    if not pending:
+                        break
+                    if attempt < self.MAX_UNPROCESSED_RETRIES:
+                        self._backoff(attempt)
 
             except Exception as e:
-                failed_keys.extend(batch)
+                logger.warning("BatchWriteItem failed on %s: %s", table_name, e)
+
+            failed_requests.extend(pending)
+
+        return failed_requests
 
-        return failed_keys
+    def _backoff(self, attempt: int) -> None:
+        """未処理アイテム再試行用の指数バックオフ（ジッター付き）"""
+        time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
 
     def _chunk_list(self, items: List[Any], chunk_size: int) -> List[List[Any]]:
         """リストをチャンクサイズごとに分割する"""
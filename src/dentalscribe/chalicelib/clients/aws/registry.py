@@ -0,0 +1,107 @@
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from chalicelib.config import Config as AppConfig
+
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
+
+
+class ClientRegistry:
+    """
+    boto3クライアントをコンテナ（プロセス）単位で共有するレジストリ
+
+    botocoreセッションを1つだけ生成し、同じ設定のクライアントは初回のみ構築する。
+    ウォームスタート時はクライアント構築・TLSハンドシェイクを行わず、
+    接続プール内のKeep-Alive接続を再利用する。
+    boto3は読み込みに時間がかかるため、最初のセッション生成時にimportする。
+    """
+
+    # サービスごとの読み込みタイムアウト設定（未定義のサービスはread_timeoutを使用）
+    READ_TIMEOUT_KEYS = {
+        "bedrock-runtime": "bedrock_read_timeout",
+    }
+
+    _session: Optional['boto3.session.Session'] = None
+    _clients: Dict[Tuple, Any] = {}
+    _resources: Dict[Tuple, Any] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls) -> 'boto3.session.Session':
+        if cls._session is None:
+            with cls._lock:
+                if cls._session is None:
+                    import boto3
+                    cls._session = boto3.session.Session()
+        return cls._session
+
+    @classmethod
+    def get_client(
+        cls,
+        service_name: str,
+        region: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        retry_mode: Optional[str] = None,
+    ):
+        config = cls.build_config(service_name, region, max_retries, retry_mode)
+        cache_key = (service_name, config.region_name, config.retries["max_attempts"], config.retries["mode"])
+
+        client = cls._clients.get(cache_key)
+        if client is None:
+            session = cls.get_session()
+            # botocoreセッションはスレッドセーフではないため、構築のみロックする
+            with cls._lock:
+                client = cls._clients.get(cache_key)
+                if client is None:
+                    client = session.client(service_name, config=config)
+                    cls._clients[cache_key] = client
+        return client
+
+    @classmethod
+    def get_resource(cls, service_name: str, region: Optional[str] = None):
+        config = cls.build_config(service_name, region)
+        cache_key = (service_name, config.region_name)
+
+        resource = cls._resources.get(cache_key)
+        if resource is None:
+            session = cls.get_session()
+            with cls._lock:
+                resource = cls._resources.get(cache_key)
+                if resource is None:
+                    resource = session.resource(service_name, config=config)
+                    cls._resources[cache_key] = resource
+        return resource
+
+    @classmethod
+    def build_config(
+        cls,
+        service_name: str,
+        region: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        retry_mode: Optional[str] = None,
+    ) -> 'Config':
+        from botocore.config import Config
+
+        aws_settings = AppConfig.get_aws_settings()
+        read_timeout_key = cls.READ_TIMEOUT_KEYS.get(service_name, "read_timeout")
+
+        return Config(
+            region_name=region or aws_settings.default_region,
+            retries={
+                "max_attempts": max_retries or aws_settings.max_retries,
+                "mode": retry_mode or aws_settings.retry_mode,
+            },
+            max_pool_connections=aws_settings.max_pool_connections,
+            tcp_keepalive=aws_settings.tcp_keepalive,
+            connect_timeout=aws_settings.connect_timeout,
+            read_timeout=getattr(aws_settings, read_timeout_key),
+        )
+
+    @classmethod
+    def clear(cls) -> None:
+        """キャッシュ済みのセッション・クライアントを破棄（テスト用）"""
+        with cls._lock:
+            cls._session = None
+            cls._clients = {}
+            cls._resources = {}
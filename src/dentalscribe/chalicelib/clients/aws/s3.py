@@ -1,13 +1,19 @@
 from typing import Dict, Any, Optional
 import json
-import boto3
 from botocore.exceptions import ClientError
 from chalicelib.clients.aws.base import BaseAWSClient
+from chalicelib.clients.aws.registry import ClientRegistry
+from chalicelib.utils.json_stream import JsonPathStreamReader
 
 class S3Client(BaseAWSClient):
     def __init__(self, region: Optional[str] = None):
         super().__init__('s3', region)
-        self.resource = boto3.resource('s3')
+        self._region = region
+
+    @property
+    def resource(self):
+        # delete_objectsでのみ使用するため遅延生成
+        return ClientRegistry.get_resource('s3', self._region)
 
     def exists(self, bucket, key):
         try:
@@ -86,6 +92,28 @@ class S3Client(BaseAWSClient):
         obj = self.client.get_object(Bucket=bucket, Key=key)
         json_str = obj["Body"].read().decode("utf-8")
         return json.loads(json_str)
+
+    def get_json_path(self, bucket, key, path, default=None, chunk_size=65536):
+        """
+        JSONオブジェクトのうち、指定したパスの値だけを読み出す
+
+        本文をchunk_sizeずつ読みながら解析し、パスの値を読み終えた時点で残りは受信せずに接続を閉じる。
+        パス上にない値は構築しないため、オブジェクト全体の大きさによらずメモリ使用量はほぼ一定になる。
+
+        Parameters:
+        bucket (str): S3バケット名
+        key (str): オブジェクトのキー
+        path (Sequence[str | int]): オブジェクトのキーと配列の添字の並び（例: ("results", "transcripts", 0, "transcript")）
+        default: パスが存在しない場合の値
+
+        Returns:
+        パスの値
+        """
+        body = self.client.get_object(Bucket=bucket, Key=key)["Body"]
+        try:
+            return JsonPathStreamReader(body.iter_chunks(chunk_size)).read(path, default)
+        finally:
+            body.close()
     
     def put_object(self, bucket, key, body, content_type):
         response = self.client.put_object(
@@ -1,18 +1,95 @@
-from typing import Dict, Any, Optional
+import random
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from chalicelib.clients.aws.base import BaseAWSClient
 from chalicelib.exceptions import SQSError
+from botocore.exceptions import ClientError
 
 class SQSClient(BaseAWSClient):
+    # SendMessageBatchの1回あたりの最大エントリ数
+    BATCH_SIZE = 10
+    # 部分失敗したエントリの最大再試行回数
+    MAX_BATCH_RETRIES = 3
+
+    # キューURLはコンテナ内で共有（キュー名・リージョンごとに初回のみ解決）
+    _queue_urls: Dict[Tuple[str, str], str] = {}
+
     def __init__(self, region: Optional[str] = None):
         super().__init__('sqs', region)
 
-    def send_message(self, queue_name, message_body):
-        response = self.client.send_message(
-            QueueUrl=self.__queue_url(queue_name),
-            MessageBody=message_body            
-        )
+    def send_message(self, queue_name, message_body, delay_seconds: Optional[int] = None):
+        params = {
+            "QueueUrl": self.__queue_url(queue_name),
+            "MessageBody": message_body,
+        }
+        if delay_seconds:
+            params["DelaySeconds"] = delay_seconds
+        response = self.client.send_message(**params)
         return response        
 
+    def send_message_batch(self, queue_name: str, message_bodies: List[str]) -> List[str]:
+        """
+        複数のメッセージをSendMessageBatchでまとめて送信する
+
+        Args:
+            queue_name: キュー名
+            message_bodies: メッセージ本文のリスト
+
+        Returns:
+            送信したメッセージのMessageIdのリスト
+
+        Raises:
+            SQSError: 再試行後も送信できなかったメッセージがある場合。
+                details["unsent_indexes"] に送信できなかった（送信前に中断した分を含む）メッセージの位置を持つ
+        """
+        queue_url = self.__queue_url(queue_name)
+        message_ids = []
+        sent_indexes = set()
+
+        def unsent_indexes() -> List[int]:
+            return [index for index in range(len(message_bodies)) if index not in sent_indexes]
+
+        for offset in range(0, len(message_bodies), self.BATCH_SIZE):
+            entries = [
+                {"Id": str(offset + i), "MessageBody": body}
+                for i, body in enumerate(message_bodies[offset:offset + self.BATCH_SIZE])
+            ]
+
+            # 部分失敗したエントリのみバックオフしながら再送
+            for attempt in range(self.MAX_BATCH_RETRIES + 1):
+                try:
+                    response = self.client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+                except ClientError as e:
+                    raise SQSError(
+                        f"Failed to send messages to {queue_name}: {e}",
+                        details={"unsent_indexes": unsent_indexes()}
+                    ) from e
+
+                for success in response.get("Successful", []):
+                    message_ids.append(success["MessageId"])
+                    sent_indexes.add(int(success["Id"]))
+
+                failed = response.get("Failed", [])
+                if not failed:
+                    break
+
+                # 送信側の誤り（メッセージサイズ超過など）は再試行しても成功しない
+                if any(failure.get("SenderFault") for failure in failed) or attempt == self.MAX_BATCH_RETRIES:
+                    raise SQSError(
+                        f"Failed to send {len(failed)} message(s) to {queue_name}",
+                        details={"failed": failed, "unsent_indexes": unsent_indexes()}
+                    )
+
+                failed_ids = {failure["Id"] for failure in failed}
+                entries = [entry for entry in entries if entry["Id"] in failed_ids]
+                time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+
+        return message_ids
+
     def __queue_url(self, queue_name):
-        queue_url = self.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
-        return queue_url
\ No newline at end of file
+        cache_key = (self.get_region(), queue_name)
+        queue_url = SQSClient._queue_urls.get(cache_key)
+        if queue_url is None:
+            queue_url = self.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+            SQSClient._queue_urls[cache_key] = queue_url
+        return queue_url
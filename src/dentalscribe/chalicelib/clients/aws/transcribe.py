@@ -31,8 +31,8 @@ class TranscribeClient(BaseAWSClient):
             Dict: 作成されたトランスクリプションジョブの情報
         """
         try:
-            language_code = self.aws_config["TRANSCRIBE_LANGUAGE_CODE"]
-            max_speaker_labels = self.aws_config["TRANSCRIBE_MAX_SPEAKER_LABELS"]
+            language_code = self.aws_settings.transcribe_language_code
+            max_speaker_labels = self.aws_settings.transcribe_max_speaker_labels
 
             params = {
                 'TranscriptionJobName': job_name,
@@ -1,14 +1,19 @@
+from typing import Optional
 from chalicelib.config.app import AppConfig
 from chalicelib.config.aws import AWSConfig
+from chalicelib.config.settings import AWSSettings
 
 
 class Config:
+    _aws_settings: Optional[AWSSettings] = None
+
     # アプリケーション設定
     @classmethod
     def get_app_config(cls):
         config = {}
         config.update(AppConfig.get_general_config())
         config.update(AppConfig.get_auth_config())
+        config.update(AppConfig.get_job_events_config())
         return config
 
     @classmethod
@@ -23,7 +28,20 @@ class Config:
         config.update(AWSConfig.get_lambda_config())
         return config
 
+    @classmethod
+    def get_aws_settings(cls) -> AWSSettings:
+        """AWS設定（コンテナ内で1度だけ読み込み・検証し、以降は同じオブジェクトを返す）"""
+        if cls._aws_settings is None:
+            cls._aws_settings = AWSSettings.from_config(cls.get_aws_config())
+        return cls._aws_settings
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """読み込み済みの設定を破棄（テスト用）"""
+        cls._aws_settings = None
+
 __all__ = [
     'AppConfig',     # アプリケーション設定
     'AWSConfig',     # AWS設定
+    'AWSSettings',   # AWS設定のスナップショット
 ]
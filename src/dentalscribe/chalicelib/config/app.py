@@ -19,5 +19,13 @@ class AppConfig(BaseConfig):
         return {
             "JWT_SECRET_KEY": cls._get_env_var("JWT_SECRET_KEY", required=True),
             "JWT_ALGORITHM": cls._get_env_var("JWT_ALGORITHM", "HS256"),
-            "JWT_EXPIRATION": cls._get_env_var("JWT_EXPIRATION", 3600),
+            "JWT_EXPIRATION": cls._get_env_int("JWT_EXPIRATION", 3600),
+        }
+
+    @classmethod
+    def get_job_events_config(cls) -> Dict[str, str]:
+        """進捗イベントの配信設定を取得"""
+        return {
+            # ストリーミング配信用のLambda（関数URL）のURL。未設定の場合はAPIの /jobs/voice2soap/{job_id}/events を使う
+            "JOB_EVENTS_STREAM_URL": cls._get_env_var("JOB_EVENTS_STREAM_URL"),
         }
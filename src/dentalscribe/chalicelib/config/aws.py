@@ -10,8 +10,12 @@ class AWSConfig(BaseConfig):
         """AWS全般設定を取得"""
         return {
             "DEFAULT_REGION": cls._get_env_var("AWS_DEFAULT_REGION", "ap-northeast-1"),
-            "MAX_RETRIES": cls._get_env_var("AWS_MAX_RETRIES", 3),
+            "MAX_RETRIES": cls._get_env_int("AWS_MAX_RETRIES", 3),
             "RETRY_MODE": cls._get_env_var("AWS_RETRY_MODE", "standard"),
+            "MAX_POOL_CONNECTIONS": cls._get_env_int("AWS_MAX_POOL_CONNECTIONS", 50),
+            "TCP_KEEPALIVE": cls._get_env_bool("AWS_TCP_KEEPALIVE", True),
+            "CONNECT_TIMEOUT": cls._get_env_int("AWS_CONNECT_TIMEOUT", 5),
+            "READ_TIMEOUT": cls._get_env_int("AWS_READ_TIMEOUT", 60),
         }
 
     @classmethod
@@ -20,6 +24,26 @@ class AWSConfig(BaseConfig):
         return {
             "BEDROCK_REGION": cls._get_env_var("BEDROCK_REGION", required=True),
             "BEDROCK_MODEL_ID": cls._get_env_var("BEDROCK_MODEL_ID", required=True),
+            "BEDROCK_READ_TIMEOUT": cls._get_env_int("BEDROCK_READ_TIMEOUT", 300),
+            # 文字起こしの見積もりトークン数がこれを超える場合は、分割して抽出した後に統合する
+            "BEDROCK_MAP_REDUCE_THRESHOLD_TOKENS": cls._get_env_int("BEDROCK_MAP_REDUCE_THRESHOLD_TOKENS", 24000),
+            "BEDROCK_MAP_REDUCE_CHUNK_TOKENS": cls._get_env_int("BEDROCK_MAP_REDUCE_CHUNK_TOKENS", 8000),
+            "BEDROCK_MAP_REDUCE_MAX_WORKERS": cls._get_env_int("BEDROCK_MAP_REDUCE_MAX_WORKERS", 4),
+            # 全コンテナで共有する呼び出し上限（0の場合は制限しない）
+            "BEDROCK_REQUESTS_PER_MINUTE": cls._get_env_int("BEDROCK_REQUESTS_PER_MINUTE", 0),
+            "BEDROCK_TOKENS_PER_MINUTE": cls._get_env_int("BEDROCK_TOKENS_PER_MINUTE", 0),
+            # 容量の回復を待つ最大時間（超える場合はジョブを遅延させて再投入する）
+            "BEDROCK_RATE_LIMIT_MAX_WAIT_SECONDS": cls._get_env_int("BEDROCK_RATE_LIMIT_MAX_WAIT_SECONDS", 5),
+            # 呼び出し先（「リージョン/モデルID」のカンマ区切り、優先順）。未設定の場合はBEDROCK_MODEL_IDのみ
+            "BEDROCK_ENDPOINTS": cls._get_env_var("BEDROCK_ENDPOINTS", ""),
+            # 応答がこのパーセンタイルのレイテンシーを過ぎても届かない場合は次の呼び出し先にも送信する（0の場合はヘッジしない）
+            "BEDROCK_HEDGE_PERCENTILE": cls._get_env_int("BEDROCK_HEDGE_PERCENTILE", 95),
+            # レイテンシーの計測が少ない間のヘッジ遅延
+            "BEDROCK_HEDGE_DEFAULT_DELAY_SECONDS": cls._get_env_int("BEDROCK_HEDGE_DEFAULT_DELAY_SECONDS", 60),
+            # スロットリング・5xxで失敗した呼び出し先を後回しにする時間
+            "BEDROCK_ENDPOINT_COOLDOWN_SECONDS": cls._get_env_int("BEDROCK_ENDPOINT_COOLDOWN_SECONDS", 30),
+            # 文字起こしの見積もりトークン数によるSOAP生成のモデル・出力トークン数のルール（JSON、SoapRoute参照）
+            "BEDROCK_SOAP_ROUTES": cls._get_env_var("BEDROCK_SOAP_ROUTES", ""),
        }
 
     @classmethod
@@ -34,12 +58,20 @@ class AWSConfig(BaseConfig):
     @classmethod
     def get_dynamodb_config(cls) -> Dict[str, str]:
         """DynamoDB設定を取得"""
+        job_ttl_seconds = cls._get_env_int("DYNAMODB_JOB_TTL_SECONDS", 60 * 60 * 24 * 7)
         return {
             "DYNAMODB_JOB_TABLE": cls._get_env_var("DYNAMODB_JOB_TABLE", required=True),
             "DYNAMODB_TTL_ATTRIBUTE": cls._get_env_var("DYNAMODB_TTL_ATTRIBUTE", "ttl"),
-            "DYNAMODB_JOB_TTL_SECONDS": cls._get_env_int(
-                "DYNAMODB_JOB_TTL_SECONDS", 60 * 60 * 24 * 7
-            ),
+            "DYNAMODB_JOB_TTL_SECONDS": job_ttl_seconds,
+            "DYNAMODB_UPLOAD_TABLE": cls._get_env_var("DYNAMODB_UPLOAD_TABLE", required=True),
+            # ジョブからupload_idを参照するため、未設定の場合はジョブと同じ期間保持する
+            "DYNAMODB_UPLOAD_TTL_SECONDS": cls._get_env_int("DYNAMODB_UPLOAD_TTL_SECONDS", job_ttl_seconds),
+            # これを超えるジョブ結果はS3に退避し、アイテムには参照のみを保存する
+            "JOB_RESULT_INLINE_MAX_BYTES": cls._get_env_int("JOB_RESULT_INLINE_MAX_BYTES", 32 * 1024),
+            # Bedrockの生成結果のキャッシュ（未設定の場合はキャッシュしない）
+            "DYNAMODB_BEDROCK_CACHE_TABLE": cls._get_env_var("DYNAMODB_BEDROCK_CACHE_TABLE", ""),
+            # レートリミッターの状態（未設定の場合はコンテナ内のみで制限する）
+            "DYNAMODB_RATE_LIMIT_TABLE": cls._get_env_var("DYNAMODB_RATE_LIMIT_TABLE", ""),
         }
 
     @classmethod
@@ -55,7 +87,7 @@ class AWSConfig(BaseConfig):
         """Transcribe設定を取得"""
         return {
             "TRANSCRIBE_LANGUAGE_CODE": cls._get_env_var("TRANSCRIBE_LANGUAGE_CODE", "ja-JP"),
-            "TRANSCRIBE_MAX_SPEAKER_LABELS": cls._get_env_var("TRANSCRIBE_MAX_SPEAKER_LABELS", 16),
+            "TRANSCRIBE_MAX_SPEAKER_LABELS": cls._get_env_int("TRANSCRIBE_MAX_SPEAKER_LABELS", 16),
         }
 
     @classmethod
@@ -20,3 +20,11 @@ class BaseConfig:
         if value is not None:
             return int(value)
         return value
+
+    @classmethod
+    def _get_env_bool(cls, key: str, default: bool = None, required: bool = False) -> bool:
+        """環境変数を真偽値として取得するヘルパーメソッド"""
+        value = cls._get_env_var(key, default, required)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return value
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, fields
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class AWSSettings:
+    """
+    AWS関連設定のスナップショット（変更不可）
+
+    環境変数はコンテナ起動後に変わらないため、Config.get_aws_settings()で1度だけ読み込み、
+    以降は属性として参照する。
+    """
+
+    # AWS全般
+    default_region: str
+    max_retries: int
+    retry_mode: str
+    max_pool_connections: int
+    tcp_keepalive: bool
+    connect_timeout: int
+    read_timeout: int
+    # Bedrock
+    bedrock_region: str
+    bedrock_model_id: str
+    bedrock_read_timeout: int
+    bedrock_map_reduce_threshold_tokens: int
+    bedrock_map_reduce_chunk_tokens: int
+    bedrock_map_reduce_max_workers: int
+    bedrock_requests_per_minute: int
+    bedrock_tokens_per_minute: int
+    bedrock_rate_limit_max_wait_seconds: int
+    bedrock_endpoints: str
+    bedrock_hedge_percentile: int
+    bedrock_hedge_default_delay_seconds: int
+    bedrock_endpoint_cooldown_seconds: int
+    bedrock_soap_routes: str
+    # S3
+    s3_bucket: str
+    upload_url_expires_in: int
+    download_url_expires_in: int
+    # DynamoDB
+    dynamodb_job_table: str
+    dynamodb_ttl_attribute: str
+    dynamodb_job_ttl_seconds: int
+    dynamodb_upload_table: str
+    dynamodb_upload_ttl_seconds: int
+    job_result_inline_max_bytes: int
+    dynamodb_bedrock_cache_table: str
+    dynamodb_rate_limit_table: str
+    # SQS
+    sqs_job_queue: str
+    sqs_job_failed_queue: str
+    # Transcribe
+    transcribe_language_code: str
+    transcribe_max_speaker_labels: int
+    # Lambda
+    authorizer_lambda_arn: str
+
+    def __post_init__(self):
+        # 型が注釈と異なる設定値は起動時に検出する（boolはintとして扱わない）
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if type(value) is not field.type:
+                raise ValueError(
+                    f"Invalid config value for {field.name.upper()}: {value!r} (expected {field.type.__name__})"
+                )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AWSSettings':
+        """Config.get_aws_config()の辞書（キーは大文字）から生成"""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key.lower(): value for key, value in config.items() if key.lower() in names})
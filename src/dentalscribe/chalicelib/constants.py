@@ -1,8 +1,22 @@
 TRANSCRIBE_DESTINATION_FILENAME = "transcript.json"
+TRANSCRIBE_COMPACT_FILENAME = "transcript_compact.json"
 PARENT_JOB_ID_NONE = "NONE"
 STORAGE_KEY_PREFIX = "storage/"
 TRANSCRIPTION_SOURCE_KEY_PREFIX = "transcription/source/"
 TRANSCRIPTION_DESTINATION_KEY_PREFIX = "transcription/destination/"
 BEDROCK_JSON_DELIMITER = "###JSON###"
 UPLOAD_ID_REGEX = r"^[A-Za-z0-9_\-]{8,64}$"
-
+JOB_TREE_TRANSACTION_MAX_ITEMS = 25 # 親子ジョブをトランザクションで作成する最大件数
+JOB_RESULT_KEY_PREFIX = "jobs/results/"
+JOB_EVENTS_MAX_EVENTS = 50 # 親ジョブに保存する進捗イベントの上限（項目サイズの上限対策。超えた分は保存しない）
+JOB_EVENTS_RETRY_MILLISECONDS = 2000 # クライアント（EventSource）の再接続間隔
+JOB_EVENTS_POLL_SECONDS = 1 # ストリーミング配信で新しいイベントを確認する間隔
+JOB_EVENTS_KEEPALIVE_SECONDS = 15 # ストリーミング配信でイベントがない間にコメント行を送る間隔（中継による切断対策）
+JOB_EVENTS_STREAM_SECONDS = 840 # ストリーミング配信の1接続の最長時間（Lambdaのタイムアウト900秒より短くし、クライアントに再接続させる）
+JOB_EVENTS_TOKEN_SCOPE = "voice2soap_job_events" # 進捗イベントの購読用トークンの用途
+JOB_THROTTLE_MAX_REQUEUES = 10 # Bedrockの容量不足でジョブを再投入する最大回数
+JOB_THROTTLE_MAX_DELAY_SECONDS = 900 # SQSのDelaySecondsの上限
+BEDROCK_SOAP_DEFAULT_MAX_TOKENS = 4096 # SOAP生成の既定のルールの出力トークン数の上限
+BEDROCK_INFERENCE_PROFILE_PREFIXES = {"us", "us-gov", "eu", "apac", "jp", "au", "ca", "global"} # クロスリージョン推論プロファイルのモデルIDの地域の接頭辞
+TRANSCRIPT_LOW_CONFIDENCE_THRESHOLD = 0.6 # 話者ターンの単語の信頼度の平均がこれ未満の場合、プロンプトで信頼度が低いことを示す
+TRANSCRIPT_LOW_CONFIDENCE_MARK = "(低信頼度)" # 信頼度の低いターンの話者ラベルに付ける印
@@ -9,4 +9,13 @@ class JobStatus(str, Enum):
 class JobType(str, Enum):
     VOICE_TO_SOAP = "VOICE_TO_SOAP"
     TRANSCRIBE    = "TRANSCRIBE"
-    GENERATE_SOAP = "GENERATE_SOAP"
\ No newline at end of file
+    GENERATE_SOAP = "GENERATE_SOAP"
+
+class JobEventType(str, Enum):
+    TRANSCRIPTION_COMPLETED = "transcription_completed"
+    TRANSCRIPTION_FAILED    = "transcription_failed"
+    GENERATION_STARTED      = "generation_started"
+    SOAP_SECTION            = "soap_section"
+    SOAP_RESET              = "soap_reset"
+    JOB_COMPLETED           = "job_completed"
+    JOB_FAILED              = "job_failed"
\ No newline at end of file
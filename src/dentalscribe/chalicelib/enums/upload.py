@@ -0,0 +1,5 @@
+from enum import Enum
+
+class UploadStatus(str, Enum):
+    ISSUED = "ISSUED"   # アップロード用URL発行済み（未アップロード）
+    STORED = "STORED"   # S3へのアップロード完了
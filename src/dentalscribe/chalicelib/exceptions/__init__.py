@@ -1,15 +1,19 @@
 from chalicelib.exceptions.base import BaseError
 from chalicelib.exceptions.timeout import RequestTimeoutError
 from chalicelib.exceptions.validation import ValidationError
-from chalicelib.exceptions.aws import S3Error, TranscribeError, BedrockError, DynamoDBError, SQSError
+from chalicelib.exceptions.auth import UnauthorizedError
+from chalicelib.exceptions.aws import S3Error, TranscribeError, BedrockError, BedrockThrottlingError, DynamoDBError, ConditionalCheckFailedError, SQSError
 
 __all__ = [
     'BaseError',
     'ValidationError', 
+    'UnauthorizedError',
     'RequestTimeoutError',
     'S3Error',
     'TranscribeError',
     'BedrockError',
+    'BedrockThrottlingError',
     'DynamoDBError',
+    'ConditionalCheckFailedError',
     'SQSError'
 ]
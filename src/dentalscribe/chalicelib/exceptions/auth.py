@@ -0,0 +1,13 @@
+from typing import Optional, Any, Dict
+from chalicelib.exceptions.base import BaseError
+
+
+class UnauthorizedError(BaseError):
+    """認証失敗時の例外"""
+    def __init__(
+        self,
+        message: str = "Unauthorized",
+        error_code: str = "AUTH001",
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(message, error_code, 401, details)
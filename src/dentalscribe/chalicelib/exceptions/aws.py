@@ -20,12 +20,25 @@ class BedrockError(BaseError):
         super().__init__(message, error_code="BEDROCK_ERROR", status_code=500, details=details)
 
 
+class BedrockThrottlingError(BedrockError):
+    """Bedrockの呼び出し容量が不足している場合のエラー（retry_after秒後に再実行する）"""
+    def __init__(self, message: str, retry_after: float, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, details=details)
+        self.retry_after = retry_after
+
+
 class DynamoDBError(BaseError):
     """DynamoDB関連のエラー"""
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(message, error_code="DYNAMODB_ERROR", status_code=500, details=details)
 
 
+class ConditionalCheckFailedError(DynamoDBError):
+    """DynamoDBの条件付き書き込みで条件を満たさなかった場合のエラー"""
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, details=details)
+
+
 class SQSError(BaseError):
     """SQS関連のエラー"""
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Optional
+from dataclasses import dataclass
+from chalicelib.config import Config
+from chalicelib.models.dynamodb import DynamoDBModel
+from chalicelib.utils.time_util import TimeUtil
+
+@dataclass
+class BedrockCacheEntry(DynamoDBModel):
+    """
+    Bedrockの生成結果のキャッシュ
+
+    キーは（モデルID、プロンプトのバージョン、生成パラメーター、正規化した入力テキスト）のハッシュ。
+    同じ入力に対する再実行（SQSの再試行・手動の再実行・重複ジョブ）ではBedrockを呼び出さない。
+    """
+    cache_key: str
+    model_id: str
+    prompt_id: str
+    content: str # 生成結果（SOAPのJSON）
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    hit_count: Optional[int] = None
+    created_at: Optional[str] = None
+    ttl: Optional[int] = None
+
+    @classmethod
+    def table_name(cls):
+        return Config.get_aws_settings().dynamodb_bedrock_cache_table
+
+    @classmethod
+    def partition_key_name(cls):
+        return "cache_key"
+
+    @classmethod
+    def build_key(cls, model_id: str, prompt_id: str, temperature: float, max_tokens: int, text: str) -> str:
+        """キャッシュキー（sha256）を生成"""
+        key_source = json.dumps(
+            {
+                "model_id": model_id,
+                "prompt_id": prompt_id,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "text": cls.normalize_text(text),
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Unicode正規化（NFC）し、連続する空白を1つにまとめる（生成結果に影響しない差分をキーに含めない）"""
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+    def is_expired(self) -> bool:
+        # DynamoDBのTTLによる削除は遅延するため、期限切れのアイテムは読み込み時に除外する
+        return bool(self.ttl) and self.ttl <= TimeUtil.timestamp()
+
+    def _prepare_for_save(self) -> None:
+        super()._prepare_for_save()
+        if not self.ttl:
+            # ジョブと同じ期間だけ保持する
+            self.ttl = int(TimeUtil.timestamp() + Config.get_aws_settings().dynamodb_job_ttl_seconds)
@@ -0,0 +1,145 @@
+import types
+import typing
+from dataclasses import fields
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+
+class ModelCodec:
+    """
+    dataclassのフィールド注釈から生成する、モデル ⇔ DynamoDBアイテムの変換器
+
+    フィールドごとに変換関数をモデルクラスにつき1回だけ組み立てるため、
+    変換のたびにasdictによるディープコピーや値ごとの型判定を行わない。
+    str / int / float / bool / Enum 以外の型（dict、set等）や、
+    注釈と異なる型の値は汎用変換（DynamoDBModelの_convert_*）にフォールバックする。
+    """
+
+    _codecs: Dict[type, 'ModelCodec'] = {}
+
+    def __init__(self, model_class: type):
+        self.model_class = model_class
+        self._generic_encode: Callable[[Any], Dict] = model_class._convert_to_dynamo_type
+        self._generic_decode: Callable[[Dict], Any] = model_class._convert_from_dynamo_type
+
+        hints = typing.get_type_hints(model_class)
+        self._encoders: List[Tuple[str, Callable[[Any], Dict]]] = []
+        self._decoders: Dict[str, Callable[[Dict], Any]] = {}
+
+        for field in fields(model_class):
+            encoder, decoder = self._compile(hints.get(field.name, Any))
+            self._encoders.append((field.name, encoder))
+            self._decoders[field.name] = decoder
+
+    @classmethod
+    def for_model(cls, model_class: type) -> 'ModelCodec':
+        """モデルクラスに対応するコーデックを返す（初回のみ生成）"""
+        codec = cls._codecs.get(model_class)
+        if codec is None:
+            codec = cls(model_class)
+            cls._codecs[model_class] = codec
+        return codec
+
+    def encode(self, model: Any) -> Dict[str, Dict]:
+        """モデルをDynamoDBのアイテム形式に変換（Noneの属性は省略）"""
+        item = {}
+        for name, encoder in self._encoders:
+            value = getattr(model, name)
+            if value is not None:
+                item[name] = encoder(value)
+        return item
+
+    def decode(self, item: Dict[str, Dict]) -> Dict[str, Any]:
+        """DynamoDBのアイテムをモデルのコンストラクタ引数に変換"""
+        decoders = self._decoders
+        generic_decode = self._generic_decode
+        return {
+            key: decoders[key](value) if key in decoders else generic_decode(value)
+            for key, value in item.items()
+        }
+
+    def _compile(self, annotation: Any) -> Tuple[Callable[[Any], Dict], Callable[[Dict], Any]]:
+        """フィールドの型注釈から(エンコーダー, デコーダー)を組み立てる"""
+        generic_encode = self._generic_encode
+        generic_decode = self._generic_decode
+        scalar_types = self._scalar_types(annotation)
+
+        enum_types = [t for t in scalar_types if issubclass(t, Enum)]
+        if enum_types:
+            enum_class = enum_types[0]
+
+            def encode_enum(value):
+                if isinstance(value, Enum):
+                    value = value.value
+                if type(value) is str:
+                    return {"S": value}
+                return generic_encode(value)
+
+            def decode_enum(attribute):
+                value = attribute.get("S")
+                if value is None:
+                    return generic_decode(attribute)
+                try:
+                    return enum_class(value)
+                except ValueError:
+                    return value
+
+            return encode_enum, decode_enum
+
+        if scalar_types == [str]:
+            return self._scalar_codec(str, "S", str, lambda value: value)
+        if scalar_types == [int]:
+            return self._scalar_codec(int, "N", str, int)
+        if scalar_types == [float]:
+            return self._scalar_codec(float, "N", str, float)
+        if scalar_types == [bool]:
+            return self._scalar_codec(bool, "BOOL", lambda value: value, lambda value: value)
+
+        return generic_encode, generic_decode
+
+    def _scalar_codec(
+        self,
+        python_type: type,
+        tag: str,
+        to_attribute: Callable[[Any], Any],
+        from_attribute: Callable[[Any], Any],
+    ) -> Tuple[Callable[[Any], Dict], Callable[[Dict], Any]]:
+        generic_encode = self._generic_encode
+        generic_decode = self._generic_decode
+
+        def encode(value):
+            if type(value) is python_type:
+                return {tag: to_attribute(value)}
+            return generic_encode(value)
+
+        def decode(attribute):
+            # 旧形式で書き込まれたNULL型や、注釈と異なる型は汎用変換に任せる
+            value = attribute.get(tag)
+            if value is None:
+                return generic_decode(attribute)
+            try:
+                return from_attribute(value)
+            except ValueError:
+                return generic_decode(attribute)
+
+        return encode, decode
+
+    @staticmethod
+    def _scalar_types(annotation: Any) -> List[type]:
+        """Optional/Unionを展開し、スカラー型として扱える型のみを返す（それ以外を含む場合は空）"""
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+            members = [member for member in typing.get_args(annotation) if member is not type(None)]
+        else:
+            members = [annotation]
+
+        if not all(isinstance(member, type) for member in members):
+            return []
+
+        # Enum | str のような注釈はEnumとして扱う
+        enum_members = [member for member in members if issubclass(member, Enum)]
+        if enum_members and all(member is str or issubclass(member, Enum) for member in members):
+            return enum_members
+
+        if all(member in (str, int, float, bool) for member in members):
+            return members
+        return []
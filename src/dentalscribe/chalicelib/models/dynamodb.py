@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict
+from dataclasses import MISSING, dataclass, fields
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 from datetime import datetime
+from decimal import Decimal
 from chalicelib.utils.time_util import TimeUtil
 from chalicelib.models.base import BaseModel
+from chalicelib.models.codec import ModelCodec
 from chalicelib.clients.aws import AWSClients
 from chalicelib.config import Config
-from chalicelib.exceptions import DynamoDBError
+from chalicelib.exceptions import DynamoDBError, ConditionalCheckFailedError
+from botocore.exceptions import ClientError
 
 @dataclass
 class DynamoDBModel(BaseModel):
@@ -25,64 +28,280 @@ class DynamoDBModel(BaseModel):
     def sort_key_name(cls) -> Optional[str]:
         return None
 
-    def save(self) -> Dict:
-        if hasattr(self, "created_at") and not getattr(self, "created_at"):
-            setattr(self, "created_at", TimeUtil.now_str())
-        if hasattr(self, "updated_at"):
-            setattr(self, "updated_at", TimeUtil.now_str())
+    def save(self, condition_expression: Optional[str] = None) -> Dict:
+        """
+        モデルを保存する
+
+        新規のモデルはPutItemで全属性を書き込み、DynamoDBから読み込んだモデルは
+        読み込み時から変更された属性のみをUpdateItem（SET/REMOVE）で書き込む。
+        変更がなく条件式もない場合は書き込まない（更新日時も更新しない）。
+        """
+        if self._persisted_item is not None and not condition_expression and not self.changed_attributes():
+            return {}
+
+        self._prepare_for_save()
         
         try:
-            dict_data = asdict(self)
-            item = self.as_item(dict_data)
+            item = self.to_item()
             table_name = self.table_name()
-            return AWSClients().get_dynamodb().put_item(table_name, item)
+
+            if self._persisted_item is None:
+                response = AWSClients.get_dynamodb().put_item(table_name, item, condition_expression)
+            else:
+                response = self._update_changed_attributes(self._diff(item), condition_expression)
+
+            self._mark_persisted(item)
+            return response
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise ConditionalCheckFailedError(f"Conditional check failed on save: {self.table_name()}")
+            raise DynamoDBError(f"Failed to save item to DynamoDB: {str(e)}")
         except Exception as e:
             raise DynamoDBError(f"Failed to save item to DynamoDB: {str(e)}")
 
-    def delete(self) -> Dict:
+    @classmethod
+    def save_all(cls, models: List['DynamoDBModel'], transactional: bool = False, condition_expression: Optional[str] = None) -> None:
+        """
+        複数のモデルをまとめて保存する
+
+        Args:
+            models: 保存するモデルのリスト（同一テーブル）
+            transactional: Trueの場合はTransactWriteItemsで全件成功または全件失敗として書き込む
+            condition_expression: 各アイテムに適用する条件式（transactional=Trueの場合のみ）
+        """
+        if not models:
+            return
+
+        for model in models:
+            model._prepare_for_save()
+
+        table_name = cls.table_name()
+        items = [model.to_item() for model in models]
+
         try:
-            partition_key_value = getattr(self, self.partition_key_name())
-            key = {
-                self.partition_key_name(): self._convert_to_dynamo_type(partition_key_value)
-            }
+            if transactional:
+                AWSClients.get_dynamodb().transact_put_items(table_name, items, condition_expression)
+                failed_items = []
+            else:
+                failed_items = AWSClients.get_dynamodb().bulk_update(table_name, items)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "TransactionCanceledException":
+                raise ConditionalCheckFailedError(f"Transaction canceled on save_all: {table_name}")
+            raise DynamoDBError(f"Failed to save items to DynamoDB: {str(e)}")
+        except Exception as e:
+            raise DynamoDBError(f"Failed to save items to DynamoDB: {str(e)}")
+
+        if failed_items:
+            raise DynamoDBError(f"Failed to save {len(failed_items)} item(s) to DynamoDB: {table_name}")
+
+        for model, item in zip(models, items):
+            model._mark_persisted(item)
+
+    def to_item(self) -> Dict:
+        """モデルをDynamoDBのアイテム形式に変換"""
+        # Noneの属性はNULL型として書き込まず省略する（ADD等の更新式が型不一致にならないように）
+        return ModelCodec.for_model(type(self)).encode(self)
 
-            if self.sort_key_name():
-                sort_key_value = getattr(self, self.sort_key_name())
-                key[self.sort_key_name()] = self._convert_to_dynamo_type(sort_key_value)
+    @property
+    def _persisted_item(self) -> Optional[Dict]:
+        """DynamoDBに保存済みの内容（読み込み時・保存時のスナップショット）。新規のモデルはNone"""
+        return self.__dict__.get("_persisted_snapshot")
 
+    def _mark_persisted(self, item: Dict) -> None:
+        """現在の内容を保存済みとして記録（dataclassのフィールドには含めない）"""
+        self.__dict__["_persisted_snapshot"] = item
+
+    def _key(self) -> Dict:
+        key = {
+            self.partition_key_name(): self._convert_to_dynamo_type(getattr(self, self.partition_key_name()))
+        }
+        if self.sort_key_name():
+            key[self.sort_key_name()] = self._convert_to_dynamo_type(getattr(self, self.sort_key_name()))
+        return key
+
+    def _prepare_for_save(self) -> None:
+        """保存前に共通の属性（作成・更新日時）を設定"""
+        if hasattr(self, "created_at") and not getattr(self, "created_at"):
+            setattr(self, "created_at", TimeUtil.now_str())
+        if hasattr(self, "updated_at"):
+            setattr(self, "updated_at", TimeUtil.now_str())
+
+    def changed_attributes(self) -> Dict[str, Optional[Dict]]:
+        """
+        読み込み時（または前回の保存時）から変更された属性を返す
+
+        Returns:
+            属性名 → 変更後の値（DynamoDB形式）。削除された属性の値はNone。
+            新規のモデルの場合は全属性
+        """
+        return self._diff(self.to_item())
+
+    def _diff(self, item: Dict) -> Dict[str, Optional[Dict]]:
+        """エンコード済みのアイテムと保存済みの内容の差分（changed_attributesを参照）"""
+        if self._persisted_item is None:
+            return dict(item)
+
+        persisted = self._persisted_item
+        changed = {key: value for key, value in item.items() if not self._same_attribute(persisted.get(key), value)}
+        changed.update({key: None for key, value in persisted.items() if key not in item and "NULL" not in value})
+        return changed
+
+    @classmethod
+    def _same_attribute(cls, persisted: Optional[Dict], value: Dict) -> bool:
+        """
+        DynamoDB形式の値が同じかどうか
+
+        読み込んだアイテムとエンコード結果では、数値の表記（"1.0"と"1"）や文字列セットの順序が異なりうるため、値として比較する。
+        """
+        if persisted is None or persisted == value:
+            return persisted == value
+        if persisted.keys() != value.keys():
+            return False
+        type_key, persisted_value = next(iter(persisted.items()))
+        other_value = value[type_key]
+        if type_key == "N":
+            return Decimal(persisted_value) == Decimal(other_value)
+        if type_key in ("SS", "NS", "BS"):
+            return set(persisted_value) == set(other_value)
+        if type_key == "M":
+            return persisted_value.keys() == other_value.keys() and all(
+                cls._same_attribute(persisted_value[key], other_value[key]) for key in persisted_value
+            )
+        if type_key == "L":
+            return len(persisted_value) == len(other_value) and all(
+                cls._same_attribute(a, b) for a, b in zip(persisted_value, other_value)
+            )
+        return False
+
+    def _update_changed_attributes(self, changed: Dict[str, Optional[Dict]], condition_expression: Optional[str] = None) -> Dict:
+        """変更された属性のみをUpdateItemで書き込む（キーは更新しない）"""
+        key_names = {self.partition_key_name(), self.sort_key_name()}
+        set_clauses = []
+        remove_clauses = []
+        expression_attribute_names = {}
+        expression_attribute_values = {}
+
+        for index, (name, value) in enumerate(changed.items()):
+            if name in key_names:
+                continue
+            expression_attribute_names[f"#a{index}"] = name
+            if value is None:
+                remove_clauses.append(f"#a{index}")
+            else:
+                set_clauses.append(f"#a{index} = :a{index}")
+                expression_attribute_values[f":a{index}"] = value
+
+        if not expression_attribute_names:
+            return {}
+
+        update_expression = ""
+        if set_clauses:
+            update_expression += "SET " + ", ".join(set_clauses)
+        if remove_clauses:
+            update_expression += " REMOVE " + ", ".join(remove_clauses)
+
+        # TTL等で削除されたアイテムを変更分だけで再作成しない
+        exists_condition = f"attribute_exists({self.partition_key_name()})"
+        condition_expression = f"{exists_condition} AND ({condition_expression})" if condition_expression else exists_condition
+
+        return AWSClients.get_dynamodb().update_item(
+            table_name=self.table_name(),
+            key=self._key(),
+            update_expression=update_expression.strip(),
+            expression_attribute_values=expression_attribute_values,
+            condition_expression=condition_expression,
+            expression_attribute_names=expression_attribute_names,
+        )
+
+    def delete(self) -> Dict:
+        try:
             table_name = self.table_name()
-            return AWSClients().get_dynamodb().delete_item(table_name, key)
+            return AWSClients.get_dynamodb().delete_item(table_name, self._key())
         except Exception as e:
             raise DynamoDBError(f"Failed to delete item from DynamoDB: {str(e)}")
 
     @classmethod
-    def find(cls, key: Dict) -> Optional['DynamoDBModel']:
+    def find(cls, key: Dict, consistent_read: bool = False) -> Optional['DynamoDBModel']:
         try:
             table_name = cls.table_name()
-            item = AWSClients().get_dynamodb().get_item(table_name, key)
+            item = AWSClients.get_dynamodb().get_item(table_name, key, consistent_read)
             return cls.from_item(item)
         except Exception as e:
             raise DynamoDBError(f"Failed to find item in DynamoDB: {str(e)}")
 
     @classmethod
-    def filter(cls, index_name: Optional[str], key: Dict) -> List['DynamoDBModel']:
+    def filter(
+        cls,
+        index_name: Optional[str],
+        key: Dict,
+        attributes: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List['DynamoDBModel']:
         try:
             table_name = cls.table_name()
-            items = AWSClients().get_dynamodb().filter_items(table_name, index_name, key)
+            items = AWSClients.get_dynamodb().filter_items(
+                table_name, index_name, key, limit=limit, **cls._projection_params(attributes)
+            )
             return [cls.from_item(item) for item in items if item]
         except Exception as e:
             raise DynamoDBError(f"Failed to filter items in DynamoDB: {str(e)}")
         
 
     @classmethod
-    def query(cls, index_name: Optional[str], key_condition_expression: str, expression_attribute_values: Dict[str, Any]) -> List['DynamoDBModel']:
+    def query(
+        cls,
+        index_name: Optional[str],
+        key_condition_expression: str,
+        expression_attribute_values: Dict[str, Any],
+        attributes: Optional[List[str]] = None,
+        filter_expression: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator['DynamoDBModel']:
+        """
+        Queryの結果をモデルとして1件ずつ返すジェネレーター（ページは必要になった時点で取得）
+
+        Args:
+            attributes: 取得する属性（キーと必須フィールドは常に含む）。Noneの場合は全属性
+        """
         try:
             table_name = cls.table_name()
-            items = AWSClients().get_dynamodb().query_items(table_name, index_name, key_condition_expression, expression_attribute_values)
-            return [cls.from_item(item) for item in items if item]
+            pages = AWSClients.get_dynamodb().query_pages(
+                table_name,
+                index_name,
+                key_condition_expression,
+                expression_attribute_values,
+                filter_expression=filter_expression,
+                limit=limit,
+                **cls._projection_params(attributes)
+            )
+            for page in pages:
+                for item in page:
+                    yield cls.from_item(item)
+        except DynamoDBError:
+            raise
         except Exception as e:
             raise DynamoDBError(f"Failed to query items in DynamoDB: {str(e)}")
 
+    @classmethod
+    def _projection_params(cls, attributes: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        取得する属性からProjectionExpressionを組み立てる
+
+        モデルを復元できるよう、キーとデフォルト値のないフィールドは常に含める。
+        属性名は予約語と衝突しないようExpressionAttributeNamesで置き換える。
+        """
+        if not attributes:
+            return {}
+
+        required = [cls.partition_key_name(), cls.sort_key_name()]
+        required += [f.name for f in fields(cls) if f.default is MISSING and f.default_factory is MISSING]
+        names = list(dict.fromkeys(name for name in [*required, *attributes] if name))
+
+        return {
+            "projection_expression": ", ".join(f"#p{i}" for i in range(len(names))),
+            "expression_attribute_names": {f"#p{i}": name for i, name in enumerate(names)},
+        }
+
     @classmethod
     def _convert_to_dynamo_type(cls, value: Any) -> Dict:
         if value is None:
@@ -99,7 +318,9 @@ class DynamoDBModel(BaseModel):
             return cls._convert_to_dynamo_type(value.value)
         elif isinstance(value, dict):
             return {"M": cls.as_item(value)}
-        elif isinstance(value, (list, tuple, set)):
+        elif isinstance(value, (set, frozenset)) and value and all(isinstance(v, str) for v in value):
+            return {"SS": sorted(value)}
+        elif isinstance(value, (list, tuple, set, frozenset)):
             if not value:
                 return {"L": []}
             return {"L": [cls._convert_to_dynamo_type(v) for v in value]}
@@ -125,6 +346,8 @@ class DynamoDBModel(BaseModel):
                 return {k: cls._convert_from_dynamo_type(v) for k, v in type_value.items()}
             elif type_key == "L":
                 return [cls._convert_from_dynamo_type(v) for v in type_value]
+            elif type_key == "SS":
+                return set(type_value)
         return value
 
     @classmethod
@@ -146,11 +369,10 @@ class DynamoDBModel(BaseModel):
             return None
         
         try:
-            data = {
-                key: cls._convert_from_dynamo_type(value)
-                for key, value in item.items()
-            }
-
-            return cls(**data)
+            codec = ModelCodec.for_model(cls)
+            model = cls(**codec.decode(item))
+            # 変更検知用に読み込んだアイテムをそのまま記録（再エンコードしない。表現の違いは比較時に吸収する）
+            model._mark_persisted(item)
+            return model
         except Exception as e:
             raise DynamoDBError(f"Failed to convert DynamoDB item to model: {str(e)}")
\ No newline at end of file
@@ -1,10 +1,11 @@
 import uuid
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from dataclasses import dataclass
 from chalicelib.enums.job import JobStatus, JobType
 from chalicelib.config import Config
 from chalicelib.constants import PARENT_JOB_ID_NONE
 from chalicelib.models.dynamodb import DynamoDBModel
+from chalicelib.models.job_result import JobResultPointer
 from chalicelib.utils.time_util import TimeUtil
 
 @dataclass
@@ -16,17 +17,26 @@ class Job(DynamoDBModel):
     total_child_jobs: Optional[int] = None
     completed_child_jobs: Optional[int] = None
     failed_child_jobs: Optional[int] = None
+    finished_child_jobs: Optional[int] = None # 完了/失敗した子ジョブ数（ファンインの報告ごとに加算）
+    pending_child_jobs: Optional[int] = None # 未報告の子ジョブ数（ファンインの報告ごとに減算し、0になった報告が最後）
+    reported_child_job_ids: Optional[Set[str]] = None # ファンイン集計済みの子ジョブID（二重加算防止）
+    child_jobs: Optional[Dict[str, Any]] = None # 子ジョブのステータス射影 {child_job_id: {index, upload_id, status}}
     payload: Optional[str] = None
-    result: Optional[str] = None
+    result: Optional[str] = None # 直接参照せずget_result/set_resultを使う
+    result_ref: Optional[Dict[str, Any]] = None # S3に退避した結果への参照（JobResultPointer）
+    partial_soap_data: Optional[Dict[str, str]] = None # 生成中のSOAPのうち完成したセクション（親ジョブのみ）
+    telemetry: Optional[Dict[str, Any]] = None # Bedrock呼び出しの計測値（プロンプトID、トークン数、プロンプトキャッシュの読み書き）
+    events: Optional[List[Dict[str, Any]]] = None # 進捗イベントの履歴（親ジョブのみ。JobEventRepositoryで上限件数まで追記する。SOAPの内容は含めない）
     error: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     completed_at: Optional[str] = None
+    enqueued_at: Optional[str] = None # SQSに送信した日時（GENERATE_SOAPジョブのみ。未設定のPENDINGは作成後の送信に失敗したジョブ）
     ttl: Optional[int] = None
 
     @classmethod
     def table_name(cls):
-        return Config.get_aws_config()["DYNAMODB_JOB_TABLE"]
+        return Config.get_aws_settings().dynamodb_job_table
     
     @classmethod
     def partition_key_name(cls):
@@ -42,7 +52,35 @@ class Job(DynamoDBModel):
         if not self.parent_job_id:
             self.parent_job_id = PARENT_JOB_ID_NONE # GSIのソートキーに使うため、親ジョブがない場合は"NONE"を設定
 
-    def save(self):
+    @classmethod
+    def generate_soap_job_id(cls, parent_job_id: str) -> str:
+        """親ジョブごとに一意に決まるGENERATE_SOAPジョブのID"""
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{parent_job_id}/{JobType.GENERATE_SOAP.value}"))
+
+    def get_result(self) -> Optional[str]:
+        """ジョブ結果を取得（S3に退避されている場合は初回アクセス時に読み込む）"""
+        if self.result is not None or not self.result_ref:
+            return self.result
+
+        if "_loaded_result" not in self.__dict__:
+            self.__dict__["_loaded_result"] = JobResultPointer.from_dict(self.result_ref).load()
+        return self.__dict__["_loaded_result"]
+
+    def set_result(self, result: Optional[str]) -> None:
+        """ジョブ結果を設定（閾値を超える場合はS3に圧縮して保存し、参照のみを保持する）"""
+        self.__dict__.pop("_loaded_result", None)
+
+        if result is not None and len(result.encode("utf-8")) > Config.get_aws_settings().job_result_inline_max_bytes:
+            pointer = JobResultPointer.store(self.job_id, result)
+            self.result = None
+            self.result_ref = pointer.to_dict()
+            self.__dict__["_loaded_result"] = result
+            return
+
+        self.result = result
+        self.result_ref = None
+
+    def _prepare_for_save(self) -> None:
+        super()._prepare_for_save()
         if not self.ttl:
-            self.ttl = int(TimeUtil.timestamp() + Config.get_aws_config()['DYNAMODB_JOB_TTL_SECONDS'])
-        return super().save()
\ No newline at end of file
+            self.ttl = int(TimeUtil.timestamp() + Config.get_aws_settings().dynamodb_job_ttl_seconds)
\ No newline at end of file
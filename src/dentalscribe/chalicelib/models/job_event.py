@@ -0,0 +1,69 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from chalicelib.enums.job import JobEventType, JobStatus
+
+
+@dataclass
+class JobEvent:
+    """
+    ジョブの進捗イベント
+
+    親ジョブのeventsに追記順で保存し、リスト上の位置（1始まり）をイベントIDとする。
+    """
+
+    TERMINAL_EVENT_TYPES = {
+        JobStatus.COMPLETED: JobEventType.JOB_COMPLETED.value,
+        JobStatus.FAILED: JobEventType.JOB_FAILED.value,
+    }
+    event_id: int
+    event_type: str
+    data: Dict[str, Any]
+    created_at: str
+
+    @classmethod
+    def from_dict(cls, event_id: int, dict_data: Dict[str, Any]) -> 'JobEvent':
+        return cls(
+            event_id=event_id,
+            event_type=dict_data.get("type", ""),
+            data=dict_data.get("data") or {},
+            created_at=dict_data.get("created_at", ""),
+        )
+
+    @classmethod
+    def list_since(
+        cls,
+        events: List[Dict[str, Any]],
+        last_event_id: int,
+        job_status: JobStatus,
+        error: Optional[str] = None
+    ) -> List['JobEvent']:
+        """
+        last_event_idより後のイベント
+
+        ジョブが完了/失敗しているのに終了のイベントがない場合（発行の失敗・件数の上限など）は、
+        ジョブのステータスから終了のイベントを補い、クライアントが再接続し続けないようにする。
+        """
+        found = [
+            cls.from_dict(index + 1, event)
+            for index, event in enumerate(events)
+            if index + 1 > last_event_id
+        ]
+
+        terminal_event_type = cls.TERMINAL_EVENT_TYPES.get(job_status)
+        if terminal_event_type and all(event.get("type") != terminal_event_type for event in events):
+            event_id = len(events) + 1
+            if event_id > last_event_id:
+                data = {"error": error} if job_status == JobStatus.FAILED and error else {}
+                found.append(cls(event_id=event_id, event_type=terminal_event_type, data=data, created_at=""))
+        return found
+
+    @property
+    def is_terminal(self) -> bool:
+        """ジョブの完了/失敗のイベントか（以降のイベントはない）"""
+        return self.event_type in self.TERMINAL_EVENT_TYPES.values()
+
+    def to_sse(self) -> str:
+        """Server-Sent Events形式のフレーム"""
+        data = json.dumps({**self.data, "created_at": self.created_at}, ensure_ascii=False)
+        return f"id: {self.event_id}\nevent: {self.event_type}\ndata: {data}\n\n"
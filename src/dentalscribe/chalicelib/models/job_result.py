@@ -0,0 +1,47 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from chalicelib.clients.aws import AWSClients
+from chalicelib.config import Config
+from chalicelib.constants import JOB_RESULT_KEY_PREFIX
+from chalicelib.exceptions import S3Error
+from chalicelib.models.base import BaseModel
+
+
+@dataclass
+class JobResultPointer(BaseModel):
+    """S3に退避したジョブ結果への参照（Job.result_refとして保存）"""
+    bucket: str
+    key: str
+    sha256: str
+    size: int # 圧縮前のバイト数
+    compressed_size: int
+    encoding: str = "gzip"
+
+    @classmethod
+    def store(cls, job_id: str, result: str) -> 'JobResultPointer':
+        """ジョブ結果をgzip圧縮してS3に保存し、参照を返す"""
+        data = result.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        compressed = gzip.compress(data)
+
+        pointer = cls(
+            bucket=Config.get_aws_settings().s3_bucket,
+            # 内容のハッシュをキーに含め、書き換え中に古い参照が別の内容を指さないようにする
+            key=f"{JOB_RESULT_KEY_PREFIX}{job_id}/{sha256}.json.gz",
+            sha256=sha256,
+            size=len(data),
+            compressed_size=len(compressed),
+        )
+        AWSClients.get_s3().put_object(pointer.bucket, pointer.key, compressed, "application/gzip")
+        return pointer
+
+    def load(self) -> str:
+        """S3からジョブ結果を取得し、ハッシュを検証して返す"""
+        compressed = AWSClients.get_s3().get_object(self.bucket, self.key)
+        data = gzip.decompress(compressed) if self.encoding == "gzip" else compressed
+
+        if hashlib.sha256(data).hexdigest() != self.sha256:
+            raise S3Error(f"Job result checksum mismatch: s3://{self.bucket}/{self.key}")
+        return data.decode("utf-8")
@@ -0,0 +1,64 @@
+import json
+from dataclasses import dataclass
+from typing import List, Optional
+from chalicelib.constants import BEDROCK_SOAP_DEFAULT_MAX_TOKENS
+
+
+@dataclass(frozen=True)
+class SoapRoute:
+    """
+    SOAP生成のルーティングのルール（文字起こしの見積もりトークン数 → モデルと出力トークン数の上限）
+
+    max_input_tokens以下の文字起こしに適用する。max_input_tokensがNoneのルールは既定のルール（上限なし）とする。
+    model_idがNoneの場合はBEDROCK_MODEL_ID（BEDROCK_ENDPOINTSの呼び出し先）を使用する。
+    model_idを指定した場合は、既定の呼び出し先の各リージョンのそのモデルを優先し、既定の呼び出し先をフォールバックとする。
+    endpoints（「リージョン/モデルID」のカンマ区切り、優先順）を指定した場合はその呼び出し先を使用する。
+    """
+    max_tokens: int
+    model_id: Optional[str] = None
+    max_input_tokens: Optional[int] = None
+    endpoints: Optional[str] = None
+
+    @property
+    def uses_default_endpoints(self) -> bool:
+        """既定の呼び出し先（BEDROCK_ENDPOINTS / BEDROCK_MODEL_ID）のみを使うか"""
+        return self.model_id is None and self.endpoints is None
+
+    @property
+    def is_default(self) -> bool:
+        return self.max_input_tokens is None
+
+    @classmethod
+    def default(cls) -> 'SoapRoute':
+        return cls(max_tokens=BEDROCK_SOAP_DEFAULT_MAX_TOKENS)
+
+    @classmethod
+    def parse_rules(cls, value: str) -> List['SoapRoute']:
+        """
+        ルールのJSON（配列）を、max_input_tokensの昇順に並べ、既定のルールを末尾に加えたリストにする
+
+        Example:
+            [{"max_input_tokens": 4000, "model_id": "jp.anthropic.claude-haiku-4-5-20251001-v1:0", "max_tokens": 2048},
+             {"max_input_tokens": 12000, "max_tokens": 3072},
+             {"max_input_tokens": 20000, "endpoints": "ap-northeast-1/jp.anthropic.claude-sonnet-4-5-20250929-v1:0,us-west-2/us.anthropic.claude-sonnet-4-5-20250929-v1:0"}]
+        """
+        routes = []
+        for rule in json.loads(value) if value else []:
+            if not isinstance(rule, dict) or not isinstance(rule.get("max_input_tokens"), int):
+                raise ValueError(f"Invalid SOAP route (max_input_tokens is required): {rule!r}")
+            routes.append(cls(
+                max_tokens=int(rule.get("max_tokens", BEDROCK_SOAP_DEFAULT_MAX_TOKENS)),
+                model_id=rule.get("model_id") or None,
+                max_input_tokens=rule["max_input_tokens"],
+                endpoints=rule.get("endpoints") or None,
+            ))
+        routes.sort(key=lambda route: route.max_input_tokens)
+        return routes + [cls.default()]
+
+    @staticmethod
+    def select(routes: List['SoapRoute'], estimated_tokens: int) -> 'SoapRoute':
+        """見積もりトークン数が収まる最初のルール"""
+        for route in routes:
+            if route.is_default or estimated_tokens <= route.max_input_tokens:
+                return route
+        return SoapRoute.default()
@@ -0,0 +1,22 @@
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from chalicelib.models.base import BaseModel
+from chalicelib.utils.transcript import TranscriptUtil
+
+
+@dataclass
+class CompactTranscript(BaseModel):
+    """Transcribe結果（transcript.json）から必要な情報だけを抜き出した派生データ"""
+    text: str
+    speaker_turns: List[Dict[str, Any]] = field(default_factory=list)
+    duration: float = 0.0
+
+    @classmethod
+    def from_transcribe_result(cls, transcribe_result: Dict[str, Any], language_code: Optional[str] = None) -> 'CompactTranscript':
+        """TranscribeのJSON結果から生成"""
+        separator = TranscriptUtil.word_separator(language_code)
+        return cls(
+            text=TranscriptUtil.extract_text(transcribe_result),
+            speaker_turns=TranscriptUtil.build_speaker_turns(transcribe_result, separator),
+            duration=TranscriptUtil.get_duration(transcribe_result),
+        )
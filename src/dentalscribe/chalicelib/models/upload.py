@@ -0,0 +1,36 @@
+from typing import Optional
+from dataclasses import dataclass
+from chalicelib.enums.upload import UploadStatus
+from chalicelib.config import Config
+from chalicelib.models.dynamodb import DynamoDBModel
+from chalicelib.utils.time_util import TimeUtil
+
+@dataclass
+class Upload(DynamoDBModel):
+    upload_id: str
+    s3_key: str
+    upload_status: UploadStatus | str
+    content_type: Optional[str] = None
+    original_filename: Optional[str] = None
+    size: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    stored_at: Optional[str] = None
+    ttl: Optional[int] = None
+
+    @classmethod
+    def table_name(cls):
+        return Config.get_aws_settings().dynamodb_upload_table
+
+    @classmethod
+    def partition_key_name(cls):
+        return "upload_id"
+
+    def __post_init__(self):
+        if isinstance(self.upload_status, str):
+            self.upload_status = UploadStatus(self.upload_status)
+
+    def _prepare_for_save(self) -> None:
+        super()._prepare_for_save()
+        if not self.ttl:
+            self.ttl = int(TimeUtil.timestamp() + Config.get_aws_settings().dynamodb_upload_ttl_seconds)
@@ -1,8 +1,23 @@
 from typing import Dict, Any
 
 class BasePrompt:
-    def __init__(self, template: str):
+    """
+    プロンプトの定義
+
+    system_template には呼び出しごとに変わらない指示（スキーマ等）を、
+    template には呼び出しごとに変わる入力（文字起こし等）を記述する。
+    """
+    name: str = ""
+    version: str = ""
+    # Trueの場合、スキーマをツールとして渡し、応答をツールの入力（構造化出力）として受け取る
+    output_tool: bool = False
+
+    def __init__(self, template: str, system_template: str = ""):
         self.template = template
+        self.system_template = system_template
     
     def format(self, **kwargs) -> str:
         return self.template.format(**kwargs)
+
+    def format_system(self, **kwargs) -> str:
+        return self.system_template.format(**kwargs)
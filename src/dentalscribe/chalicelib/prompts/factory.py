@@ -1,17 +1,65 @@
-from typing import Dict, Any
 import json
-from chalicelib.prompts.voice2soap import Voice2SoapPrompt
+from typing import Any, Dict, List, Optional
+from chalicelib.prompts.registry import PromptRegistry, RenderedPrompt
+from chalicelib.prompts.voice2soap import (
+    Voice2SoapPrompt,
+    Voice2SoapExtractPrompt,
+    Voice2SoapMergePrompt,
+    Voice2SoapRepairPrompt,
+)
 from chalicelib.prompts.schemas.voice2soap import Voice2SoapSchema
 
 
+PromptRegistry.register(Voice2SoapPrompt, Voice2SoapSchema)
+PromptRegistry.register(Voice2SoapExtractPrompt, Voice2SoapSchema)
+PromptRegistry.register(Voice2SoapMergePrompt, Voice2SoapSchema)
+PromptRegistry.register(Voice2SoapRepairPrompt, Voice2SoapSchema)
+
+
 class PromptFactory:
     @staticmethod
-    def create_voice2soap_prompt(voice_record: str) -> str:
-        prompt = Voice2SoapPrompt()
-        schema_instance = Voice2SoapSchema()
-        schema_json = json.dumps(schema_instance.schema, ensure_ascii=False, indent=2)
-        
-        return prompt.format(
-            voice_record=voice_record,
-            schema=schema_json
+    def create_voice2soap_prompt(voice_record: str) -> RenderedPrompt:
+        return PromptRegistry.get(Voice2SoapPrompt.name).render(voice_record=voice_record)
+
+    @staticmethod
+    def create_voice2soap_extract_prompt(voice_record: str, part: int, total_parts: int) -> RenderedPrompt:
+        return PromptRegistry.get(Voice2SoapExtractPrompt.name).render(
+            voice_record=voice_record, part=part, total_parts=total_parts
+        )
+
+    @staticmethod
+    def create_voice2soap_merge_prompt(partial_results: List[Dict[str, Any]]) -> RenderedPrompt:
+        partial_results_text = "\n".join(
+            f'<partial_soap part="{part}">{json.dumps(result, ensure_ascii=False)}</partial_soap>'
+            for part, result in enumerate(partial_results, start=1)
         )
+        return PromptRegistry.get(Voice2SoapMergePrompt.name).render(partial_results=partial_results_text)
+
+    @staticmethod
+    def create_voice2soap_repair_prompt(
+        sections: List[str], broken_output: str, voice_record: Optional[str] = None
+    ) -> RenderedPrompt:
+        """
+        壊れた項目のみを修復するプロンプト（ツールは修復する項目のみの定義に差し替える）
+
+        Args:
+            voice_record: 内容が失われた項目がある場合のみ渡す（形式の修復のみの場合は送らない）
+        """
+        prompt = PromptRegistry.get(Voice2SoapRepairPrompt.name).render(
+            sections=", ".join(sections),
+            broken_output=broken_output,
+            voice_record=f"\n<voice_record>{voice_record}</voice_record>" if voice_record else "",
+        )
+        return RenderedPrompt(
+            prompt_id=prompt.prompt_id,
+            system=prompt.system,
+            user=prompt.user,
+            tool=Voice2SoapSchema.to_tool(sections),
+        )
+
+    @staticmethod
+    def voice2soap_map_reduce_prompt_id() -> str:
+        """分割生成（抽出＋統合）のプロンプトのバージョン（生成結果のキャッシュキーに使う）"""
+        extract = PromptRegistry.get(Voice2SoapExtractPrompt.name)
+        merge = PromptRegistry.get(Voice2SoapMergePrompt.name)
+        return f"{extract.prompt_id}+{merge.prompt_id}"
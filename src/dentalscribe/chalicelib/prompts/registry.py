@@ -0,0 +1,81 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Type
+from chalicelib.prompts.base import BasePrompt
+from chalicelib.prompts.schemas.base import BaseSchema
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """Bedrockに渡すプロンプト（systemはプロンプトキャッシュの対象。toolは構造化出力のツール定義）"""
+    prompt_id: str
+    system: str
+    user: str
+    tool: Optional[Dict[str, Any]] = None
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """システムプロンプトを組み立て済みのプロンプト（プロセス内で使い回す）"""
+    name: str
+    version: str
+    system: str
+    template: str
+    tool: Optional[Dict[str, Any]] = None
+
+    @property
+    def prompt_id(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def render(self, **kwargs) -> RenderedPrompt:
+        return RenderedPrompt(
+            prompt_id=self.prompt_id, system=self.system, user=self.template.format(**kwargs), tool=self.tool
+        )
+
+
+class PromptRegistry:
+    """
+    プロンプトのバージョンごとの登録と、初回取得時のコンパイル
+
+    スキーマのシリアライズとシステムプロンプトの組み立てはプロンプトのバージョンにつき1回だけ行う。
+    同じ内容のシステムプロンプトを送り続けることで、Bedrockのプロンプトキャッシュが効く。
+    """
+
+    _prompts: Dict[Tuple[str, str], Tuple[Type[BasePrompt], Optional[Type[BaseSchema]]]] = {}
+    _default_versions: Dict[str, str] = {}
+    _compiled: Dict[Tuple[str, str], CompiledPrompt] = {}
+
+    @classmethod
+    def register(cls, prompt_class: Type[BasePrompt], schema_class: Optional[Type[BaseSchema]] = None, default: bool = True) -> None:
+        key = (prompt_class.name, prompt_class.version)
+        cls._prompts[key] = (prompt_class, schema_class)
+        cls._compiled.pop(key, None)
+        if default:
+            cls._default_versions[prompt_class.name] = prompt_class.version
+
+    @classmethod
+    def get(cls, name: str, version: Optional[str] = None) -> CompiledPrompt:
+        """プロンプトを取得（versionを省略した場合は既定のバージョン）"""
+        version = version or cls._default_versions.get(name)
+        key = (name, version)
+
+        compiled = cls._compiled.get(key)
+        if compiled is None:
+            if key not in cls._prompts:
+                raise ValueError(f"Prompt not registered: {name}@{version}")
+            compiled = cls._compile(*cls._prompts[key])
+            cls._compiled[key] = compiled
+        return compiled
+
+    @staticmethod
+    def _compile(prompt_class: Type[BasePrompt], schema_class: Optional[Type[BaseSchema]]) -> CompiledPrompt:
+        prompt = prompt_class()
+        schema_json = json.dumps(schema_class.schema, ensure_ascii=False, indent=2) if schema_class else ""
+        tool = schema_class.to_tool() if schema_class and prompt.output_tool else None
+        return CompiledPrompt(
+            name=prompt.name,
+            version=prompt.version,
+            system=prompt.format_system(schema=schema_json, tool_name=tool["name"] if tool else "").strip(),
+            template=prompt.template,
+            tool=tool,
+        )
@@ -1,5 +1,22 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from aws_lambda_powertools.utilities.validation import validate, SchemaValidationError
 
 class BaseSchema:
     schema: Dict[str, Any] = {}
+    # 構造化出力（ツールの入力）として要求する場合のツール名と説明
+    tool_name: str = ""
+    tool_description: str = ""
+
+    @classmethod
+    def to_tool(cls, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        スキーマをBedrock（Claude）のツール定義にする
+
+        Args:
+            fields: 指定した場合、そのプロパティのみを持つツールにする（一部の項目の修復用）
+        """
+        input_schema = {key: value for key, value in cls.schema.items() if key != "$schema"}
+        if fields is not None:
+            input_schema["properties"] = {field: input_schema["properties"][field] for field in fields}
+            input_schema["required"] = list(fields)
+        return {"name": cls.tool_name, "description": cls.tool_description, "input_schema": input_schema}
@@ -1,6 +1,8 @@
 from chalicelib.prompts.schemas.base import BaseSchema
 
 class Voice2SoapSchema(BaseSchema):
+    tool_name = "record_soap"
+    tool_description = "歯科の診察記録をSOAP形式で整理した結果を記録する"
     schema = {
         "$schema": "http://json-schema.org/draft-07/schema#",
         "type": "object",
@@ -1,15 +1,8 @@
 from chalicelib.prompts.base import BasePrompt
-from chalicelib.constants import BEDROCK_JSON_DELIMITER
+from chalicelib.constants import TRANSCRIPT_LOW_CONFIDENCE_MARK
 
-class Voice2SoapPrompt(BasePrompt):
-    def __init__(self):
-        template = f"""
-あなたは歯科医療の専門知識を持つアシスタントです。
-以下voice_recordタグ内の歯科医師の診察記録をSOAP形式で整理してください。
-
-<voice_record>{{voice_record}}</voice_record>
-
-【重要な処理ルール】
+# SOAPの各項目に記載する内容（抽出・統合のプロンプトでも共通）
+SOAP_GUIDELINES = """【重要な処理ルール】
 1. この文章は音声ファイルの文字起こし結果です
 2. 聞き取り不良で成立していない箇所がある場合、過度な変更でなければ文脈が通るように変換・補完してください
 3. **絶対にハルシネーション（事実にない情報の追加）は行わないでください**
@@ -43,16 +36,112 @@ class Voice2SoapPrompt(BasePrompt):
 - 次回予約・フォローアップ計画
 - 専門医紹介の必要性
 
-※ 音声認識の不備により情報が不完全な場合は、その旨を明記してください
+※ 音声認識の不備により情報が不完全な場合は、その旨を明記してください"""
+
+# 文字起こしの形式（話者ターンごとの行。話者ラベルがない録音は文字起こし全体が1行になる）
+TRANSCRIPT_FORMAT = f"""【文字起こしの形式】
+- 話者を識別できた場合、各行は「話者ラベル: 発話」の形式です。話者ラベル（spk_0、spk_1など）は話者ごとに異なります
+- 複数の録音ファイルを結合した場合、話者ラベルには録音ファイルの番号が付きます（file1:spk_0、file2:spk_0など）。話者ラベルは録音ファイルごとに振られるため、異なるファイルの同じspk番号が同じ人物とは限りません
+- 話者ラベルは歯科医師・患者・スタッフなどの役割を表しません。発話の内容から誰の発話かを判断してください
+- 話者ラベルに「{TRANSCRIPT_LOW_CONFIDENCE_MARK}」が付いた発話は音声認識の信頼度が低いため、内容を慎重に扱ってください"""
+
+# 結果はスキーマをツールとして渡し、ツールの入力として受け取る（デリミターでの抽出は行わない）
+OUTPUT_FORMAT = """結果は必ず{tool_name}ツールの入力として、ツールのスキーマに正確に従って出力してください。"""
+
+
+class Voice2SoapPrompt(BasePrompt):
+    name = "voice2soap"
+    version = "v5" # v2: 固定の指示とスキーマをシステムプロンプトに分離し、文字起こしを最後に置く / v3: ツールによる構造化出力 / v4: 話者ターン形式の文字起こし / v5: 録音ファイル番号付きの話者ラベル
+    output_tool = True
+
+    def __init__(self):
+        system_template = f"""
+あなたは歯科医療の専門知識を持つアシスタントです。
+ユーザーメッセージのvoice_recordタグ内の歯科医師の診察記録をSOAP形式で整理してください。
+
+{SOAP_GUIDELINES}
+
+{TRANSCRIPT_FORMAT}
+
+{OUTPUT_FORMAT}
+"""
+        template = """<voice_record>{voice_record}</voice_record>"""
+        super().__init__(template, system_template)
+
+
+class Voice2SoapExtractPrompt(BasePrompt):
+    """長い診察記録を分割したパートごとに、SOAPの各項目に該当する情報を抽出する（map）"""
+    name = "voice2soap_extract"
+    version = "v4" # v2: ツールによる構造化出力 / v3: 話者ターン形式の文字起こし / v4: 録音ファイル番号付きの話者ラベル
+    output_tool = True
+
+    def __init__(self):
+        system_template = f"""
+あなたは歯科医療の専門知識を持つアシスタントです。
+ユーザーメッセージのvoice_recordタグ内は、長い診察記録を分割したパートの1つです。
+このパートに含まれる情報のみを、SOAP形式の各項目に整理してください。
+後で他のパートの結果と統合するため、このパートに該当する情報がない項目は空文字にしてください。
+
+{SOAP_GUIDELINES}
+
+{TRANSCRIPT_FORMAT}
+
+{OUTPUT_FORMAT}
+"""
+        template = """<voice_record part="{part}/{total_parts}">{voice_record}</voice_record>"""
+        super().__init__(template, system_template)
+
+
+class Voice2SoapMergePrompt(BasePrompt):
+    """パートごとの抽出結果を1つのSOAPに統合する（reduce）"""
+    name = "voice2soap_merge"
+    version = "v2" # v2: ツールによる構造化出力
+    output_tool = True
+
+    def __init__(self):
+        system_template = f"""
+あなたは歯科医療の専門知識を持つアシスタントです。
+ユーザーメッセージのpartial_soapタグ内は、1回の診察記録を分割したパートごとにSOAP形式で整理した結果です（partの番号が時系列順）。
+これらを1つのSOAPに統合してください。
+
+【統合のルール】
+1. 複数のパートに重複する情報は1つにまとめてください
+2. パート間で内容が食い違う場合は、後のパートの情報を優先してください
+3. **partial_soapにない情報は絶対に追加しないでください**
+4. すべてのパートで空の項目は「情報なし」としてください
+
+{SOAP_GUIDELINES}
+
+{OUTPUT_FORMAT}
+"""
+        template = """{partial_results}"""
+        super().__init__(template, system_template)
+
+
+class Voice2SoapRepairPrompt(BasePrompt):
+    """
+    形式が壊れた（JSONとして不正・スキーマに不適合・途中で打ち切られた）項目のみを修復する
+
+    ツールは修復する項目のみを持つ定義を呼び出し側で渡す。
+    """
+    name = "voice2soap_repair"
+    version = "v3" # v2: 話者ターン形式の文字起こし / v3: 録音ファイル番号付きの話者ラベル
+    output_tool = True
+
+    def __init__(self):
+        system_template = f"""
+あなたは歯科医療の専門知識を持つアシスタントです。
+ユーザーメッセージのbroken_outputタグ内は、歯科医師の診察記録をSOAP形式で整理した結果のうち、形式が壊れた部分です。
+sectionsタグで指定した項目のみを修復してください。
+broken_outputに内容が残っている項目は、内容を変えずに形式のみを修復してください。
+broken_outputに内容がない項目と途中で打ち切られた項目は、voice_recordタグ内の診察記録から作成・補完してください。
 
-最後にjsonスキーマを<schema>タグ内でお渡しします。このスキーマに正確に従って、json形式で分割結果を出力してください。
-JSON結果は必ず{BEDROCK_JSON_DELIMITER}で囲んで出力してください。
+{SOAP_GUIDELINES}
 
-<schema>{{schema}}</schema>
+{TRANSCRIPT_FORMAT}
 
-{BEDROCK_JSON_DELIMITER}
-ここにJSON結果を出力
-{BEDROCK_JSON_DELIMITER}
+{OUTPUT_FORMAT}
 """
-        super().__init__(template)
-        
\ No newline at end of file
+        template = """<sections>{sections}</sections>
+<broken_output>{broken_output}</broken_output>{voice_record}"""
+        super().__init__(template, system_template)
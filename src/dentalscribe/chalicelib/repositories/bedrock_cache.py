@@ -0,0 +1,42 @@
+from typing import Optional
+from chalicelib.models.bedrock_cache import BedrockCacheEntry
+from chalicelib.clients.aws import AWSClients
+from chalicelib.config import Config
+
+
+class BedrockCacheRepository:
+    @staticmethod
+    def enabled() -> bool:
+        """キャッシュテーブルが設定されている場合のみ有効"""
+        return bool(Config.get_aws_settings().dynamodb_bedrock_cache_table)
+
+    @staticmethod
+    def find(cache_key: str) -> Optional[BedrockCacheEntry]:
+        """有効期限内のキャッシュを取得"""
+        entry = BedrockCacheEntry.find({BedrockCacheEntry.partition_key_name(): {"S": cache_key}})
+        if not entry or entry.is_expired():
+            return None
+        return entry
+
+    @staticmethod
+    def save(entry: BedrockCacheEntry) -> None:
+        """キャッシュを保存（同じキーのキャッシュは上書きする）"""
+        entry.save()
+
+    @staticmethod
+    def record_hit(cache_key: str) -> None:
+        AWSClients.get_dynamodb().update_item(
+            table_name=BedrockCacheEntry.table_name(),
+            key={BedrockCacheEntry.partition_key_name(): {"S": cache_key}},
+            update_expression="ADD hit_count :one",
+            expression_attribute_values={":one": {"N": "1"}},
+            condition_expression="attribute_exists(cache_key)",
+        )
+
+    @staticmethod
+    def invalidate(cache_key: str) -> None:
+        """キャッシュを削除（存在しない場合も成功とする）"""
+        AWSClients.get_dynamodb().delete_item(
+            BedrockCacheEntry.table_name(),
+            {BedrockCacheEntry.partition_key_name(): {"S": cache_key}},
+        )
@@ -2,57 +2,245 @@ from typing import Dict, Any, Optional, List
 from chalicelib.models.job import Job
 from chalicelib.clients.aws import AWSClients
 from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.exceptions import ConditionalCheckFailedError
+from chalicelib.utils.time_util import TimeUtil
+from chalicelib.constants import JOB_TREE_TRANSACTION_MAX_ITEMS
+from botocore.exceptions import ClientError
 
 
 class JobRepository:
+    # 子ジョブ一覧の表示・集約に必要な属性（result等の大きな属性は取得しない）
+    CHILD_JOB_SUMMARY_ATTRIBUTES = ["job_id", "parent_job_id", "job_status", "payload", "created_at", "updated_at"]
+
+    @staticmethod
+    def find(job_id: str, consistent_read: bool = False):
+        return Job.find({Job.partition_key_name(): {"S": job_id}}, consistent_read=consistent_read)
+
     @staticmethod
-    def find(job_id: str):
-        return Job.find({Job.partition_key_name(): {"S": job_id}})
+    def create_if_not_exists(job: Job) -> bool:
+        """同じjob_idのジョブが存在しない場合のみ作成。作成できた場合はTrue"""
+        try:
+            job.save(condition_expression="attribute_not_exists(job_id)")
+            return True
+        except ConditionalCheckFailedError:
+            return False
 
     @staticmethod
-    def find_by_job_type(job_type: JobType) -> List[Dict[str, Any]]:
+    def create_job_tree(parent_job: Job, child_jobs: List[Job]) -> None:
+        """
+        親ジョブと子ジョブをまとめて作成
+
+        件数が少ない場合はトランザクションで全件成功または全件失敗とし、
+        中途半端なジョブツリーが残らないようにする。
+        件数が多い場合はBatchWriteItemで子ジョブを書き込んだ後に親ジョブを作成する
+        （子ジョブの書き込みに失敗した場合、親ジョブは作成されない）。
+        """
+        jobs = [parent_job, *child_jobs]
+
+        if len(jobs) <= JOB_TREE_TRANSACTION_MAX_ITEMS:
+            Job.save_all(jobs, transactional=True, condition_expression="attribute_not_exists(job_id)")
+            return
+
+        Job.save_all(child_jobs)
+        parent_job.save()
+
+    @staticmethod
+    def find_by_job_type(job_type: JobType, attributes: Optional[List[str]] = None) -> List[Job]:
         index_name = "job_type-index"
         return Job.filter(
-            index_name, {"job_type": {"S": job_type.value}}
+            index_name, {"job_type": {"S": job_type.value}}, attributes=attributes
         )
     
     @staticmethod
-    def find_by_parent_job_id(parent_job_id: str, job_type: Optional[JobType] = None) -> List[Job]:
+    def find_by_parent_job_id(parent_job_id: str, job_type: Optional[JobType] = None, attributes: Optional[List[str]] = None) -> List[Job]:
         index_name = "parent_job_id-index"
-        raw_jobs = Job.filter(
-            index_name, {"parent_job_id": {"S": parent_job_id}}
-        )
-        
-        # job_typeでフィルタリングが必要な場合
+        key_condition_expression = "parent_job_id = :parent_job_id"
+        expression_attribute_values = {":parent_job_id": {"S": parent_job_id}}
+        filter_expression = None
+
+        # job_typeでフィルタリングが必要な場合（DynamoDB側で絞り込む）
         if job_type is not None:
-            filtered_jobs = [job for job in raw_jobs if job.job_type == job_type]
-            return filtered_jobs
-        
-        return raw_jobs
+            filter_expression = "job_type = :job_type"
+            expression_attribute_values[":job_type"] = {"S": job_type.value}
+
+        return list(Job.query(
+            index_name,
+            key_condition_expression,
+            expression_attribute_values,
+            attributes=attributes,
+            filter_expression=filter_expression,
+        ))
     
     @staticmethod
-    def increment_child_job_count(job_id: str, child_job_status: JobStatus):
-        job = Job.find({Job.partition_key_name(): {"S": job_id}})
-        if not job:
-            raise Exception(f"Job not found: {job_id}")
-        
-        if not job.total_child_jobs:
-            raise Exception(f"Job has no child jobs: {job_id}")
-        
-        client = AWSClients().get_dynamodb()
+    def increment_child_job_count(job_id: str, child_job_id: str, child_job_status: JobStatus) -> Optional[Dict[str, int]]:
+        """
+        子ジョブの完了/失敗件数を1回のUpdateItemでアトミックに加算し、加算後の集計値を返す
 
+        同じ子ジョブの二重報告（S3イベントの重複配信など）は条件式で弾き、その場合はNoneを返す。
+        親ジョブが存在しない場合もNoneを返す。
+        子ジョブのステータス射影（child_jobs）も同じUpdateItemで更新し、更新した値（UPDATED_NEW）のみを受け取る。
+        報告のたびに必ず変わる件数（finished_child_jobs / pending_child_jobs）から、変わらない件数を求める。
+        射影を持たない旧形式の親ジョブの場合のみ、カウンタのみを更新する。
+
+        Returns:
+            加算後の集計値 {"completed_child_jobs", "failed_child_jobs", "total_child_jobs"}
+        """
         if child_job_status == JobStatus.COMPLETED:
-            update_expression = "SET completed_child_jobs = completed_child_jobs + :val"
+            counter_name = "completed_child_jobs"
         elif child_job_status == JobStatus.FAILED:
-            update_expression = "SET failed_child_jobs = failed_child_jobs + :val"
+            counter_name = "failed_child_jobs"
         else:
-            raise Exception(f"Invalid child job status: {child_job_status}")
-        
-        expression_attribute_values = {":val": {"N": "1"}}
+            raise ValueError(f"Invalid child job status: {child_job_status}")
+
+        client = AWSClients.get_dynamodb()
+        key = {Job.partition_key_name(): {"S": job_id}}
+        condition_expression = "attribute_exists(job_id) AND NOT contains(reported_child_job_ids, :child_job_id)"
+        expression_attribute_values = {
+            ":one": {"N": "1"},
+            ":child_job_ids": {"SS": [child_job_id]},
+            ":child_job_id": {"S": child_job_id},
+            ":updated_at": {"S": TimeUtil.now_str()},
+        }
+
+        try:
+            response = client.update_item(
+                table_name=Job.table_name(),
+                key=key,
+                update_expression=(
+                    f"ADD {counter_name} :one, finished_child_jobs :one, pending_child_jobs :minus_one, "
+                    "reported_child_job_ids :child_job_ids "
+                    "SET updated_at = :updated_at, child_jobs.#child_job_id.#status = :child_status"
+                ),
+                condition_expression=condition_expression + " AND attribute_exists(child_jobs)",
+                expression_attribute_values={
+                    **expression_attribute_values,
+                    ":minus_one": {"N": "-1"},
+                    ":child_status": {"S": child_job_status.value},
+                },
+                expression_attribute_names={"#child_job_id": child_job_id, "#status": "status"},
+                return_values="UPDATED_NEW",
+            )
+            attributes = response.get("Attributes", {})
+            counter = int(attributes[counter_name]["N"])
+            finished = int(attributes["finished_child_jobs"]["N"])
+            counts = {
+                counter_name: counter,
+                "total_child_jobs": finished + int(attributes["pending_child_jobs"]["N"]),
+            }
+            other_counter_name = "failed_child_jobs" if counter_name == "completed_child_jobs" else "completed_child_jobs"
+            counts[other_counter_name] = finished - counter
+            return counts
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+        # 射影（child_jobs）を持たない旧形式の親ジョブはカウンタのみ更新（重複報告・親ジョブなしはここでも失敗する）
+        try:
+            response = client.update_item(
+                table_name=Job.table_name(),
+                key=key,
+                update_expression=f"ADD {counter_name} :one, reported_child_job_ids :child_job_ids SET updated_at = :updated_at",
+                condition_expression=condition_expression + " AND attribute_not_exists(child_jobs)",
+                expression_attribute_values=expression_attribute_values,
+                return_values="ALL_NEW",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            raise
+
+        attributes = response.get("Attributes", {})
+        return {
+            name: int(attributes[name]["N"]) if name in attributes else 0
+            for name in ("completed_child_jobs", "failed_child_jobs", "total_child_jobs")
+        }
+
+    @staticmethod
+    def mark_enqueued(job_id: str) -> None:
+        """ジョブのメッセージをSQSに送信済みとして記録"""
+        now = TimeUtil.now_str()
+        AWSClients.get_dynamodb().update_item(
+            table_name=Job.table_name(),
+            key={Job.partition_key_name(): {"S": job_id}},
+            update_expression="SET enqueued_at = :now, updated_at = :now",
+            expression_attribute_values={":now": {"S": now}},
+        )
+
+    @staticmethod
+    def update_child_job_projection(job_id: str, child_job_id: str, child_job_status: JobStatus) -> None:
+        """
+        親ジョブが保持する子ジョブのステータス射影のみ更新
+
+        完了/失敗はincrement_child_job_countが同じ射影に書き込むため、遅れて届いた更新（IN_PROGRESSなど）で
+        完了/失敗の状態を上書きしないよう、射影が完了/失敗でない場合のみ更新する。
+        """
+        try:
+            AWSClients.get_dynamodb().update_item(
+                table_name=Job.table_name(),
+                key={Job.partition_key_name(): {"S": job_id}},
+                update_expression="SET child_jobs.#child_job_id.#status = :child_status, updated_at = :updated_at",
+                condition_expression=(
+                    "attribute_exists(child_jobs.#child_job_id) "
+                    "AND NOT child_jobs.#child_job_id.#status IN (:completed, :failed)"
+                ),
+                expression_attribute_values={
+                    ":child_status": {"S": child_job_status.value},
+                    ":updated_at": {"S": TimeUtil.now_str()},
+                    ":completed": {"S": JobStatus.COMPLETED.value},
+                    ":failed": {"S": JobStatus.FAILED.value},
+                },
+                expression_attribute_names={"#child_job_id": child_job_id, "#status": "status"},
+            )
+        except ClientError as e:
+            # 射影を持たない旧形式の親ジョブ・完了/失敗済みの子ジョブは更新対象外
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    @staticmethod
+    def update_partial_soap_data(job_id: str, partial_soap_data: Dict[str, str]) -> None:
+        """生成中のSOAPの完成済みセクションを親ジョブに書き込む（ポーリング中のクライアントに途中結果を返すため）"""
+        try:
+            AWSClients.get_dynamodb().update_item(
+                table_name=Job.table_name(),
+                key={Job.partition_key_name(): {"S": job_id}},
+                update_expression="SET partial_soap_data = :partial_soap_data, updated_at = :now",
+                expression_attribute_values={
+                    ":partial_soap_data": Job._convert_to_dynamo_type(partial_soap_data),
+                    ":now": {"S": TimeUtil.now_str()},
+                },
+                condition_expression="attribute_exists(job_id)",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return
+            raise
 
-        return client.update_item(
+    @staticmethod
+    def clear_partial_soap_data(job_id: str) -> None:
+        """生成途中のSOAPを親ジョブから削除する（別のルールで生成し直す場合に、前の生成の途中結果を残さないため）"""
+        AWSClients.get_dynamodb().update_item(
+            table_name=Job.table_name(),
+            key={Job.partition_key_name(): {"S": job_id}},
+            update_expression="REMOVE partial_soap_data SET updated_at = :now",
+            expression_attribute_values={":now": {"S": TimeUtil.now_str()}},
+        )
+
+    @staticmethod
+    def update_status(job_id: str, job_status: JobStatus, error: Optional[str] = None) -> None:
+        """ジョブ全体を書き換えずにステータスのみ更新"""
+        update_expression = "SET job_status = :job_status, updated_at = :updated_at"
+        expression_attribute_values = {
+            ":job_status": {"S": job_status.value},
+            ":updated_at": {"S": TimeUtil.now_str()},
+        }
+        if error is not None:
+            update_expression += ", #error = :error"
+            expression_attribute_values[":error"] = {"S": error}
+
+        AWSClients.get_dynamodb().update_item(
             table_name=Job.table_name(),
             key={Job.partition_key_name(): {"S": job_id}},
             update_expression=update_expression,
-            expression_attribute_values=expression_attribute_values
-        )
\ No newline at end of file
+            expression_attribute_values=expression_attribute_values,
+            expression_attribute_names={"#error": "error"} if error is not None else None,
+        )
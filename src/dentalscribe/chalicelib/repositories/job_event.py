@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from chalicelib.models.job import Job
+from chalicelib.models.job_event import JobEvent
+from chalicelib.clients.aws import AWSClients
+from chalicelib.enums.job import JobEventType, JobStatus
+from chalicelib.utils.time_util import TimeUtil
+from chalicelib.constants import JOB_EVENTS_MAX_EVENTS
+
+
+class JobEventRepository:
+    """親ジョブのeventsに進捗イベントを追記・取得するリポジトリ"""
+
+    @staticmethod
+    def append(job_id: str, event_type: JobEventType, data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        イベントを末尾に追記（list_appendのため、同時に追記されても失われない）
+
+        親ジョブの項目が大きくなり続けないよう、JOB_EVENTS_MAX_EVENTS件を超える分は追記しない。
+
+        Returns:
+            bool: ジョブが存在し、追記できた場合はTrue
+        """
+        event = {"type": event_type.value, "data": data or {}, "created_at": TimeUtil.now_str()}
+        try:
+            AWSClients.get_dynamodb().update_item(
+                table_name=Job.table_name(),
+                key={Job.partition_key_name(): {"S": job_id}},
+                update_expression="SET events = list_append(if_not_exists(events, :empty), :events)",
+                expression_attribute_values={
+                    ":empty": {"L": []},
+                    ":events": Job._convert_to_dynamo_type([event]),
+                    ":max_events": {"N": str(JOB_EVENTS_MAX_EVENTS)},
+                },
+                condition_expression="attribute_exists(job_id) AND (attribute_not_exists(events) OR size(events) < :max_events)",
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    @staticmethod
+    def exists(job_id: str) -> bool:
+        """ジョブが存在するか（キーのみ取得する）"""
+        item = AWSClients.get_dynamodb().get_item(
+            Job.table_name(),
+            {Job.partition_key_name(): {"S": job_id}},
+            projection_expression="job_id",
+        )
+        return bool(item)
+
+    @staticmethod
+    def find_since(job_id: str, last_event_id: int = 0) -> Optional[Tuple[JobStatus, List[JobEvent]]]:
+        """
+        last_event_idより後のイベントを取得（強整合性読み込み。ジョブのステータス・エラー・eventsのみ取得する）
+
+        Returns:
+            (ジョブのステータス, イベントのリスト)。ジョブが存在しない場合はNone。
+            完了/失敗したジョブに終了のイベントがない場合は、ステータスから補ったイベントを含む
+        """
+        item = AWSClients.get_dynamodb().get_item(
+            Job.table_name(),
+            {Job.partition_key_name(): {"S": job_id}},
+            consistent_read=True,
+            projection_expression="job_status, events, #error",
+            expression_attribute_names={"#error": "error"},
+        )
+        if not item:
+            return None
+
+        job_status = JobStatus(item["job_status"]["S"])
+        events = Job._convert_from_dynamo_type(item.get("events", {"L": []}))
+        error = item.get("error", {}).get("S")
+        return job_status, JobEvent.list_since(events, last_event_id, job_status, error)
+
+
+class InMemoryJobEventRepository:
+    """
+    JobEventRepositoryのメモリ上の代替（テスト・ローカル実行用）
+
+    ジョブのステータスは追記されたイベントから判定する。
+    """
+
+    TERMINAL_EVENT_STATUSES = {
+        JobEventType.JOB_COMPLETED.value: JobStatus.COMPLETED,
+        JobEventType.JOB_FAILED.value: JobStatus.FAILED,
+    }
+
+    def __init__(self):
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+
+    def create(self, job_id: str) -> None:
+        self._events.setdefault(job_id, [])
+
+    def append(self, job_id: str, event_type: JobEventType, data: Optional[Dict[str, Any]] = None) -> bool:
+        if job_id not in self._events or len(self._events[job_id]) >= JOB_EVENTS_MAX_EVENTS:
+            return False
+        self._events[job_id].append({"type": event_type.value, "data": data or {}, "created_at": TimeUtil.now_str()})
+        return True
+
+    def exists(self, job_id: str) -> bool:
+        return job_id in self._events
+
+    def find_since(self, job_id: str, last_event_id: int = 0) -> Optional[Tuple[JobStatus, List[JobEvent]]]:
+        if job_id not in self._events:
+            return None
+
+        events = self._events[job_id]
+        job_status = JobStatus.IN_PROGRESS
+        for event in events:
+            job_status = self.TERMINAL_EVENT_STATUSES.get(event["type"], job_status)
+
+        return job_status, JobEvent.list_since(events, last_event_id, job_status)
@@ -0,0 +1,83 @@
+import json
+import logging
+from typing import Optional
+from botocore.exceptions import ClientError
+from chalicelib.clients.aws import AWSClients
+from chalicelib.config import Config
+from chalicelib.models.transcript import CompactTranscript
+from chalicelib.utils.transcript import TranscriptUtil
+from chalicelib.constants import (
+    TRANSCRIPTION_DESTINATION_KEY_PREFIX,
+    TRANSCRIBE_DESTINATION_FILENAME,
+    TRANSCRIBE_COMPACT_FILENAME,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptRepository:
+    """Transcribe結果（S3）へのアクセス"""
+
+    @staticmethod
+    def raw_key(job_id: str) -> str:
+        return f"{TRANSCRIPTION_DESTINATION_KEY_PREFIX}{job_id}/{TRANSCRIBE_DESTINATION_FILENAME}"
+
+    @staticmethod
+    def compact_key(job_id: str) -> str:
+        return f"{TRANSCRIPTION_DESTINATION_KEY_PREFIX}{job_id}/{TRANSCRIBE_COMPACT_FILENAME}"
+
+    @staticmethod
+    def create_compact(job_id: str) -> CompactTranscript:
+        """transcript.jsonから軽量な派生データを生成し、同じディレクトリに保存"""
+        aws_settings = Config.get_aws_settings()
+        s3_client = AWSClients.get_s3()
+
+        transcribe_result = s3_client.get_json_object(aws_settings.s3_bucket, TranscriptRepository.raw_key(job_id))
+        compact = CompactTranscript.from_transcribe_result(transcribe_result, aws_settings.transcribe_language_code)
+
+        s3_client.put_object(
+            aws_settings.s3_bucket,
+            TranscriptRepository.compact_key(job_id),
+            json.dumps(compact.to_dict(), ensure_ascii=False).encode("utf-8"),
+            "application/json",
+        )
+        logger.info("Created compact transcript for job %s (text length: %d, turns: %d)",
+                    job_id, len(compact.text), len(compact.speaker_turns))
+        return compact
+
+    @staticmethod
+    def find_compact(job_id: str) -> Optional[CompactTranscript]:
+        """派生データを取得。存在しない場合はNone"""
+        try:
+            data = AWSClients.get_s3().get_json_object(Config.get_aws_settings().s3_bucket, TranscriptRepository.compact_key(job_id))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return CompactTranscript.from_dict(data)
+
+    @staticmethod
+    def get_compact(job_id: str) -> CompactTranscript:
+        """派生データを取得。存在しない場合はtranscript.jsonから生成する（保存はしない）"""
+        compact = TranscriptRepository.find_compact(job_id)
+        if compact:
+            return compact
+
+        logger.info("Compact transcript not found for job %s, building from %s", job_id, TRANSCRIBE_DESTINATION_FILENAME)
+        aws_settings = Config.get_aws_settings()
+        transcribe_result = AWSClients.get_s3().get_json_object(aws_settings.s3_bucket, TranscriptRepository.raw_key(job_id))
+        return CompactTranscript.from_transcribe_result(transcribe_result, aws_settings.transcribe_language_code)
+
+    @staticmethod
+    def get_text(job_id: str) -> str:
+        """文字起こしテキストを取得。派生データがない場合のみtranscript.jsonを読む"""
+        compact = TranscriptRepository.find_compact(job_id)
+        if compact:
+            return compact.text
+
+        logger.info("Compact transcript not found for job %s, falling back to %s", job_id, TRANSCRIBE_DESTINATION_FILENAME)
+        # 長時間の録音ではitemsが大きいため、全体を読み込まずに全文テキストだけを読み出す
+        text = AWSClients.get_s3().get_json_path(
+            Config.get_aws_settings().s3_bucket, TranscriptRepository.raw_key(job_id), TranscriptUtil.TEXT_PATH, default=""
+        )
+        return text or ""
@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional
+from botocore.exceptions import ClientError
+from chalicelib.models.upload import Upload
+from chalicelib.clients.aws import AWSClients
+from chalicelib.enums.upload import UploadStatus
+from chalicelib.exceptions import ConditionalCheckFailedError
+from chalicelib.utils.time_util import TimeUtil
+
+
+class UploadRepository:
+    @staticmethod
+    def find(upload_id: str) -> Optional[Upload]:
+        return Upload.find({Upload.partition_key_name(): {"S": upload_id}})
+
+    @staticmethod
+    def create_if_not_exists(upload: Upload) -> bool:
+        """同じupload_idの登録が存在しない場合のみ作成。作成できた場合はTrue"""
+        try:
+            upload.save(condition_expression="attribute_not_exists(upload_id)")
+            return True
+        except ConditionalCheckFailedError:
+            return False
+
+    @staticmethod
+    def find_many(upload_ids: List[str]) -> Dict[str, Upload]:
+        """複数のupload_idをBatchGetItemでまとめて取得（存在しないものは含まない）"""
+        keys = [{Upload.partition_key_name(): {"S": upload_id}} for upload_id in dict.fromkeys(upload_ids)]
+        items = AWSClients.get_dynamodb().batch_get_items(Upload.table_name(), keys)
+        uploads = [Upload.from_item(item) for item in items]
+        return {upload.upload_id: upload for upload in uploads if upload}
+
+    @staticmethod
+    def mark_stored(upload_id: str, size: Optional[int] = None, content_type: Optional[str] = None) -> bool:
+        """
+        アップロード完了を記録
+
+        Returns:
+            bool: 発行済みのアップロードが存在し、更新できた場合はTrue
+        """
+        now = TimeUtil.now_str()
+        update_expression = "SET upload_status = :upload_status, stored_at = :now, updated_at = :now"
+        expression_attribute_values = {
+            ":upload_status": {"S": UploadStatus.STORED.value},
+            ":now": {"S": now},
+        }
+        if size is not None:
+            update_expression += ", #size = :size"
+            expression_attribute_values[":size"] = {"N": str(size)}
+        if content_type:
+            update_expression += ", content_type = :content_type"
+            expression_attribute_values[":content_type"] = {"S": content_type}
+
+        try:
+            AWSClients.get_dynamodb().update_item(
+                table_name=Upload.table_name(),
+                key={Upload.partition_key_name(): {"S": upload_id}},
+                update_expression=update_expression,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(upload_id)",
+                expression_attribute_names={"#size": "size"} if size is not None else None,
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
@@ -26,6 +26,10 @@ class CreateVoice2SoapJobSchema(BaseSchema):
             "source_s3_key": {
                 "type": "string",
                 "description": "Direct S3 key to the voice file"
+            },
+            "bypass_cache": {
+                "type": "boolean",
+                "description": "Regenerate SOAP without reading the Bedrock result cache (the cache is overwritten)"
             }
         }
     }
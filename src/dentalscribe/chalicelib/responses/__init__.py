@@ -2,10 +2,12 @@ from chalicelib.responses.get_voice_upload_url import GetVoiceUploadUrlResponse
 from chalicelib.responses.get_voice2soap_job import GetVoice2SoapJobResponse
 from chalicelib.responses.create_voice2soap_job import CreateVoice2SoapJobResponse
 from chalicelib.responses.get_voice_download_url import GetVoiceDownloadUrlResponse
+from chalicelib.responses.get_voice2soap_job_events_token import GetVoice2SoapJobEventsTokenResponse
 
 __all__ = [
     "GetVoiceUploadUrlResponse",
     "GetVoice2SoapJobResponse",
     "CreateVoice2SoapJobResponse",
-    "GetVoiceDownloadUrlResponse"
+    "GetVoiceDownloadUrlResponse",
+    "GetVoice2SoapJobEventsTokenResponse"
 ]
\ No newline at end of file
@@ -0,0 +1,16 @@
+from dataclasses import dataclass, asdict
+
+
+@dataclass
+class GetVoice2SoapJobEventsTokenResponse:
+    job_id: str
+    token: str
+    expires_in: int
+    events_url: str | None
+
+    def to_dict(self):
+        return asdict(self)
+
+    # Chalice互換
+    def __iter__(self):  # type: ignore
+        yield from self.to_dict().items()
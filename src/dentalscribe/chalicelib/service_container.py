@@ -1,20 +1,34 @@
-from chalicelib.services.job import JobService
-from chalicelib.services.storage import StorageService
-
 class ServiceContainer:
+    """
+    サービスのコンテナ
+
+    各サービスのモジュールは初回取得時にimportする。
+    ハンドラーごとに必要なサービスの依存（クライアント・プロンプト等）のみが読み込まれ、
+    コールドスタート時の初期化時間を抑える。
+    """
     _storage_service = None
     _job_service = None
+    _job_event_service = None
     _voice2soap_service = None
 
 
     @classmethod
     def get_storage_service(cls):
         if cls._storage_service is None:
+            from chalicelib.services.storage import StorageService
             cls._storage_service = StorageService()
         return cls._storage_service
 
     @classmethod
     def get_job_service(cls):
         if cls._job_service is None:
+            from chalicelib.services.job import JobService
             cls._job_service = JobService()
         return cls._job_service
+
+    @classmethod
+    def get_job_event_service(cls):
+        if cls._job_event_service is None:
+            from chalicelib.services.job_event import JobEventService
+            cls._job_event_service = JobEventService()
+        return cls._job_event_service
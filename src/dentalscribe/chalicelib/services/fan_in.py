@@ -0,0 +1,62 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from chalicelib.enums.job import JobStatus
+from chalicelib.repositories.job import JobRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FanInResult:
+    """子ジョブ報告後の親ジョブの集計値"""
+    parent_job_id: str
+    completed: int
+    failed: int
+    total: int
+
+    @property
+    def finished(self) -> int:
+        return self.completed + self.failed
+
+    @property
+    def is_closer(self) -> bool:
+        """最後に完了した子ジョブかどうか（加算がアトミックなため、ちょうど1回だけTrueになる）"""
+        return self.total > 0 and self.finished == self.total
+
+
+class FanInCoordinator:
+    """子ジョブ（TRANSCRIBE）の完了を親ジョブへ集約するコーディネーター"""
+
+    def __init__(self, job_repository: Optional[JobRepository] = None):
+        self.job_repository = job_repository or JobRepository()
+
+    def report(
+        self,
+        parent_job_id: str,
+        child_job_id: str,
+        child_job_status: JobStatus,
+    ) -> Optional[FanInResult]:
+        """
+        子ジョブの完了/失敗を親ジョブに報告する（親ジョブのステータス射影も同時に更新）
+
+        Returns:
+            加算後の集計値。重複報告、または親ジョブが存在しない場合はNone
+        """
+        counts = self.job_repository.increment_child_job_count(parent_job_id, child_job_id, child_job_status)
+
+        if not counts:
+            logger.info("Child job %s was already reported or parent %s not found", child_job_id, parent_job_id)
+            return None
+
+        result = FanInResult(
+            parent_job_id=parent_job_id,
+            completed=counts["completed_child_jobs"],
+            failed=counts["failed_child_jobs"],
+            total=counts["total_child_jobs"],
+        )
+
+        logger.info("Fan-in for parent %s: expected=%d, completed=%d, failed=%d, closer=%s",
+                    parent_job_id, result.total, result.completed, result.failed, result.is_closer)
+
+        return result
@@ -1,30 +1,50 @@
 import json
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from chalicelib.utils.time_util import TimeUtil
-from chalicelib.clients.aws.bedrock import BedrockClient
-from chalicelib.clients.aws.s3 import S3Client
-from chalicelib.clients.aws.transcribe import TranscribeClient
+from chalicelib.utils.json_stream import JsonObjectStreamParser
+from chalicelib.utils.token_util import TokenUtil
+from chalicelib.utils.transcript import TranscriptUtil
+from chalicelib.clients.aws import AWSClients
 from chalicelib.prompts.factory import PromptFactory
+from chalicelib.prompts.registry import RenderedPrompt
 from chalicelib.prompts.schemas.voice2soap import Voice2SoapSchema
 from chalicelib.models.job import Job
+from chalicelib.models.bedrock_cache import BedrockCacheEntry
+from chalicelib.models.soap_route import SoapRoute
 from chalicelib.constants import (
     TRANSCRIBE_DESTINATION_FILENAME,
     TRANSCRIPTION_DESTINATION_KEY_PREFIX,
     BEDROCK_JSON_DELIMITER,
+    TRANSCRIPT_LOW_CONFIDENCE_THRESHOLD,
 )
 from chalicelib.config import Config
-from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.exceptions import BedrockThrottlingError
+from chalicelib.enums.job import JobEventType, JobStatus, JobType
 from chalicelib.repositories.job import JobRepository
+from chalicelib.repositories.transcript import TranscriptRepository
+from chalicelib.repositories.bedrock_cache import BedrockCacheRepository
+from chalicelib.services.job_event import JobEventService
+
+if TYPE_CHECKING:
+    from chalicelib.clients.aws.bedrock import BedrockClient
 
 logger = logging.getLogger(__name__)
 
+SOAP_SECTIONS = ("subjective", "objective", "assessment", "plan")
+
 class Voice2SoapJobHandler:
     def __init__(self):
-        self.aws_config = Config.get_aws_config()
-        self.bedrock_client = BedrockClient()
-        self.s3_client = S3Client()
-        self.transcribe_client = TranscribeClient()
+        self.aws_settings = Config.get_aws_settings()
+        self.bedrock_client = AWSClients.get_bedrock()
+        self.s3_client = AWSClients.get_s3()
+        self.transcribe_client = AWSClients.get_transcribe()
         self.job_repository = JobRepository()
+        self.transcript_repository = TranscriptRepository()
+        self.job_event_service = JobEventService()
+        self.soap_routes = SoapRoute.parse_rules(self.aws_settings.bedrock_soap_routes)
 
     def start_transcription(self, job: Job):
         """音声ファイルの文字起こしを開始"""
@@ -33,8 +53,8 @@ class Voice2SoapJobHandler:
         job_name = job.job_id
         payload = json.loads(job.payload)
         source_s3_key = payload.get("source_s3_key")
-        media_uri = f"s3://{self.aws_config['S3_BUCKET']}/{source_s3_key}"
-        output_bucket = self.aws_config['S3_BUCKET']
+        media_uri = f"s3://{self.aws_settings.s3_bucket}/{source_s3_key}"
+        output_bucket = self.aws_settings.s3_bucket
         output_key = f"{TRANSCRIPTION_DESTINATION_KEY_PREFIX}{job_name}/{TRANSCRIBE_DESTINATION_FILENAME}"
 
         self.transcribe_client.start_transcription_job(
@@ -51,20 +71,40 @@ class Voice2SoapJobHandler:
         parent_job_id = payload.get("parent_job_id")
 
         logger.info("Generating SOAP for parent job: %s", parent_job_id)
+        self.job_event_service.publish(job.parent_job_id, JobEventType.GENERATION_STARTED)
 
         try:
+            parent_job = self.job_repository.find(parent_job_id)
+            if not parent_job:
+                raise ValueError(f"Parent job not found: {parent_job_id}")
+            if parent_job.job_status == JobStatus.FAILED:
+                # ジョブツリーの作成時に一部の子ジョブを開始できず、親ジョブが失敗済みの場合
+                raise ValueError(f"Parent job already failed: {parent_job_id}")
+            parent_payload = json.loads(parent_job.payload)
+
             # 親ジョブの情報から複数のTranscribe結果を取得
-            combined_transcription = self._combine_transcribe_results(parent_job_id)
+            combined_transcription, transcript_segments = self._combine_transcribe_results(parent_job)
             soap_data = None
+            telemetry = {}
             if not combined_transcription.strip():
                 logger.warning("Combined transcription text is empty. Returning empty SOAP data.")
                 soap_data = {"subjective": "情報なし", "objective": "情報なし", "assessment": "情報なし", "plan": "情報なし"}
             else:
-                # BedrockでSOAP形式に変換
-                soap_data = self._generate_soap_with_bedrock(combined_transcription)
+                # BedrockでSOAP形式に変換（完成したセクションから順に親ジョブへ書き込む）
+                # プロンプトには話者ターンごとの行を渡し、誰の発話かをモデルに推測させない
+                published_sections: Dict[str, str] = {}
+                soap_data = self._generate_soap_with_bedrock(
+                    "\n".join(transcript_segments),
+                    on_section=lambda sections: self._save_partial_soap_data(job.parent_job_id, sections, published_sections),
+                    on_reset=lambda: self._reset_partial_soap_data(job.parent_job_id, published_sections),
+                    telemetry=telemetry,
+                    bypass_cache=parent_payload.get("bypass_cache", False),
+                    segments=transcript_segments,
+                )
             
             # ジョブ結果を更新
-            job.result = json.dumps(soap_data)
+            job.set_result(json.dumps(soap_data))
+            job.telemetry = telemetry or None
             job.job_status = JobStatus.COMPLETED
             job.updated_at = TimeUtil.now_str()
             job.save()
@@ -75,14 +115,20 @@ class Voice2SoapJobHandler:
                 parent_job.completed_child_jobs += 1
                 parent_job.job_status = JobStatus.COMPLETED
                 parent_job.updated_at = TimeUtil.now_str()
-                parent_job.result = json.dumps({
+                parent_job.partial_soap_data = None
+                parent_job.set_result(json.dumps({
                     "transcription_text": combined_transcription,
                     "soap_data": soap_data
-                })
+                }))
                 parent_job.save()
+                # キャッシュから返した場合など、セクションのイベントが届いていなくても結果を受け取れるようにする
+                self.job_event_service.publish(parent_job.job_id, JobEventType.JOB_COMPLETED, {"soap_data": soap_data})
                 
             logger.info("SOAP generation completed for job: %s", job.job_id)
-            
+
+        except BedrockThrottlingError:
+            # 容量不足は失敗とせず、呼び出し元で遅延させて再投入する
+            raise
         except Exception as e:
             logger.error("Failed to generate SOAP for job %s: %s", job.job_id, e)
             job.job_status = JobStatus.FAILED
@@ -91,48 +137,432 @@ class Voice2SoapJobHandler:
             job.save()
             raise
 
-    def _generate_soap_with_bedrock(self, transcription_text: str) -> dict:
-        """BedrockとClaude APIを使用してTranscriptionテキストからSOAP形式のデータを生成"""
+    def _generate_soap_with_bedrock(
+        self,
+        transcription_text: str,
+        on_section: Optional[Callable[[Dict[str, str]], None]] = None,
+        telemetry: Optional[Dict[str, Any]] = None,
+        bypass_cache: bool = False,
+        segments: Optional[List[str]] = None,
+        on_reset: Optional[Callable[[], None]] = None,
+    ) -> dict:
+        """
+        BedrockとClaude APIを使用してTranscriptionテキストからSOAP形式のデータを生成
+
+        文字起こしの見積もりトークン数でルーティングのルール（BEDROCK_SOAP_ROUTES）を選び、モデルと出力トークン数の上限を決める。
+        既定以外のルールで生成できなかった場合（出力の打ち切りなど）は、既定のルールで生成し直す。
+        同じ入力（モデル・プロンプトのバージョン・生成パラメーター・文字起こし）の生成結果がキャッシュにあればBedrockを呼び出さない。
+        文字起こしの見積もりトークン数が閾値を超える場合は、ターンの境界で分割して並行に抽出し、統合する（map-reduce）。
+        応答はストリームで受信し、JSONオブジェクトが閉じた時点（または終了デリミターの検出時点）で受信を打ち切る。
+
+        Args:
+            on_section: SOAPのセクションが完成するたびに、それまでに完成したセクションを渡して呼ばれる
+            on_reset: 既定のルールで生成し直す前に、失敗した生成でon_sectionを呼んでいた場合に呼ばれる（途中結果の破棄）
+            telemetry: 指定した場合、選んだルール・プロンプトのID・見積もりと実際のトークン数（プロンプトキャッシュの読み書きを含む）を書き込む
+            bypass_cache: Trueの場合はキャッシュを読まずに生成し、生成結果でキャッシュを上書きする
+            segments: 分割の単位とする発話（ターン）のリスト。省略時は文字起こし全体を1つとして扱う
+        """
         logger.info("Generating SOAP from transcription text, length: %d", len(transcription_text))
         
         try:
+            estimated_tokens = TokenUtil.estimate_tokens(transcription_text)
+            route = SoapRoute.select(self.soap_routes, estimated_tokens)
+            sections_emitted = False
+
+            def emit_section(sections: Dict[str, str]) -> None:
+                nonlocal sections_emitted
+                sections_emitted = True
+                if on_section:
+                    on_section(sections)
+
+            try:
+                return self._generate_soap_with_route(
+                    route, transcription_text, estimated_tokens, emit_section, telemetry, bypass_cache, segments
+                )
+            except BedrockThrottlingError:
+                raise
+            except Exception as e:
+                if route.is_default:
+                    raise
+                logger.warning("Failed to generate SOAP with route %s, retrying with the default route: %s", route, e)
+                if telemetry is not None:
+                    telemetry["route_fallback_error"] = str(e)
+                # 失敗した生成のセクションは既定のルールの結果と混ざらないよう破棄する
+                if sections_emitted and on_reset:
+                    on_reset()
+                return self._generate_soap_with_route(
+                    self.soap_routes[-1], transcription_text, estimated_tokens, on_section, telemetry, bypass_cache, segments
+                )
+
+        except Exception as e:
+            logger.error("Failed to generate SOAP data: %s", e)
+            raise
+
+    def _generate_soap_with_route(
+        self,
+        route: SoapRoute,
+        transcription_text: str,
+        estimated_tokens: int,
+        on_section: Optional[Callable[[Dict[str, str]], None]],
+        telemetry: Optional[Dict[str, Any]],
+        bypass_cache: bool,
+        segments: Optional[List[str]],
+    ) -> dict:
+        """ルーティングのルールのモデル・出力トークン数の上限でSOAPを生成"""
+        # ルールのモデルでも、BedrockRouterで他のリージョン・フォールバックのモデルに切り替えられる呼び出し先を使う
+        bedrock_client = self.bedrock_client if route.uses_default_endpoints else AWSClients.get_bedrock(route.model_id, route.endpoints)
+        model_id = bedrock_client.get_text_model_id()
+        max_tokens = route.max_tokens
+        temperature = 0.1  # SOAP形式なので一貫性を重視
+        map_reduce = estimated_tokens > self.aws_settings.bedrock_map_reduce_threshold_tokens
+
+        if map_reduce:
+            prompt = None
+            prompt_id = PromptFactory.voice2soap_map_reduce_prompt_id()
+            estimated_prompt_tokens = None
+        else:
             # ファクトリーでプロンプトを生成
-            prompt_text = PromptFactory.create_voice2soap_prompt(transcription_text)
-            
+            prompt = PromptFactory.create_voice2soap_prompt(transcription_text)
+            prompt_id = prompt.prompt_id
+            estimated_prompt_tokens = TokenUtil.estimate_tokens(prompt.system) + TokenUtil.estimate_tokens(prompt.user)
             logger.info("Generated prompt for Bedrock using factory")
-            
-            # Bedrockで生成
-            context = [prompt_text]
-            generated_text, input_tokens, output_tokens = self.bedrock_client.generate_text(
-                context=context,
-                max_tokens=4096,
-                temperature=0.1,  # SOAP形式なので一貫性を重視
+
+        cache_key = BedrockCacheEntry.build_key(model_id, prompt_id, temperature, max_tokens, transcription_text)
+        usage = {}
+        chunk_count = None
+
+        json_content = None if bypass_cache else self._find_cached_soap(cache_key)
+        cache_hit = json_content is not None
+        if cache_hit:
+            soap_data = self._parse_soap(json_content)
+        elif map_reduce:
+            logger.info("Transcription is %d estimated tokens, generating SOAP with map-reduce", estimated_tokens)
+            soap_data, chunk_count = self._generate_soap_map_reduce(
+                segments or [transcription_text], max_tokens, temperature, on_section, usage, bedrock_client
             )
-            
-            logger.info("Bedrock generation completed. Input tokens: %d, Output tokens: %d", 
-                       input_tokens, output_tokens)
-            
-            # 生成されたテキストからJSON部分を抽出
+        else:
+            # Bedrockで生成（形式が壊れた項目のみ修復する）
+            json_content = self._stream_soap_json(prompt, max_tokens, temperature, on_section, usage, bedrock_client)
+            soap_data = self._parse_or_repair(json_content, transcription_text, max_tokens, temperature, usage, bedrock_client)
+
+        # ルールの調整用に、見積もりと実際のトークン数を並べて記録する
+        logger.info(
+            "SOAP route: model %s, max_tokens %d (rule max_input_tokens %s). Estimated transcript/prompt tokens: %s/%s, actual input/output tokens: %s/%s",
+            model_id, max_tokens, route.max_input_tokens, estimated_tokens, estimated_prompt_tokens,
+            usage.get("input_tokens", 0) + usage.get("cache_read_input_tokens", 0) + usage.get("cache_creation_input_tokens", 0),
+            usage.get("output_tokens"),
+        )
+
+        if telemetry is not None:
+            telemetry.update(
+                prompt_id=prompt_id,
+                model_id=model_id,
+                max_tokens=max_tokens,
+                route_max_input_tokens=route.max_input_tokens,
+                estimated_input_tokens=estimated_tokens,
+                estimated_prompt_tokens=estimated_prompt_tokens,
+                map_reduce_chunks=chunk_count,
+                **usage,
+                cache_hit=usage.get("cache_read_input_tokens", 0) > 0,
+                result_cache_key=cache_key,
+                result_cache_hit=cache_hit,
+            )
+
+        logger.info("SOAP data generated successfully")
+        if usage.get("fallback_model_responses"):
+            # キャッシュのキーは先頭の呼び出し先のモデルのため、フォールバックのモデルが応答した結果は保存しない
+            logger.info("Skipped saving Bedrock result cache %s: %d responses came from fallback models",
+                        cache_key, usage["fallback_model_responses"])
+        elif not cache_hit:
+            self._save_cached_soap(cache_key, model_id, prompt_id, json.dumps(soap_data, ensure_ascii=False), usage)
+        return soap_data
+
+    def _stream_soap_json(
+        self,
+        prompt: RenderedPrompt,
+        max_tokens: int,
+        temperature: float,
+        on_section: Optional[Callable[[Dict[str, str]], None]],
+        usage: Dict[str, int],
+        bedrock_client: Optional['BedrockClient'] = None,
+    ) -> str:
+        """
+        Bedrockの応答をストリームで受信し、SOAPのJSON部分のテキストを返す
+
+        プロンプトがツールを持つ場合は、ツールの入力（JSON）をそのまま解析する（デリミターでの抽出は行わない）。
+        """
+        parser = JsonObjectStreamParser(None if prompt.tool else BEDROCK_JSON_DELIMITER)
+        incremental = True  # 途中の解析に失敗した場合は、受信後に全文から抽出する
+        generated_text = ""
+        sections = {}
+        stream = (bedrock_client or self.bedrock_client).stream_text(
+            context=[prompt.user],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            usage=usage,
+            system=prompt.system,
+            tool=prompt.tool,
+        )
+        try:
+            for chunk in stream:
+                generated_text += chunk
+                if not incremental:
+                    continue
+
+                try:
+                    members = parser.feed(chunk)
+                except ValueError as e:
+                    logger.warning("Failed to parse streamed SOAP member, falling back to full text: %s", e)
+                    incremental = False
+                    continue
+
+                completed = {
+                    key: value for key, value in members
+                    if key in SOAP_SECTIONS and isinstance(value, str)
+                }
+                if completed:
+                    sections.update(completed)
+                    if on_section:
+                        on_section(dict(sections))
+
+                if parser.done:
+                    break
+        finally:
+            stream.close()
+
+        logger.info("Bedrock generation completed. Input tokens: %s, Output tokens: %s, Cache read tokens: %s, Cache write tokens: %s",
+                   usage.get("input_tokens"), usage.get("output_tokens"),
+                   usage.get("cache_read_input_tokens"), usage.get("cache_creation_input_tokens"))
+
+        if incremental and parser.closed:
+            return parser.object_text
+        if prompt.tool:
+            # 途中で打ち切られた・壊れたツールの入力は、呼び出し側で壊れた項目のみ修復する
+            return generated_text
+
+        logger.warning("Extracting SOAP JSON from full generated text: %s", generated_text)
+        return self._extract_json_from_response(generated_text)
+
+    def _generate_soap_map_reduce(
+        self,
+        segments: List[str],
+        max_tokens: int,
+        temperature: float,
+        on_section: Optional[Callable[[Dict[str, str]], None]],
+        usage: Dict[str, int],
+        bedrock_client: Optional['BedrockClient'] = None,
+    ) -> Tuple[Dict[str, str], int]:
+        """
+        ターンの境界で分割したチャンクごとにSOAPの情報を並行に抽出し（map）、1つのSOAPに統合する（reduce）
+
+        抽出・統合の結果の形式が壊れた場合は、その項目のみ修復する。
+
+        Returns:
+            (統合したSOAP, チャンク数)
+        """
+        bedrock_client = bedrock_client or self.bedrock_client
+        chunks = TranscriptUtil.split_into_chunks(segments, self.aws_settings.bedrock_map_reduce_chunk_tokens)
+        logger.info("Split transcription into %d chunks", len(chunks))
+
+        def extract(index_and_chunk: Tuple[int, str]) -> Tuple[Dict[str, str], Dict[str, int]]:
+            index, chunk = index_and_chunk
+            prompt = PromptFactory.create_voice2soap_extract_prompt(chunk, index + 1, len(chunks))
+            chunk_usage = {}
+            generated_text, _, output_tokens = bedrock_client.generate_text(
+                context=[prompt.user],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=prompt.system,
+                usage=chunk_usage,
+                tool=prompt.tool,
+            )
+            chunk_usage["output_tokens"] = output_tokens
+            json_content = generated_text if prompt.tool else self._extract_json_from_response(generated_text)
+            partial_soap = self._parse_or_repair(json_content, chunk, max_tokens, temperature, chunk_usage, bedrock_client)
+            return partial_soap, chunk_usage
+
+        max_workers = max(min(self.aws_settings.bedrock_map_reduce_max_workers, len(chunks)), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(extract, enumerate(chunks)))
+
+        for _, chunk_usage in results:
+            for key, value in chunk_usage.items():
+                usage[key] = usage.get(key, 0) + value
+
+        merge_prompt = PromptFactory.create_voice2soap_merge_prompt([partial_soap for partial_soap, _ in results])
+        merge_usage = {}
+        json_content = self._stream_soap_json(merge_prompt, max_tokens, temperature, on_section, merge_usage, bedrock_client)
+        soap_data = self._parse_or_repair(json_content, merge_prompt.user, max_tokens, temperature, merge_usage, bedrock_client)
+        for key, value in merge_usage.items():
+            usage[key] = usage.get(key, 0) + value
+
+        return soap_data, len(chunks)
+
+    @staticmethod
+    def _parse_soap(json_content: str) -> Dict[str, str]:
+        """SOAPのJSONを解析してスキーマを検証する（不正な場合はValueError）"""
+        soap_data = json.loads(json_content)
+        Voice2SoapSchema().validate(soap_data)
+        return soap_data
+
+    def _parse_or_repair(
+        self,
+        json_content: str,
+        source_text: str,
+        max_tokens: int,
+        temperature: float,
+        usage: Dict[str, int],
+        bedrock_client: 'BedrockClient',
+    ) -> Dict[str, str]:
+        """
+        SOAPのJSONを解析し、形式が壊れている場合は壊れた項目のみを1回の呼び出しで修復する
+
+        全体を生成し直す（SQSで再試行する）代わりに、壊れた部分のみを送って修復した項目を受け取る。
+        内容が失われた項目がある場合・出力が途中で打ち切られた場合のみ、元の入力（source_text）も送る。
+        修復の回数・項目数・失敗数はusageのsoap_repairs / soap_repaired_sections / soap_repair_failuresに加算する。
+
+        Raises:
+            ValueError: 修復しても形式が正しくならない場合
+        """
+        try:
+            return self._parse_soap(json_content)
+        except ValueError as e:
+            logger.warning("Generated SOAP is invalid, repairing the broken sections: %s", e)
+
+        sections = self._salvage_soap_sections(json_content)
+        broken = [section for section in SOAP_SECTIONS if section not in sections]
+        broken_output = self._broken_fragment(json_content, broken)
+        lost = [section for section in broken if f'"{section}"' not in broken_output]
+        truncated = not json_content.rstrip().endswith("}")
+        prompt = PromptFactory.create_voice2soap_repair_prompt(
+            broken, broken_output, source_text if lost or truncated else None
+        )
+
+        usage["soap_repairs"] = usage.get("soap_repairs", 0) + 1
+        usage["soap_repaired_sections"] = usage.get("soap_repaired_sections", 0) + len(broken)
+        logger.info("Repairing SOAP sections %s (lost: %s, truncated: %s)", broken, lost, truncated)
+
+        repair_usage = {}
+        repaired_text, _, output_tokens = bedrock_client.generate_text(
+            context=[prompt.user],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=prompt.system,
+            usage=repair_usage,
+            tool=prompt.tool,
+        )
+        repair_usage["output_tokens"] = output_tokens
+        for key, value in repair_usage.items():
+            usage[key] = usage.get(key, 0) + value
+
+        try:
+            repaired = json.loads(repaired_text)
+            if not isinstance(repaired, dict):
+                raise ValueError("Repaired output must be a dictionary")
+            soap_data = {**sections, **{section: repaired.get(section) for section in broken}}
+            Voice2SoapSchema().validate(soap_data)
+        except ValueError as e:
+            usage["soap_repair_failures"] = usage.get("soap_repair_failures", 0) + 1
+            logger.error("Failed to repair SOAP sections %s: %s", broken, repaired_text)
+            raise ValueError(f"Invalid SOAP generated by Bedrock (repair failed): {e}")
+
+        return {section: soap_data[section] for section in SOAP_SECTIONS}
+
+    @staticmethod
+    def _salvage_soap_sections(json_content: str) -> Dict[str, str]:
+        """壊れた出力から、値が正しく読み取れるSOAPの項目を取り出す（壊れた項目の前後にある項目も取り出す）"""
+        decoder = json.JSONDecoder()
+        sections = {}
+        for section, _, value_position in Voice2SoapJobHandler._section_positions(json_content):
             try:
-                json_content = self._extract_json_from_response(generated_text)
-                soap_data = json.loads(json_content)
-                
-                # スキーマ検証
-                schema_instance = Voice2SoapSchema()
-                schema_instance.validate(soap_data)
-                
-                logger.info("SOAP data generated successfully")
-                return soap_data
-                
-            except json.JSONDecodeError as e:
-                logger.error("Failed to parse extracted JSON: %s", e)
-                logger.error("Extracted JSON: %s", json_content if 'json_content' in locals() else 'N/A')
-                logger.error("Full generated text: %s", generated_text)
-                raise ValueError(f"Invalid JSON generated by Bedrock: {e}")
-            
+                value, _ = decoder.raw_decode(json_content, value_position)
+            except ValueError:
+                continue
+            if isinstance(value, str):
+                sections.setdefault(section, value)
+        return sections
+
+    @staticmethod
+    def _broken_fragment(json_content: str, broken: List[str]) -> str:
+        """壊れた項目の部分のみ（項目のキーから次の項目のキーまで）を改行で連結したテキスト"""
+        positions = Voice2SoapJobHandler._section_positions(json_content)
+        fragments = []
+        for index, (section, key_position, _) in enumerate(positions):
+            if section not in broken:
+                continue
+            end = positions[index + 1][1] if index + 1 < len(positions) else len(json_content)
+            fragments.append(json_content[key_position:end].strip().rstrip(","))
+        return "\n".join(fragments)
+
+    @staticmethod
+    def _section_positions(json_content: str) -> List[Tuple[str, int, int]]:
+        """出現順の、SOAPの項目ごとの(項目名, キーの開始位置, 値の開始位置)"""
+        return [
+            (match.group(1), match.start(), match.end())
+            for match in re.finditer(r'"(%s)"\s*:\s*' % "|".join(SOAP_SECTIONS), json_content)
+        ]
+
+    def _find_cached_soap(self, cache_key: str) -> Optional[str]:
+        """キャッシュ済みの生成結果を取得（キャッシュの障害時は生成を続行する）"""
+        if not BedrockCacheRepository.enabled():
+            return None
+        try:
+            entry = BedrockCacheRepository.find(cache_key)
+            if not entry:
+                return None
+            logger.info("Bedrock result cache hit: %s (prompt: %s)", cache_key, entry.prompt_id)
+            BedrockCacheRepository.record_hit(cache_key)
+            return entry.content
         except Exception as e:
-            logger.error("Failed to generate SOAP data: %s", e)
-            raise
+            logger.warning("Failed to read Bedrock result cache %s: %s", cache_key, e)
+            return None
+
+    def _save_cached_soap(self, cache_key: str, model_id: str, prompt_id: str, content: str, usage: Dict[str, int]) -> None:
+        if not BedrockCacheRepository.enabled():
+            return
+        try:
+            BedrockCacheRepository.save(BedrockCacheEntry(
+                cache_key=cache_key,
+                model_id=model_id,
+                prompt_id=prompt_id,
+                content=content,
+                input_tokens=usage.get("input_tokens"),
+                output_tokens=usage.get("output_tokens"),
+                hit_count=0,
+                created_at=TimeUtil.now_str(),
+            ))
+        except Exception as e:
+            logger.warning("Failed to save Bedrock result cache %s: %s", cache_key, e)
+
+    def _save_partial_soap_data(self, parent_job_id: str, sections: Dict[str, str], published_sections: Dict[str, str]):
+        """
+        生成途中のSOAPを親ジョブに書き込む（失敗しても生成は継続する）
+
+        イベントには新しく完成したセクションの内容のみ含め、親ジョブのeventsが同じ内容で大きくならないようにする。
+        published_sectionsはイベントで送ったセクション（生成のやり直しで空にする）。
+        """
+        try:
+            self.job_repository.update_partial_soap_data(parent_job_id, sections)
+            completed = {
+                section: content for section, content in sections.items()
+                if published_sections.get(section) != content
+            }
+            if completed:
+                self.job_event_service.publish(parent_job_id, JobEventType.SOAP_SECTION, {"sections": completed})
+                published_sections.update(completed)
+            logger.info("Saved partial SOAP sections %s for parent job: %s", list(sections), parent_job_id)
+        except Exception as e:
+            logger.warning("Failed to save partial SOAP data for parent job %s: %s", parent_job_id, e)
+
+    def _reset_partial_soap_data(self, parent_job_id: str, published_sections: Dict[str, str]):
+        """生成途中のSOAPを親ジョブから削除し、クライアントに破棄を通知する（失敗しても生成は継続する）"""
+        try:
+            published_sections.clear()
+            self.job_repository.clear_partial_soap_data(parent_job_id)
+            self.job_event_service.publish(parent_job_id, JobEventType.SOAP_RESET)
+            logger.info("Cleared partial SOAP sections for parent job: %s", parent_job_id)
+        except Exception as e:
+            logger.warning("Failed to clear partial SOAP data for parent job %s: %s", parent_job_id, e)
 
     def _extract_json_from_response(self, response_text: str) -> str:
         """Bedrockの応答からJSON部分を抽出"""
@@ -167,13 +597,16 @@ class Voice2SoapJobHandler:
             logger.error("Failed to extract JSON from response: %s", e)
             raise ValueError(f"JSON extraction failed: {e}")
 
-    def _combine_transcribe_results(self, parent_job_id: str) -> str:
-        """親ジョブに紐づく全てのTranscribeジョブの結果を元のupload_ids順序で結合（成功したもののみ）"""
+    def _combine_transcribe_results(self, parent_job: Job) -> Tuple[str, List[str]]:
+        """
+        親ジョブに紐づく全てのTranscribeジョブの結果を元のupload_ids順序で結合（成功したもののみ）
+
+        Returns:
+            (結合した文字起こしテキスト, プロンプトに渡す「話者: 発話」のリスト（分割生成の単位）)
+        """
+        parent_job_id = parent_job.job_id
+
         # 親ジョブの情報から元のupload_ids順序を取得
-        parent_job = self.job_repository.find(parent_job_id)
-        if not parent_job:
-            raise ValueError(f"Parent job not found: {parent_job_id}")
-        
         parent_payload = json.loads(parent_job.payload)
         original_upload_ids = parent_payload.get("upload_ids", [])
         
@@ -181,7 +614,9 @@ class Voice2SoapJobHandler:
             raise ValueError(f"No upload_ids found in parent job payload: {parent_job_id}")
         
         # 親ジョブに紐づく子ジョブ（Transcribeジョブ）を取得
-        child_jobs = self.job_repository.find_by_parent_job_id(parent_job_id, JobType.TRANSCRIBE)
+        child_jobs = self.job_repository.find_by_parent_job_id(
+            parent_job_id, JobType.TRANSCRIBE, attributes=JobRepository.CHILD_JOB_SUMMARY_ATTRIBUTES
+        )
         
         if not child_jobs:
             raise ValueError(f"No transcribe child jobs found for parent job: {parent_job_id}")
@@ -197,31 +632,31 @@ class Voice2SoapJobHandler:
         
         # 元のupload_ids順序に従って文字起こし結果を結合
         combined_texts = []
-        bucket = self.aws_config['S3_BUCKET']
+        segments = []
         successful_jobs = 0
         failed_jobs = 0
         
-        for upload_id in original_upload_ids:
+        # Transcribeの話者ラベル（spk_0など）は録音ファイルごとに振られるため、複数ファイルではファイル番号を付けて区別する
+        multiple_files = len(original_upload_ids) > 1
+
+        for file_number, upload_id in enumerate(original_upload_ids, start=1):
             if upload_id in jobs_by_upload_id:
                 child_job = jobs_by_upload_id[upload_id]
                 successful_jobs += 1
                 try:
-                    # 各Transcribeジョブの結果S3キーを構築
-                    transcribe_result_key = f"{TRANSCRIPTION_DESTINATION_KEY_PREFIX}{child_job.job_id}/{TRANSCRIBE_DESTINATION_FILENAME}"
-                    
-                    # TranscribeのJSON結果を取得
-                    transcribe_result = self.s3_client.get_json_object(bucket, transcribe_result_key)
-                    
-                    # TranscriptからテキストとConfidenceを抽出
-                    results = transcribe_result.get('results', {})
-                    transcripts = results.get('transcripts', [])
-                    
-                    if transcripts:
-                        transcription_text = transcripts[0].get('transcript', '')
-                        if transcription_text.strip():
-                            combined_texts.append(transcription_text.strip())
-                            logger.info("Added transcription from upload_id %s (job %s), length: %d", 
-                                      upload_id, child_job.job_id, len(transcription_text))
+                    compact = self.transcript_repository.get_compact(child_job.job_id)
+                    transcription_text = compact.text
+
+                    if transcription_text.strip():
+                        combined_texts.append(transcription_text.strip())
+                        turns = TranscriptUtil.format_turns(
+                            compact.speaker_turns,
+                            TRANSCRIPT_LOW_CONFIDENCE_THRESHOLD,
+                            speaker_namespace=f"file{file_number}" if multiple_files else None
+                        )
+                        segments.extend(turns or [transcription_text.strip()])
+                        logger.info("Added transcription from upload_id %s (job %s), length: %d", 
+                                  upload_id, child_job.job_id, len(transcription_text))
                     
                 except Exception as e:
                     logger.error("Failed to get transcription for upload_id %s (job %s): %s", upload_id, child_job.job_id, e)
@@ -238,4 +673,4 @@ class Voice2SoapJobHandler:
         logger.info("Combined %d transcription texts in original order, total length: %d", 
                    len(combined_texts), len(combined_transcription))
         
-        return combined_transcription
\ No newline at end of file
+        return combined_transcription, segments
\ No newline at end of file
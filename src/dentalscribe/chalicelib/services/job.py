@@ -1,46 +1,78 @@
 import json
+import math
+import random
 import uuid
 import logging
 import os
-import time
-import random
-from chalicelib.clients.aws.s3 import S3Client
-from chalicelib.clients.aws.sqs import SQSClient
-from chalicelib.clients.aws.transcribe import TranscribeClient
-from chalicelib.clients.aws.bedrock import BedrockClient
-from chalicelib.services.handler.voice2soap import Voice2SoapJobHandler
+from chalicelib.clients.aws import AWSClients
+from chalicelib.services.fan_in import FanInCoordinator
+from chalicelib.services.job_event import JobEventService
 from typing import List, Dict, Any, Generator, Optional, Tuple, Iterator
 from chalicelib.utils.decorators import result_handler
 from chalicelib.utils.time_util import TimeUtil
 from chalicelib.config import Config
-from chalicelib.exceptions import ValidationError
-from chalicelib.responses.get_voice2soap_job import SoapData
+from chalicelib.exceptions import BedrockThrottlingError, SQSError, ValidationError
+from chalicelib.responses.get_voice2soap_job import SoapData, ChildJobDetail
 from chalicelib.responses import GetVoice2SoapJobResponse, CreateVoice2SoapJobResponse
 from chalicelib.models.job import Job
-from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.models.upload import Upload
+from chalicelib.enums.job import JobEventType, JobStatus, JobType
 from chalicelib.repositories.job import JobRepository
+from chalicelib.repositories.transcript import TranscriptRepository
+from chalicelib.repositories.upload import UploadRepository
 from chalicelib.constants import (
     TRANSCRIPTION_SOURCE_KEY_PREFIX,
     TRANSCRIPTION_DESTINATION_KEY_PREFIX,
     TRANSCRIBE_DESTINATION_FILENAME,
-    PARENT_JOB_ID_NONE
+    PARENT_JOB_ID_NONE,
+    JOB_THROTTLE_MAX_REQUEUES,
+    JOB_THROTTLE_MAX_DELAY_SECONDS,
 )
 
 logger = logging.getLogger(__name__)
 
 class JobService:
     def __init__(self):
-        self.s3_client = S3Client()
-        self.sqs_client = SQSClient()
-        self.transcribe_client = TranscribeClient()
-        self.bedrock_client = BedrockClient()
-        self.voice2soap_job_handler = Voice2SoapJobHandler()
-        self.aws_config = Config.get_aws_config()
+        self._voice2soap_job_handler = None
+        self.aws_settings = Config.get_aws_settings()
         self.job_repository = JobRepository()
+        self.fan_in_coordinator = FanInCoordinator(self.job_repository)
+        self.job_event_service = JobEventService()
+        self.transcript_repository = TranscriptRepository()
+        self.upload_repository = UploadRepository()
+
+    # クライアント・ハンドラーは使用する処理で初めて生成する（ハンドラーごとの初期化を最小にする）
+    @property
+    def s3_client(self):
+        return AWSClients.get_s3()
+
+    @property
+    def sqs_client(self):
+        return AWSClients.get_sqs()
+
+    @property
+    def storage_service(self):
+        from chalicelib.service_container import ServiceContainer
+        return ServiceContainer.get_storage_service()
+
+    @property
+    def voice2soap_job_handler(self):
+        if self._voice2soap_job_handler is None:
+            # Bedrock・プロンプト関連の依存はSQSのジョブ処理でのみ読み込む
+            from chalicelib.services.handler.voice2soap import Voice2SoapJobHandler
+            self._voice2soap_job_handler = Voice2SoapJobHandler()
+        return self._voice2soap_job_handler
 
     @result_handler
-    def get_voice2soap_job(self, job_id: str) -> GetVoice2SoapJobResponse:
-        job = self.job_repository.find(job_id)
+    def get_voice2soap_job(self, job_id: str, include_transcripts: bool = False) -> GetVoice2SoapJobResponse:
+        """
+        voice2soapジョブの状態・結果を取得
+
+        子ジョブの状態は親ジョブの射影（child_jobs）に集約されているため、処理中のポーリングは強整合性読み込み1回で応答する。
+        子ジョブの文字起こしテキストは1件ごとにS3から読むため、ジョブの完了/失敗後、
+        またはinclude_transcriptsを指定した場合のみ含める（それ以外は空文字）。
+        """
+        job = self.job_repository.find(job_id, consistent_read=True)
         
         if not job:
             raise ValidationError("Job not found")
@@ -48,50 +80,68 @@ class JobService:
         if job.job_type != JobType.VOICE_TO_SOAP:
             raise ValidationError("Job is not a voice2soap job")
 
-        # 子ジョブ（Transcribeジョブ）の詳細を取得
-        child_jobs = self.job_repository.find_by_parent_job_id(job_id, JobType.TRANSCRIBE)
-        all_transcribe_finished = all(j.job_status in [JobStatus.COMPLETED, JobStatus.FAILED] for j in child_jobs) and len(child_jobs) > 0
-        # parent_job_idがjob_idのGENERATE_SOAPジョブが存在するか
-        generate_soap_jobs = self.job_repository.find_by_parent_job_id(job_id, JobType.GENERATE_SOAP)
-        if all_transcribe_finished and not generate_soap_jobs:
-            logger.info(f"All transcribe jobs finished (completed/failed) and no generate_soap job found for parent {job_id}. Starting SOAP generation.")
-            self._start_soap_generation(job_id)
+        include_transcripts = include_transcripts or job.job_status in (JobStatus.COMPLETED, JobStatus.FAILED)
 
-        # 基本的なステータス情報
-        response_data = {
-            "job_id": job.job_id,
-            "status": job.job_status.value.lower(),
-            "transcription_text": "",
-            "soap_data": None,
-            "child_jobs": []
-        }
+        if job.child_jobs is None:
+            return self._get_legacy_voice2soap_job(job, include_transcripts)
+
+        # 文字起こしテキストは親ジョブに持たず（項目サイズの上限対策）、完了した子ジョブのみ派生データから読む
+        child_jobs = [
+            ChildJobDetail(
+                job_id=child_job_id,
+                upload_id=child_job.get("upload_id", "unknown"),
+                status=child_job.get("status", JobStatus.PENDING.value),
+                transcription_text=(
+                    self._get_transcription_text(child_job_id)
+                    if include_transcripts and child_job.get("status") == JobStatus.COMPLETED.value else ""
+                )
+            )
+            for child_job_id, child_job in sorted(job.child_jobs.items(), key=lambda item: item[1].get("index", 0))
+        ]
+
+        return self._build_voice2soap_job_response(job, child_jobs)
+
+    def _get_legacy_voice2soap_job(self, job: Job, include_transcripts: bool) -> GetVoice2SoapJobResponse:
+        """射影（child_jobs）を持たない旧形式の親ジョブは子ジョブをGSIから取得して応答する"""
+        job_id = job.job_id
 
         # 子ジョブ（Transcribeジョブ）の詳細を取得
+        child_jobs = self.job_repository.find_by_parent_job_id(
+            job_id, JobType.TRANSCRIBE, attributes=JobRepository.CHILD_JOB_SUMMARY_ATTRIBUTES
+        )
+
         child_jobs_info = []
-        child_jobs = self.job_repository.find_by_parent_job_id(job_id, JobType.TRANSCRIBE)
-        
         for child_job in child_jobs:
-            child_job_detail = {
-                "job_id": child_job.job_id,
-                "upload_id": self._extract_upload_id_from_job(child_job),
-                "status": child_job.job_status.value,
-                "transcription_text": ""
-            }
+            child_job_detail = ChildJobDetail(
+                job_id=child_job.job_id,
+                upload_id=self._extract_upload_id_from_job(child_job),
+                status=child_job.job_status.value,
+                transcription_text=""
+            )
             
             # 完了したジョブの場合はTranscribeテキストも取得
-            if child_job.job_status == JobStatus.COMPLETED:
-                try:
-                    transcription_text = self._get_transcription_text_from_job(child_job)
-                    child_job_detail["transcription_text"] = transcription_text
-                except Exception as e:
-                    logger.warning("Failed to get transcription for job %s: %s", child_job.job_id, e)
+            if include_transcripts and child_job.job_status == JobStatus.COMPLETED:
+                child_job_detail.transcription_text = self._get_transcription_text_from_job(child_job)
             
             child_jobs_info.append(child_job_detail)
 
+        return self._build_voice2soap_job_response(job, child_jobs_info)
+
+    def _build_voice2soap_job_response(self, job: Job, child_jobs: List[ChildJobDetail]) -> GetVoice2SoapJobResponse:
+        # 基本的なステータス情報
+        response_data = {
+            "job_id": job.job_id,
+            "status": job.job_status.value.lower(),
+            "transcription_text": "",
+            "soap_data": None,
+            "child_jobs": child_jobs
+        }
+
         # ジョブが完了している場合、結果を返す
-        if job.job_status == JobStatus.COMPLETED and job.result:
+        result = job.get_result() if job.job_status == JobStatus.COMPLETED else None
+        if result:
             try:
-                result_data = json.loads(job.result)
+                result_data = json.loads(result)
                 response_data["transcription_text"] = result_data.get("transcription_text", "")
                 
                 soap_data_raw = result_data.get("soap_data", {})
@@ -103,10 +153,15 @@ class JobService:
                         plan=soap_data_raw.get("plan", "")
                     )
             except json.JSONDecodeError:
-                logger.warning("Failed to parse job result for job %s", job_id)
-
-        from chalicelib.responses.get_voice2soap_job import ChildJobDetail
-        response_data["child_jobs"] = [ChildJobDetail(**child) for child in child_jobs_info]
+                logger.warning("Failed to parse job result for job %s", job.job_id)
+        elif job.partial_soap_data:
+            # 生成中の場合は完成済みのセクションのみ返す（未完成のセクションは空文字）
+            response_data["soap_data"] = SoapData(
+                subjective=job.partial_soap_data.get("subjective", ""),
+                objective=job.partial_soap_data.get("objective", ""),
+                assessment=job.partial_soap_data.get("assessment", ""),
+                plan=job.partial_soap_data.get("plan", "")
+            )
 
         return GetVoice2SoapJobResponse(**response_data)
 
@@ -125,7 +180,7 @@ class JobService:
         elif json_body.get('source_s3_key'):
             source_s3_key = json_body['source_s3_key']
             # 直接S3キー指定の場合は従来通りの処理
-            return self._create_single_voice2soap_job(source_s3_key)
+            return self._create_single_voice2soap_job(source_s3_key, json_body.get('bypass_cache') is True)
         else:
             raise ValidationError("Either 'upload_ids', 'upload_id' or 'source_s3_key' must be provided")
 
@@ -135,9 +190,10 @@ class JobService:
         logger.info("Creating voice2soap job for upload_ids: %s", upload_ids)
 
         # 各upload_idに対応するS3キーを取得し、Transcribe済みかチェック
+        uploads = self.upload_repository.find_many(upload_ids)
         transcribe_jobs_info = []
         for upload_id in upload_ids:
-            job_info = self._prepare_transcribe_job_for_upload_id(upload_id)
+            job_info = self._prepare_transcribe_job_for_upload(upload_id, uploads.get(upload_id))
             transcribe_jobs_info.append(job_info)
 
         # 親ジョブ（VOICE_TO_SOAP）を作成
@@ -154,20 +210,18 @@ class JobService:
             total_child_jobs=total_expected_transcribe_jobs,  # 実際のTranscribeジョブ総数
             completed_child_jobs=already_completed_jobs,  # 既に完了しているTranscribeジョブ数
             failed_child_jobs=0,
-            payload=json.dumps({"upload_ids": upload_ids}),
+            finished_child_jobs=already_completed_jobs,
+            pending_child_jobs=total_transcribe_jobs,
+            child_jobs={},
+            payload=json.dumps(self._parent_job_payload(json_body, upload_ids=upload_ids)),
             created_at=TimeUtil.now_str(),
             updated_at=TimeUtil.now_str()
         )
-        parent_job.save()
-
-        logger.info("Created parent job: %s with total_child_jobs=%d, completed_child_jobs=%d", 
-                   parent_job.job_id, parent_job.total_child_jobs, parent_job.completed_child_jobs)
 
-        # Transcribeが必要なジョブを作成・開始
-        child_jobs = []
-        for info in transcribe_jobs_info:
+        # Transcribeが必要な子ジョブ（TRANSCRIBE）を作成し、親ジョブの射影に登録
+        transcribe_jobs = []
+        for index, info in enumerate(transcribe_jobs_info):
             if info['needs_transcribe']:
-                # 子ジョブ（TRANSCRIBE）を作成
                 transcribe_job = Job(
                     job_type=JobType.TRANSCRIBE,
                     job_status=JobStatus.PENDING,
@@ -180,21 +234,41 @@ class JobService:
                     created_at=TimeUtil.now_str(),
                     updated_at=TimeUtil.now_str()
                 )
-                transcribe_job.save()
+                parent_job.child_jobs[transcribe_job.job_id] = self._child_job_projection(index, info['upload_id'])
+                transcribe_jobs.append(transcribe_job)
+                info['job_id'] = transcribe_job.job_id
+
+        # 親ジョブとTranscribeが必要な子ジョブをまとめて作成
+        self.job_repository.create_job_tree(parent_job, transcribe_jobs)
 
-                # SQSにメッセージを送信してTranscribeジョブを開始
-                queue_name = self.aws_config["SQS_JOB_QUEUE"]
-                message_body = json.dumps({
+        logger.info("Created parent job: %s with total_child_jobs=%d, completed_child_jobs=%d", 
+                   parent_job.job_id, parent_job.total_child_jobs, parent_job.completed_child_jobs)
+
+        # SQSにメッセージをまとめて送信してTranscribeジョブを開始
+        if transcribe_jobs:
+            queue_name = self.aws_settings.sqs_job_queue
+            message_bodies = [
+                json.dumps({
                     "job_id": transcribe_job.job_id,
                     "job_type": JobType.TRANSCRIBE.value,
                     "parent_job_id": parent_job.job_id
                 })
-                
-                self.sqs_client.send_message(queue_name, message_body)
-                logger.info("Sent SQS message for transcribe job: %s", transcribe_job.job_id)
-                
+                for transcribe_job in transcribe_jobs
+            ]
+
+            try:
+                self.sqs_client.send_message_batch(queue_name, message_bodies)
+            except SQSError as e:
+                unsent_indexes = e.details.get("unsent_indexes", range(len(transcribe_jobs)))
+                self._fail_unsent_job_tree(parent_job, [transcribe_jobs[index] for index in unsent_indexes], e)
+                raise
+            logger.info("Sent SQS messages for transcribe jobs: %s", [job.job_id for job in transcribe_jobs])
+
+        child_jobs = []
+        for info in transcribe_jobs_info:
+            if info['needs_transcribe']:
                 child_jobs.append({
-                    "job_id": transcribe_job.job_id,
+                    "job_id": info['job_id'],
                     "upload_id": info['upload_id'],
                     "status": "QUEUED",
                     "service": "transcribe"
@@ -232,58 +306,27 @@ class JobService:
         else:
             raise ValidationError("Invalid S3 key format")
 
-        time.sleep(random.random())
-
         job = self.job_repository.find(job_id)
 
         if not job or job.job_type != JobType.TRANSCRIBE:
             raise ValidationError("Job not found")
 
-        parent_job = self.job_repository.find(job.parent_job_id)
+        # 以降の読み出しで巨大なtranscript.jsonを毎回読まないよう、派生データを一度だけ生成
+        try:
+            self.transcript_repository.create_compact(job.job_id)
+        except Exception as e:
+            # 派生データがなくても読み出し時にtranscript.jsonから組み立てられるため続行する
+            logger.warning("Failed to create compact transcript for job %s: %s", job.job_id, e)
 
         job.job_status = JobStatus.COMPLETED
         job.completed_at = TimeUtil.now_str()
         job.save()
 
-        if parent_job:
-            parent_job.completed_child_jobs += 1
-            parent_job.updated_at = TimeUtil.now_str()
-            parent_job.save()  # 親ジョブを先に保存
-            
-            # 全てのTranscribeジョブが完了（成功・失敗問わず）したかチェック
-            expected_transcribe_jobs = parent_job.total_child_jobs  # GENERATE_SOAPジョブは含まない
-            total_finished_jobs = parent_job.completed_child_jobs + parent_job.failed_child_jobs
-            
-            logger.info("Transcribe job completion check for parent %s: expected=%d, completed=%d, failed=%d, total_finished=%d", 
-                       parent_job.job_id, expected_transcribe_jobs, parent_job.completed_child_jobs, 
-                       parent_job.failed_child_jobs, total_finished_jobs)
-            
-            if total_finished_jobs >= expected_transcribe_jobs:
-                logger.info("All transcribe jobs finished (completed: %d, failed: %d) for parent: %s", 
-                           parent_job.completed_child_jobs, parent_job.failed_child_jobs, parent_job.job_id)
-                # SOAP生成開始判定のみ残す
-                if parent_job.completed_child_jobs > 0:
-                    logger.info("Starting SOAP generation with %d successful transcriptions", parent_job.completed_child_jobs)
-                    self._start_soap_generation(parent_job.job_id)
-                else:
-                    logger.error("All transcribe jobs failed for parent: %s", parent_job.job_id)
-                    parent_job.job_status = JobStatus.FAILED
-                    parent_job.error = "All transcribe jobs failed"
-                    parent_job.save()
-            else:
-                logger.info("Waiting for remaining transcribe jobs to complete for parent: %s (need %d more)", 
-                           parent_job.job_id, expected_transcribe_jobs - total_finished_jobs)
-                
-                # デバッグ情報: 子ジョブの状態を詳しく確認
-                child_jobs = self.job_repository.find_by_parent_job_id(parent_job.job_id, JobType.TRANSCRIBE)
-                logger.info("Current child jobs for parent %s: total_found=%d", parent_job.job_id, len(child_jobs))
-                for child_job in child_jobs:
-                    logger.info("Child job %s: status=%s", child_job.job_id, child_job.job_status.value)
+        if job.parent_job_id and job.parent_job_id != PARENT_JOB_ID_NONE:
+            self._report_transcribe_job_finished(job, JobStatus.COMPLETED)
 
         logger.info("Completed transcribe job: %s", job.job_id)
 
-
-
     def handle_sqs_message(self, json_body: Dict[str, Any]) -> None:
         job_id = json_body["job_id"]
 
@@ -296,6 +339,7 @@ class JobService:
 
         job.job_status = JobStatus.IN_PROGRESS
         job.save()
+        self._update_parent_projection(job)
 
         try:
             if job.job_type == JobType.TRANSCRIBE:
@@ -304,14 +348,49 @@ class JobService:
                 self.voice2soap_job_handler.generate_soap(job)
             else:
                 raise ValidationError("Job type not supported")
-                        
+
+        except BedrockThrottlingError as e:
+            throttle_requeues = json_body.get("throttle_requeues", 0)
+            if throttle_requeues < JOB_THROTTLE_MAX_REQUEUES:
+                self._requeue_throttled_job(job, json_body, throttle_requeues + 1, e.retry_after)
+                return
+            self._fail_job(job, e)
+            raise e
         except Exception as e:
-            job.result = None
-            job.job_status = JobStatus.FAILED
-            job.error = str(e)
-            job.save()
+            self._fail_job(job, e)
             raise e
 
+    def _fail_job(self, job: Job, error: Exception) -> None:
+        job.set_result(None)
+        job.job_status = JobStatus.FAILED
+        job.error = str(error)
+        job.save()
+        self._update_parent_projection(job)
+
+    def _requeue_throttled_job(self, job: Job, json_body: Dict[str, Any], throttle_requeues: int, retry_after: float) -> None:
+        """
+        Bedrockの容量が回復する頃に再実行されるよう、遅延させてキューに再投入する
+
+        Lambda内で待機し続けると実行時間（課金）を消費するため、SQSのDelaySecondsで待機する。
+        同時に再投入されたジョブが一斉に再実行されないよう、ゆらぎを加える。
+        """
+        delay_seconds = min(math.ceil(retry_after * (1 + random.random())), JOB_THROTTLE_MAX_DELAY_SECONDS)
+        logger.warning(
+            "Bedrock capacity exhausted for job %s, requeued in %d seconds (%d/%d)",
+            job.job_id, delay_seconds, throttle_requeues, JOB_THROTTLE_MAX_REQUEUES,
+        )
+
+        job.job_status = JobStatus.PENDING
+        job.updated_at = TimeUtil.now_str()
+        job.save()
+        self._update_parent_projection(job)
+
+        self.sqs_client.send_message(
+            self.aws_settings.sqs_job_queue,
+            json.dumps({**json_body, "throttle_requeues": throttle_requeues}),
+            delay_seconds=delay_seconds,
+        )
+
 
     def handle_failed_sqs_message(self, json_body: Dict[str, Any]) -> None:
         job_id = json_body["job_id"]
@@ -332,51 +411,86 @@ class JobService:
         
         if job.parent_job_id and job.parent_job_id != PARENT_JOB_ID_NONE:
             logger.info("Updating parent job %s due to child job failure", job.parent_job_id)
-            parent_job = self.job_repository.find(job.parent_job_id)
-            parent_job.failed_child_jobs += 1
-            parent_job.updated_at = TimeUtil.now_str()
-            parent_job.save()  # 親ジョブを先に保存
-            
+
             # Transcribeジョブの場合は、他の成功したジョブがあればSOAP生成を続行
             if job.job_type == JobType.TRANSCRIBE:
-                expected_transcribe_jobs = parent_job.total_child_jobs  # GENERATE_SOAPジョブは含まない
-                total_finished_jobs = parent_job.completed_child_jobs + parent_job.failed_child_jobs
-                if total_finished_jobs >= expected_transcribe_jobs:
-                    logger.info("All transcribe jobs finished (completed: %d, failed: %d) for parent: %s", 
-                               parent_job.completed_child_jobs, parent_job.failed_child_jobs, parent_job.job_id)
-                    # SOAP生成開始判定のみ残す
-                    if parent_job.completed_child_jobs > 0:
-                        logger.info("Starting SOAP generation with %d successful transcriptions (despite %d failures)", 
-                                   parent_job.completed_child_jobs, parent_job.failed_child_jobs)
-                        self._start_soap_generation(parent_job.job_id)
-                    else:
-                        logger.error("All transcribe jobs failed for parent: %s", parent_job.job_id)
-                        parent_job.job_status = JobStatus.FAILED
-                        parent_job.error = "All transcribe jobs failed"
-                        parent_job.save()
-                else:
-                    logger.info("Waiting for remaining transcribe jobs to complete for parent: %s (need %d more)", 
-                               parent_job.job_id, expected_transcribe_jobs - total_finished_jobs)
+                self._report_transcribe_job_finished(job, JobStatus.FAILED)
             else:
                 # Transcribe以外のジョブが失敗した場合は従来通り親ジョブも失敗とする
-                parent_job.job_status = JobStatus.FAILED
-                parent_job.error = f"Child job {job.job_id} failed: {job.error}"
-                parent_job.save()
-            
-            logger.info("Updated parent job %s status", parent_job.job_id)
-
-    def _prepare_transcribe_job_for_upload_id(self, upload_id: str) -> Dict[str, Any]:
-        """upload_idに対応するTranscribeジョブの情報を準備"""
-        # S3からupload_idで始まるファイルを検索
-        prefix = f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}"
-        bucket = self.aws_config['S3_BUCKET']
-        objects = self.s3_client.list_objects(bucket, prefix)
-        
-        if not objects:
-            raise ValidationError(f"No files found with upload_id prefix: {upload_id}")
-        
-        source_s3_key = objects[0]['Key']
-        
+                error = f"Child job {job.job_id} failed: {job.error}"
+                self.job_repository.update_status(job.parent_job_id, JobStatus.FAILED, error=error)
+                self.job_event_service.publish(job.parent_job_id, JobEventType.JOB_FAILED, {"error": error})
+
+            logger.info("Updated parent job %s status", job.parent_job_id)
+
+    def _report_transcribe_job_finished(self, job: Job, job_status: JobStatus) -> None:
+        """Transcribeジョブの完了/失敗を親ジョブへ集約し、最後の子ジョブであればSOAP生成を開始"""
+        result = self.fan_in_coordinator.report(job.parent_job_id, job.job_id, job_status)
+
+        if not result:
+            # 重複報告（クローザーの送信失敗による再実行を含む）は、作成済みで未送信のSOAP生成ジョブがあれば送信し直す
+            self._resume_soap_generation(job.parent_job_id)
+            return
+
+        self.job_event_service.publish(
+            result.parent_job_id,
+            JobEventType.TRANSCRIPTION_COMPLETED if job_status == JobStatus.COMPLETED else JobEventType.TRANSCRIPTION_FAILED,
+            {
+                "child_job_id": job.job_id,
+                "completed": result.completed,
+                "failed": result.failed,
+                "total": result.total,
+            },
+        )
+
+        if not result.is_closer:
+            logger.info("Waiting for remaining transcribe jobs to complete for parent: %s (need %d more)",
+                       result.parent_job_id, result.total - result.finished)
+            return
+
+        logger.info("All transcribe jobs finished (completed: %d, failed: %d) for parent: %s",
+                   result.completed, result.failed, result.parent_job_id)
+
+        if result.completed > 0:
+            logger.info("Starting SOAP generation with %d successful transcriptions (despite %d failures)",
+                       result.completed, result.failed)
+            self._start_soap_generation(result.parent_job_id)
+        else:
+            logger.error("All transcribe jobs failed for parent: %s", result.parent_job_id)
+            self.job_repository.update_status(result.parent_job_id, JobStatus.FAILED, error="All transcribe jobs failed")
+            self.job_event_service.publish(result.parent_job_id, JobEventType.JOB_FAILED, {"error": "All transcribe jobs failed"})
+
+    def _update_parent_projection(self, job: Job) -> None:
+        """親ジョブのステータス射影に子ジョブ（Transcribe）の状態を反映"""
+        if job.job_type != JobType.TRANSCRIBE or not job.parent_job_id or job.parent_job_id == PARENT_JOB_ID_NONE:
+            return
+
+        try:
+            self.job_repository.update_child_job_projection(job.parent_job_id, job.job_id, job.job_status)
+        except Exception as e:
+            logger.warning("Failed to update child job projection of parent %s for job %s: %s", job.parent_job_id, job.job_id, e)
+
+    def _parent_job_payload(self, json_body: Dict[str, Any], **payload) -> Dict[str, Any]:
+        """親ジョブのpayload（キャッシュを使わない再生成の指定はSOAP生成時に参照する）"""
+        if json_body.get('bypass_cache') is True:
+            payload["bypass_cache"] = True
+        return payload
+
+    def _child_job_projection(self, index: int, upload_id: str) -> Dict[str, Any]:
+        """親ジョブに保持する子ジョブの射影（GETレスポンスのchild_jobsに対応）"""
+        return {
+            "index": index,
+            "upload_id": upload_id,
+            "status": JobStatus.PENDING.value,
+        }
+
+    def _prepare_transcribe_job_for_upload(self, upload_id: str, upload: Optional[Upload]) -> Dict[str, Any]:
+        """upload_idに対応するTranscribeジョブの情報を準備（アップロードが完了していない場合はValidationError）"""
+        upload = self.storage_service.resolve_upload(upload_id, upload)
+
+        source_s3_key = upload.s3_key
+        bucket = self.aws_settings.s3_bucket
+
         # Transcribe結果が既に存在するかチェック
         transcribe_result_key = f"{TRANSCRIPTION_DESTINATION_KEY_PREFIX}{upload_id}/{TRANSCRIBE_DESTINATION_FILENAME}"
         transcribe_result_exists = self.s3_client.exists(bucket, transcribe_result_key)
@@ -388,7 +502,7 @@ class JobService:
             "transcribe_result_key": transcribe_result_key if transcribe_result_exists else None
         }
 
-    def _create_single_voice2soap_job(self, source_s3_key: str) -> CreateVoice2SoapJobResponse:
+    def _create_single_voice2soap_job(self, source_s3_key: str, bypass_cache: bool = False) -> CreateVoice2SoapJobResponse:
         """従来の単一ファイル処理（後方互換性のため）"""
         logger.info("Creating voice2soap job for S3 key: %s", source_s3_key)
 
@@ -396,14 +510,15 @@ class JobService:
         parent_job = Job(
             job_type=JobType.VOICE_TO_SOAP,
             job_status=JobStatus.IN_PROGRESS,
-            total_child_jobs=2,  # TRANSCRIBE + GENERATE_SOAP
+            total_child_jobs=1,  # Transcribeジョブ数（GENERATE_SOAPジョブは含まない）
             completed_child_jobs=0,
             failed_child_jobs=0,
-            payload=json.dumps({"source_s3_key": source_s3_key}),
+            finished_child_jobs=0,
+            pending_child_jobs=1,
+            payload=json.dumps(self._parent_job_payload({"bypass_cache": bypass_cache}, source_s3_key=source_s3_key)),
             created_at=TimeUtil.now_str(),
             updated_at=TimeUtil.now_str()
         )
-        parent_job.save()
 
         # 子ジョブ（TRANSCRIBE）を作成
         transcribe_job = Job(
@@ -417,17 +532,23 @@ class JobService:
             created_at=TimeUtil.now_str(),
             updated_at=TimeUtil.now_str()
         )
-        transcribe_job.save()
+        parent_job.child_jobs = {transcribe_job.job_id: self._child_job_projection(0, "unknown")}
+
+        self.job_repository.create_job_tree(parent_job, [transcribe_job])
 
         # SQSにメッセージを送信
-        queue_name = self.aws_config["SQS_JOB_QUEUE"]
+        queue_name = self.aws_settings.sqs_job_queue
         message_body = json.dumps({
             "job_id": transcribe_job.job_id,
             "job_type": JobType.TRANSCRIBE.value,
             "parent_job_id": parent_job.job_id
         })
         
-        self.sqs_client.send_message(queue_name, message_body)
+        try:
+            self.sqs_client.send_message(queue_name, message_body)
+        except Exception as e:
+            self._fail_unsent_job_tree(parent_job, [transcribe_job], e)
+            raise
 
         from chalicelib.responses.create_voice2soap_job import ChildJobInfo
         child_jobs = [ChildJobInfo(
@@ -445,9 +566,34 @@ class JobService:
             child_jobs=child_jobs
         )
 
+    def _fail_unsent_job_tree(self, parent_job: Job, unsent_jobs: List[Job], error: Exception) -> None:
+        """
+        SQSへの送信に失敗した場合に、親ジョブと送信できなかった子ジョブを失敗にする
+
+        作成済みのジョブツリーは処理するメッセージがないため、そのままではIN_PROGRESS/PENDINGのまま残り続ける。
+        送信できた子ジョブは処理が進むが、親ジョブが失敗のためSOAP生成は行わない。
+        """
+        error_message = f"Failed to enqueue transcribe jobs: {error}"
+        logger.error("Failing job tree %s (%d unsent child job(s)): %s", parent_job.job_id, len(unsent_jobs), error)
+
+        for transcribe_job in unsent_jobs:
+            transcribe_job.job_status = JobStatus.FAILED
+            transcribe_job.error = error_message
+            transcribe_job.save()
+            self._update_parent_projection(transcribe_job)
+
+        self.job_repository.update_status(parent_job.job_id, JobStatus.FAILED, error=error_message)
+        self.job_event_service.publish(parent_job.job_id, JobEventType.JOB_FAILED, {"error": error_message})
+
     def _start_soap_generation(self, parent_job_id: str) -> None:
-        """SOAP生成ジョブを開始"""
+        """
+        SOAP生成ジョブを開始
+
+        親ジョブごとに決定的なIDで条件付き作成し、既に作成済みの場合は未送信の場合のみ送信し直す。
+        ファンインの完了通知が重複しても、GENERATE_SOAPジョブは1つしか起動されない。
+        """
         generate_soap_job = Job(
+            job_id=Job.generate_soap_job_id(parent_job_id),
             job_type=JobType.GENERATE_SOAP,
             job_status=JobStatus.PENDING,
             parent_job_id=parent_job_id,
@@ -457,17 +603,38 @@ class JobService:
             created_at=TimeUtil.now_str(),
             updated_at=TimeUtil.now_str()
         )
-        generate_soap_job.save()
-
-        # SQSにメッセージを送信
-        queue_name = self.aws_config["SQS_JOB_QUEUE"]
+        if not self.job_repository.create_if_not_exists(generate_soap_job):
+            logger.info("SOAP generation job already exists for parent %s: %s", parent_job_id, generate_soap_job.job_id)
+            self._resume_soap_generation(parent_job_id)
+            return
+
+        self._enqueue_soap_generation(generate_soap_job)
+
+    def _resume_soap_generation(self, parent_job_id: str) -> None:
+        """
+        作成済みでSQSに送信していないSOAP生成ジョブを送信し直す
+
+        作成（条件付き書き込み）の後に送信が失敗すると、作成済みのため以降の完了通知では起動されず、
+        親ジョブが処理中のまま残る。送信の失敗で再実行された完了通知（重複報告）から送信し直す。
+        """
+        generate_soap_job = self.job_repository.find(Job.generate_soap_job_id(parent_job_id), consistent_read=True)
+        if not generate_soap_job or generate_soap_job.job_status != JobStatus.PENDING or generate_soap_job.enqueued_at:
+            return
+
+        logger.warning("SOAP generation job %s was created but not enqueued, sending again", generate_soap_job.job_id)
+        self._enqueue_soap_generation(generate_soap_job)
+
+    def _enqueue_soap_generation(self, generate_soap_job: Job) -> None:
+        """SOAP生成ジョブをSQSに送信し、送信済みとして記録"""
+        queue_name = self.aws_settings.sqs_job_queue
         message_body = json.dumps({
             "job_id": generate_soap_job.job_id,
             "job_type": JobType.GENERATE_SOAP.value,
-            "parent_job_id": parent_job_id
+            "parent_job_id": generate_soap_job.parent_job_id
         })
-        
+
         self.sqs_client.send_message(queue_name, message_body)
+        self.job_repository.mark_enqueued(generate_soap_job.job_id)
         logger.info("Started SOAP generation job: %s", generate_soap_job.job_id)
 
     def _extract_upload_id_from_job(self, job: Job) -> str:
@@ -480,17 +647,12 @@ class JobService:
 
     def _get_transcription_text_from_job(self, job: Job) -> str:
         """Transcribeジョブから文字起こしテキストを取得"""
+        return self._get_transcription_text(job.job_id)
+
+    def _get_transcription_text(self, job_id: str) -> str:
+        """Transcribeジョブの文字起こしテキストを取得（派生データがない場合のみtranscript.jsonを読む）"""
         try:
-            bucket = self.aws_config['S3_BUCKET']
-            transcribe_result_key = f"{TRANSCRIPTION_DESTINATION_KEY_PREFIX}{job.job_id}/{TRANSCRIBE_DESTINATION_FILENAME}"
-            
-            transcribe_result = self.s3_client.get_json_object(bucket, transcribe_result_key)
-            results = transcribe_result.get('results', {})
-            transcripts = results.get('transcripts', [])
-            
-            if transcripts:
-                return transcripts[0].get('transcript', '')
-            return ""
+            return self.transcript_repository.get_text(job_id)
         except Exception as e:
-            logger.warning("Failed to get transcription text for job %s: %s", job.job_id, e)
+            logger.warning("Failed to get transcription text for job %s: %s", job_id, e)
             return ""
\ No newline at end of file
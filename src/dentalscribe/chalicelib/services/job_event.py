@@ -0,0 +1,177 @@
+import logging
+import time
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, Optional
+from chalice import Response
+from chalicelib.config import Config
+from chalicelib.enums.job import JobEventType
+from chalicelib.exceptions import UnauthorizedError, ValidationError
+from chalicelib.exceptions.handler import handle_error
+from chalicelib.repositories.job_event import JobEventRepository
+from chalicelib.responses import GetVoice2SoapJobEventsTokenResponse
+from chalicelib.utils.decorators import result_handler, stream_handler
+from chalicelib.constants import (
+    JOB_EVENTS_RETRY_MILLISECONDS,
+    JOB_EVENTS_POLL_SECONDS,
+    JOB_EVENTS_KEEPALIVE_SECONDS,
+    JOB_EVENTS_STREAM_SECONDS,
+    JOB_EVENTS_TOKEN_SCOPE,
+)
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream; charset=utf-8",
+    "Cache-Control": "no-cache",
+}
+
+
+class JobEventService:
+    """
+    ジョブの進捗イベントの発行と、Server-Sent Events形式での配信
+
+    イベントは親ジョブのeventsに追記する。配信は次の2通り:
+    - ストリーミング（open_voice2soap_job_event_stream）: 関数URL（レスポンスストリーミング）のLambdaで、
+      接続を保ったまま新しいイベントを送る。job_events_stream.py がHTTPサーバーとして提供する
+    - API（get_voice2soap_job_events）: API Gateway（REST）はレスポンスをバッファリングするため、
+      その時点のイベントを返してすぐに応答し、クライアントはretryの間隔で再接続する
+    EventSourceは任意のヘッダーを送れないため、どちらもAPIキーではなく署名付きトークン（クエリパラメータ）で認証する。
+    """
+
+    def __init__(self, job_event_repository=None):
+        self.job_event_repository = job_event_repository or JobEventRepository()
+
+    def publish(self, job_id: str, event_type: JobEventType, data: Optional[Dict[str, Any]] = None) -> None:
+        """イベントを発行（失敗しても呼び出し元の処理は継続する）"""
+        try:
+            if not self.job_event_repository.append(job_id, event_type, data):
+                logger.warning("Job %s not found or its event history is full, dropped event %s", job_id, event_type.value)
+        except Exception as e:
+            logger.warning("Failed to publish event %s for job %s: %s", event_type.value, job_id, e)
+
+    @result_handler
+    def issue_voice2soap_job_events_token(self, job_id: str) -> GetVoice2SoapJobEventsTokenResponse:
+        """進捗イベントの購読用トークンを発行（APIキーで認証したAPIから呼ぶ）"""
+        if not self.job_event_repository.exists(job_id):
+            raise ValidationError("Job not found")
+
+        import jwt
+
+        app_config = Config.get_app_config()
+        expires_in = app_config["JWT_EXPIRATION"]
+        token = jwt.encode(
+            {"sub": job_id, "scope": JOB_EVENTS_TOKEN_SCOPE, "exp": int(time.time()) + expires_in},
+            app_config["JWT_SECRET_KEY"],
+            algorithm=app_config["JWT_ALGORITHM"],
+        )
+        return GetVoice2SoapJobEventsTokenResponse(
+            job_id=job_id,
+            token=token,
+            expires_in=expires_in,
+            events_url=self._stream_url(app_config["JOB_EVENTS_STREAM_URL"], job_id),
+        )
+
+    def get_voice2soap_job_events(self, job_id: str, token: Optional[str], last_event_id: Optional[str] = None) -> Response:
+        """
+        Last-Event-ID以降のイベントをServer-Sent Events形式で返す（待機せずに応答する）
+
+        新しいイベントがない場合はコメント行のみ返す。クライアントはretryの間隔で再接続し、
+        job_completed / job_failed を受け取った時点で接続を閉じる。
+        """
+        try:
+            self._verify_token(job_id, token)
+            found = self.job_event_repository.find_since(job_id, self._parse_last_event_id(last_event_id))
+            if found is None:
+                raise ValidationError("Job not found")
+        except Exception as e:
+            return handle_error(e)
+
+        _, events = found
+        frames = [f"retry: {JOB_EVENTS_RETRY_MILLISECONDS}\n\n", *(event.to_sse() for event in events)]
+        if not events:
+            frames.append(": keep-alive\n\n")
+        return Response(status_code=HTTPStatus.OK, body="".join(frames), headers=SSE_HEADERS)
+
+    def open_voice2soap_job_event_stream(self, job_id: str, token: Optional[str], last_event_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Last-Event-ID以降のイベントを送り続けるストリームを開く
+
+        認証・ジョブの存在はストリームを開く前に確認する（ステータスコードで返せるように例外を送出する）。
+
+        Raises:
+            UnauthorizedError: トークンが不正・期限切れ、または別のジョブのものの場合
+            ValidationError: Last-Event-IDが不正、またはジョブが存在しない場合
+        """
+        self._verify_token(job_id, token)
+        start_event_id = self._parse_last_event_id(last_event_id)
+        if not self.job_event_repository.exists(job_id):
+            raise ValidationError("Job not found")
+        return self._stream_voice2soap_job_events(job_id, start_event_id)
+
+    @stream_handler
+    def _stream_voice2soap_job_events(self, job_id: str, last_event_id: int) -> Iterator[str]:
+        """
+        新しいイベントをJOB_EVENTS_POLL_SECONDSごとに確認してServer-Sent Events形式で送る
+
+        job_completed / job_failed を送った時点で終了する。JOB_EVENTS_STREAM_SECONDSを過ぎた場合も終了し、
+        クライアントはLast-Event-IDを付けて再接続する。
+        """
+        yield f"retry: {JOB_EVENTS_RETRY_MILLISECONDS}\n\n"
+        started_at = last_sent_at = time.monotonic()
+        while True:
+            found = self.job_event_repository.find_since(job_id, last_event_id)
+            if found is None:
+                raise ValidationError("Job not found")
+
+            for event in found[1]:
+                yield event.to_sse()
+                last_event_id = event.event_id
+                last_sent_at = time.monotonic()
+                if event.is_terminal:
+                    return
+
+            now = time.monotonic()
+            if now - started_at >= JOB_EVENTS_STREAM_SECONDS:
+                return
+            if now - last_sent_at >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent_at = now
+            time.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    @staticmethod
+    def _verify_token(job_id: str, token: Optional[str]) -> None:
+        if not token:
+            raise UnauthorizedError("Missing token")
+
+        import jwt
+
+        app_config = Config.get_app_config()
+        try:
+            claims = jwt.decode(
+                token,
+                app_config["JWT_SECRET_KEY"],
+                algorithms=[app_config["JWT_ALGORITHM"]],
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.ExpiredSignatureError:
+            raise UnauthorizedError("Token expired")
+        except jwt.InvalidTokenError:
+            raise UnauthorizedError("Invalid token")
+
+        if claims.get("sub") != job_id or claims.get("scope") != JOB_EVENTS_TOKEN_SCOPE:
+            raise UnauthorizedError("Invalid token")
+
+    @staticmethod
+    def _stream_url(base_url: Optional[str], job_id: str) -> Optional[str]:
+        if not base_url:
+            return None
+        return f"{base_url.rstrip('/')}/jobs/voice2soap/{job_id}/events"
+
+    @staticmethod
+    def _parse_last_event_id(last_event_id: Optional[str]) -> int:
+        if not last_event_id:
+            return 0
+        try:
+            return max(int(last_event_id), 0)
+        except ValueError:
+            raise ValidationError("Invalid Last-Event-ID")
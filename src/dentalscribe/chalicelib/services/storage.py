@@ -2,7 +2,7 @@ import json
 import uuid
 import logging
 import os
-from chalicelib.clients.aws.s3 import S3Client
+from chalicelib.clients.aws import AWSClients
 from typing import List, Dict, Any, Generator, Optional, Tuple, Iterator
 from chalicelib.utils.decorators import result_handler
 from chalicelib.utils.time_util import TimeUtil
@@ -16,6 +16,9 @@ from chalicelib.constants import (
 from chalicelib.config import Config
 from chalicelib.exceptions import ValidationError
 from chalicelib.responses import GetVoiceUploadUrlResponse, GetVoiceDownloadUrlResponse
+from chalicelib.models.upload import Upload
+from chalicelib.enums.upload import UploadStatus
+from chalicelib.repositories.upload import UploadRepository
 from botocore.exceptions import ClientError
 import re
 
@@ -24,8 +27,9 @@ logger = logging.getLogger(__name__)
 class StorageService:
 
     def __init__(self):
-        self.s3_client = S3Client()
-        self.aws_config = Config.get_aws_config()
+        self.s3_client = AWSClients.get_s3()
+        self.aws_settings = Config.get_aws_settings()
+        self.upload_repository = UploadRepository()
 
         
     @result_handler
@@ -63,16 +67,23 @@ class StorageService:
         
         content_type = content_type_map.get(file_extension, 'application/octet-stream')
         
-        s3_client = S3Client()
-        
-        bucket_name = self.aws_config['S3_BUCKET']
-        expiration = int(self.aws_config.get('UPLOAD_URL_EXPIRES_IN', 3600))
-        presigned_url = s3_client.generate_upload_url(
+        bucket_name = self.aws_settings.s3_bucket
+        expiration = self.aws_settings.upload_url_expires_in
+        presigned_url = self.s3_client.generate_upload_url(
             bucket=bucket_name,
             key=s3_key,
             expiration=expiration,
             content_type=content_type
         )
+
+        # upload_id → S3キーの対応を登録（アップロード完了はS3イベントで確定する）
+        Upload(
+            upload_id=upload_id,
+            s3_key=s3_key,
+            upload_status=UploadStatus.ISSUED,
+            content_type=content_type,
+            original_filename=filename,
+        ).save()
         
         return GetVoiceUploadUrlResponse(
             upload_id=upload_id,
@@ -95,30 +106,12 @@ class StorageService:
         if not re.match(UPLOAD_ID_REGEX, upload_id):
             raise ValidationError("Invalid upload_id format")
 
-        # 現在の仕様ではDynamoDB等にuploadレコードを保持していないため、
-        # プレフィックス検索でS3上の実体を確認する（PoC想定）。
-        bucket_name = self.aws_config['S3_BUCKET']
-        prefix = f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}"
-        objects = self.s3_client.list_objects(bucket_name, prefix)
+        upload = self.resolve_upload(upload_id, self.upload_repository.find(upload_id))
 
-        if not objects:
-            raise ValidationError("Upload not found")
-
-        # 最初の一致オブジェクトを採用
-        obj = objects[0]
-        key = obj['Key']
-        size = obj.get('Size')
+        bucket_name = self.aws_settings.s3_bucket
+        key = upload.s3_key
 
-        # ContentType取得（ヘッダのみ）
-        content_type = 'application/octet-stream'
-        try:
-            head = self.s3_client.client.head_object(Bucket=bucket_name, Key=key)
-            content_type = head.get('ContentType', content_type)
-            size = head.get('ContentLength', size)
-        except ClientError as e:
-            logger.warning("Failed to head_object for %s: %s", key, e)
-
-        expiration = int(self.aws_config.get('DOWNLOAD_URL_EXPIRES_IN', 300))
+        expiration = self.aws_settings.download_url_expires_in
         presigned_url = self.s3_client.generate_download_url(
             bucket=bucket_name,
             key=key,
@@ -128,8 +121,96 @@ class StorageService:
         return GetVoiceDownloadUrlResponse(
             upload_id=upload_id,
             presigned_url=presigned_url,
-            content_type=content_type,
-            size=size,
+            content_type=upload.content_type or 'application/octet-stream',
+            size=upload.size,
             expires_in=expiration,
-            created_at=None  # 将来メタデータ管理を導入した際に設定
-        )
\ No newline at end of file
+            created_at=upload.created_at
+        )
+
+    def confirm_upload(self, source_key: str, size: Optional[int] = None) -> None:
+        """S3へのアップロード完了イベントを受けてアップロード情報を確定"""
+        filename = source_key[len(TRANSCRIPTION_SOURCE_KEY_PREFIX):]
+        upload_id = os.path.splitext(filename)[0]
+
+        if not self.upload_repository.mark_stored(upload_id, size=size):
+            logger.warning("Upload record not found for uploaded object: %s", source_key)
+            return
+
+        logger.info("Confirmed upload: %s (size: %s)", upload_id, size)
+
+    def resolve_upload(self, upload_id: str, upload: Optional[Upload]) -> Upload:
+        """
+        upload_idのアップロード済みの音声を返す
+
+        登録がない場合は、登録テーブル導入前（または登録の有効期限切れ）のアップロードとして
+        従来どおりS3のプレフィックス検索で探し、見つかった場合は登録し直す。
+        URLの発行のみ記録されている場合は、S3の実体を確認してから返す。
+
+        Args:
+            upload_id: アップロードID
+            upload: 登録テーブルから取得したアップロード（登録がない場合はNone）
+
+        Raises:
+            ValidationError: アップロードが存在しない、または完了していない場合
+        """
+        if upload is None:
+            upload = self._find_unregistered_upload(upload_id)
+
+        if upload.upload_status != UploadStatus.STORED:
+            upload = self._confirm_issued_upload(upload)
+
+        return upload
+
+    def _find_unregistered_upload(self, upload_id: str) -> Upload:
+        """登録のないupload_idをS3のプレフィックス検索で探し、登録する"""
+        bucket_name = self.aws_settings.s3_bucket
+        objects = [
+            obj for obj in self.s3_client.list_objects(bucket_name, f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}")
+            if os.path.splitext(obj['Key'][len(TRANSCRIPTION_SOURCE_KEY_PREFIX):])[0] == upload_id
+        ]
+        if not objects:
+            raise ValidationError(f"Upload not found: {upload_id}")
+
+        obj = objects[0]
+        upload = Upload(
+            upload_id=upload_id,
+            s3_key=obj['Key'],
+            upload_status=UploadStatus.STORED,
+            size=obj.get('Size'),
+            created_at=TimeUtil.format_jst(obj['LastModified']) if obj.get('LastModified') else None,
+        )
+        try:
+            head = self.s3_client.client.head_object(Bucket=bucket_name, Key=upload.s3_key)
+            upload.content_type = head.get('ContentType')
+            upload.size = head.get('ContentLength', upload.size)
+        except ClientError as e:
+            logger.warning("Failed to head_object for %s: %s", upload.s3_key, e)
+        upload.stored_at = upload.created_at
+
+        # 登録に失敗しても、次回も同じ検索で見つかるため応答は続ける
+        try:
+            self.upload_repository.create_if_not_exists(upload)
+            logger.info("Registered unregistered upload: %s", upload_id)
+        except Exception as e:
+            logger.warning("Failed to register upload %s: %s", upload_id, e)
+        return upload
+
+    def _confirm_issued_upload(self, upload: Upload) -> Upload:
+        """
+        S3イベント到着前のアップロードを確定
+
+        アップロード直後はイベントの反映が遅れることがあるため、
+        登録済みのS3キーに対してのみhead_objectで実体を確認する。
+        """
+        try:
+            head = self.s3_client.client.head_object(Bucket=self.aws_settings.s3_bucket, Key=upload.s3_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise ValidationError(f"Upload not completed: {upload.upload_id}")
+            raise
+
+        upload.upload_status = UploadStatus.STORED
+        upload.size = head.get('ContentLength', upload.size)
+        upload.content_type = head.get('ContentType', upload.content_type)
+        self.upload_repository.mark_stored(upload.upload_id, size=upload.size, content_type=upload.content_type)
+        return upload
\ No newline at end of file
@@ -0,0 +1,286 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+class JsonObjectStreamParser:
+    """
+    ストリームで届くJSONオブジェクトを逐次解析し、完成したトップレベルのメンバーから順に返すパーサー
+
+    デリミター（例: ###JSON###）で囲まれた出力を想定し、開始デリミターより前のテキストは読み飛ばす。
+    オブジェクトが閉じた時点、または終了デリミターを検出した時点でdoneになる。
+
+    Example:
+        parser = JsonObjectStreamParser("###JSON###")
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                ...
+            if parser.done:
+                break
+    """
+
+    def __init__(self, delimiter: Optional[str] = None):
+        self.delimiter = delimiter
+        self.text = ""  # 受信したテキスト全体
+        self.done = False
+        self.closed = False  # オブジェクトの「}」まで受信したかどうか
+
+        self._object_start: Optional[int] = None  # トップレベルの「{」の位置
+        self._member_start = 0
+        self._position = 0  # 次に走査する位置
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        テキストを追加し、新たに完成したトップレベルのメンバーを返す
+
+        Returns:
+            (キー, 値) のリスト
+        """
+        if self.done or not chunk:
+            return []
+
+        self.text += chunk
+
+        if self._object_start is None and not self._find_object_start():
+            return []
+
+        members = self._scan()
+
+        if not self.done and self.delimiter and self.text.find(self.delimiter, self._object_start) != -1:
+            # オブジェクトが閉じる前に終了デリミターが現れた場合もそこで打ち切る
+            self.done = True
+
+        return members
+
+    @property
+    def object_text(self) -> Optional[str]:
+        """解析中（または解析済み）のJSONオブジェクトのテキスト"""
+        if self._object_start is None:
+            return None
+        return self.text[self._object_start:self._position]
+
+    def _find_object_start(self) -> bool:
+        search_from = 0
+        if self.delimiter:
+            delimiter_index = self.text.find(self.delimiter)
+            if delimiter_index == -1:
+                return False
+            search_from = delimiter_index + len(self.delimiter)
+
+        brace_index = self.text.find("{", search_from)
+        if brace_index == -1:
+            return False
+
+        self._object_start = brace_index
+        self._position = brace_index + 1
+        self._member_start = brace_index + 1
+        self._depth = 1
+        return True
+
+    def _scan(self) -> List[Tuple[str, Any]]:
+        members = []
+        text = self.text
+
+        while self._position < len(text):
+            char = text[self._position]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._complete_member(self._position - 1))
+                    self.closed = True
+                    self.done = True
+                    break
+            elif char == "," and self._depth == 1:
+                members.extend(self._complete_member(self._position - 1))
+                self._member_start = self._position
+
+        return members
+
+    def _complete_member(self, end: int) -> List[Tuple[str, Any]]:
+        """トップレベルの区切り（「,」または「}」）までのテキストを1つのメンバーとして解析"""
+        member_text = self.text[self._member_start:end].strip()
+        if not member_text:
+            return []
+        return list(json.loads("{" + member_text + "}").items())
+
+
+# 文字列と、括弧・引用符以外の文字の並び（括弧の直前まで、または閉じていない文字列の「"」の直前までに一致する）
+_SKIP_PATTERN = re.compile(r'(?:"[^"\\]*(?:\\.[^"\\]*)*"|[^"\[\]{}]+)*')
+_STRING_PATTERN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR_PATTERN = re.compile(r'[^,:\]}\s]*')
+_WHITESPACE_PATTERN = re.compile(r'\s*')
+
+
+class JsonPathStreamReader:
+    """
+    バイト列のチャンクで届くJSONから、指定したパスの値だけを読み出すリーダー
+
+    パス上にないメンバー・要素は値を構築せずに読み飛ばし、読み終えたテキストは破棄するため、
+    メモリ使用量は全体の大きさではなく、チャンクの大きさと読み出す値の大きさで決まる。
+    パスの値を読み終えた時点で以降のチャンクは読まない。
+
+    Example:
+        reader = JsonPathStreamReader(body.iter_chunks())
+        text = reader.read(("results", "transcripts", 0, "transcript"), default="")
+    """
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str = "utf-8"):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._position = 0
+        self._capture_start: Optional[int] = None  # 値を読み出し中の場合、その開始位置
+        self._eof = False
+
+    def read(self, path: Sequence[Union[str, int]], default: Any = None) -> Any:
+        """
+        パスの値を読み出す
+
+        Args:
+            path: オブジェクトのキー（str）と配列の添字（int）の並び
+            default: パスが存在しない場合の値
+
+        Raises:
+            ValueError: JSONとして不正な場合
+        """
+        for step in path:
+            if not self._descend(step):
+                return default
+        return self._read_value()
+
+    def _descend(self, step: Union[str, int]) -> bool:
+        """現在の値（オブジェクトまたは配列）の中のstepの値の直前まで進む。存在しない場合はFalse"""
+        opening = "{" if isinstance(step, str) else "["
+        if self._peek() != opening:
+            return False
+        self._position += 1
+
+        index = 0
+        while True:
+            char = self._peek()
+            if char == "":
+                raise ValueError("Unexpected end of JSON")
+            if char in "}]":
+                return False
+            if isinstance(step, str):
+                key = self._read_string()
+                self._expect(":")
+                if key == step:
+                    return True
+            elif index == step:
+                return True
+
+            self._skip_value()
+            index += 1
+            separator = self._peek()
+            if separator in ("}", "]"):
+                return False
+            self._expect(",")
+
+    def _read_value(self) -> Any:
+        self._peek()
+        self._capture_start = self._position
+        try:
+            self._skip_value()
+            return json.loads(self._buffer[self._capture_start:self._position])
+        finally:
+            self._capture_start = None
+
+    def _read_string(self) -> str:
+        if self._peek() != '"':
+            raise ValueError(f"Expected string at offset {self._position}")
+        return self._read_value()
+
+    def _skip_value(self) -> None:
+        """現在の値を構築せずに読み飛ばす"""
+        char = self._peek()
+        if char == "":
+            raise ValueError("Unexpected end of JSON")
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in "{[":
+            while True:
+                end = _SCALAR_PATTERN.match(self._buffer, self._position).end()
+                if end < len(self._buffer):
+                    self._position = end
+                    return
+                if not self._fill():
+                    self._position = len(self._buffer)
+                    return
+
+        depth = 0
+        while True:
+            self._position = _SKIP_PATTERN.match(self._buffer, self._position).end()
+            if self._position == len(self._buffer) or self._buffer[self._position] == '"':
+                # チャンクの終わり、またはチャンクをまたぐ文字列
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON")
+                continue
+            char = self._buffer[self._position]
+            self._position += 1
+            depth += 1 if char in "{[" else -1
+            if depth == 0:
+                return
+
+    def _skip_string(self) -> None:
+        while True:
+            match = _STRING_PATTERN.match(self._buffer, self._position)
+            if match:
+                self._position = match.end()
+                return
+            if not self._fill():
+                raise ValueError("Unterminated string")
+
+    def _peek(self) -> str:
+        """空白を読み飛ばし、次の文字を返す（終端の場合は空文字）"""
+        while True:
+            self._position = _WHITESPACE_PATTERN.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self._position}")
+        self._position += 1
+
+    def _fill(self) -> bool:
+        """次のチャンクを読み込む。読み終えたテキスト（読み出し中の値を除く）はここで破棄する"""
+        if self._eof:
+            return False
+
+        keep_from = self._position if self._capture_start is None else self._capture_start
+        self._buffer = self._buffer[keep_from:]
+        self._position -= keep_from
+        if self._capture_start is not None:
+            self._capture_start = 0
+
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return False
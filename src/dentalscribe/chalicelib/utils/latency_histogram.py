@@ -0,0 +1,57 @@
+import math
+import threading
+from typing import List, Optional
+
+
+class LatencyHistogram:
+    """
+    レイテンシー（秒）の分布をメモリ上に保持するヒストグラム
+
+    バケットは対数間隔（MIN_SECONDS から GROWTH 倍ずつ）とし、パーセンタイルはバケットの上限値で返す（誤差はGROWTH倍以内）。
+    件数がMAX_SAMPLESに達するたびに全バケットを半減させ、古い計測ほど影響を小さくする。
+    """
+
+    MIN_SECONDS = 0.01
+    GROWTH = 1.25
+    BUCKET_COUNT = 64  # 0.01秒 〜 約16000秒
+    MAX_SAMPLES = 1000
+
+    def __init__(self):
+        self._counts: List[int] = [0] * self.BUCKET_COUNT
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def record(self, seconds: float) -> None:
+        index = self._bucket_index(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            if self._count >= self.MAX_SAMPLES:
+                self._counts = [count // 2 for count in self._counts]
+                self._count = sum(self._counts)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """percent（0〜100）パーセンタイルのレイテンシー（秒）。計測がない場合はNone"""
+        with self._lock:
+            if self._count == 0:
+                return None
+            threshold = math.ceil(self._count * percent / 100)
+            cumulative = 0
+            for index, count in enumerate(self._counts):
+                cumulative += count
+                if cumulative >= threshold and cumulative > 0:
+                    return self._upper_bound(index)
+        return self._upper_bound(self.BUCKET_COUNT - 1)
+
+    def _bucket_index(self, seconds: float) -> int:
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        index = math.ceil(math.log(seconds / self.MIN_SECONDS, self.GROWTH))
+        return min(index, self.BUCKET_COUNT - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        return self.MIN_SECONDS * self.GROWTH ** index
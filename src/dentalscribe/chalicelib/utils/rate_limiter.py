@@ -0,0 +1,214 @@
+import logging
+import random
+import time
+from typing import Callable, Dict, Optional
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+
+class DynamoDBBucketStore:
+    """
+    トークンバケットの状態をDynamoDBに保存するストア（Lambdaのコンテナ間で共有する）
+
+    更新は前回のupdated_atを条件とする条件付き書き込みで行い、同時に更新された場合は失敗を返す。
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+
+    def get(self, bucket_id: str) -> Optional[Dict[str, float]]:
+        from chalicelib.clients.aws import AWSClients
+
+        item = AWSClients.get_dynamodb().get_item(self.table_name, {"bucket_id": {"S": bucket_id}}, consistent_read=True)
+        if not item:
+            return None
+        return {
+            "requests": float(item["requests"]["N"]),
+            "tokens": float(item["tokens"]["N"]),
+            "updated_at": int(item["updated_at"]["N"]),
+        }
+
+    def put(self, bucket_id: str, state: Dict[str, float], expected_updated_at: Optional[int]) -> bool:
+        from chalicelib.clients.aws import AWSClients
+
+        expression_attribute_values = {
+            ":requests": {"N": str(state["requests"])},
+            ":tokens": {"N": str(state["tokens"])},
+            ":updated_at": {"N": str(state["updated_at"])},
+        }
+        if expected_updated_at is None:
+            condition_expression = "attribute_not_exists(bucket_id)"
+        else:
+            condition_expression = "updated_at = :expected_updated_at"
+            expression_attribute_values[":expected_updated_at"] = {"N": str(expected_updated_at)}
+
+        try:
+            AWSClients.get_dynamodb().update_item(
+                table_name=self.table_name,
+                key={"bucket_id": {"S": bucket_id}},
+                update_expression="SET requests = :requests, tokens = :tokens, updated_at = :updated_at",
+                expression_attribute_values=expression_attribute_values,
+                condition_expression=condition_expression,
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+
+class InMemoryBucketStore:
+    """DynamoDBBucketStoreのメモリ上の代替（テスト・ローカル実行用）"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, float]] = {}
+
+    def get(self, bucket_id: str) -> Optional[Dict[str, float]]:
+        state = self._states.get(bucket_id)
+        return dict(state) if state else None
+
+    def put(self, bucket_id: str, state: Dict[str, float], expected_updated_at: Optional[int]) -> bool:
+        current = self._states.get(bucket_id)
+        if (current["updated_at"] if current else None) != expected_updated_at:
+            return False
+        self._states[bucket_id] = dict(state)
+        return True
+
+
+class TokenBucketRateLimiter:
+    """
+    リクエスト数/分とトークン数/分のトークンバケットによるレートリミッター
+
+    両方のバケットを1つの状態として保存し、1回の条件付き書き込みで同時に消費する。
+    上限が0の項目は制限しない。
+    """
+
+    # 同時更新で書き込みに失敗した場合の再試行回数
+    MAX_CONFLICT_RETRIES = 5
+
+    def __init__(
+        self,
+        bucket_id: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        store=None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bucket_id = bucket_id
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.store = store or InMemoryBucketStore()
+        self.clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        1リクエスト分とtokens分の容量を消費する
+
+        Returns:
+            float: 消費できた場合は0。できなかった場合は容量が回復するまでの秒数
+        """
+        if not self.enabled:
+            return 0.0
+
+        # 1分あたりの上限を超えるリクエストは上限まで回復すれば通す（永久に待たせない）
+        if self.tokens_per_minute > 0:
+            tokens = min(tokens, self.tokens_per_minute)
+
+        for _ in range(self.MAX_CONFLICT_RETRIES):
+            now = int(self.clock() * 1000)
+            state = self.store.get(self.bucket_id)
+            requests_available, tokens_available = self._refill(state, now)
+
+            wait_seconds = max(
+                self._wait_seconds(requests_available, 1, self.requests_per_minute),
+                self._wait_seconds(tokens_available, tokens, self.tokens_per_minute),
+            )
+            if wait_seconds > 0:
+                return wait_seconds
+
+            new_state = {
+                "requests": requests_available - 1 if self.requests_per_minute > 0 else 0,
+                "tokens": tokens_available - tokens if self.tokens_per_minute > 0 else 0,
+                "updated_at": now,
+            }
+            if self.store.put(self.bucket_id, new_state, state["updated_at"] if state else None):
+                return 0.0
+
+            # 他のコンテナと同時に更新した場合は読み直す
+            time.sleep(random.uniform(0, 0.02))
+
+        logger.warning("Rate limiter bucket %s is contended, retrying later", self.bucket_id)
+        return 0.1
+
+    def settle(self, reserved_tokens: int, used_tokens: int) -> None:
+        """
+        try_acquireで確保したトークン数を実際の使用量で精算する
+
+        確保時は出力をmax_tokensとして見積もるため、使わなかった分をバケットに戻す。
+        実際の使用量が確保した量より多い場合は、差分を追加で消費する（容量が負になれば次の確保を待たせる）。
+        精算は容量の目安の補正のため、同時更新が続く場合は諦める。
+        """
+        if self.tokens_per_minute <= 0:
+            return
+
+        difference = min(reserved_tokens, self.tokens_per_minute) - max(used_tokens, 0)
+        if difference == 0:
+            return
+
+        for _ in range(self.MAX_CONFLICT_RETRIES):
+            now = int(self.clock() * 1000)
+            state = self.store.get(self.bucket_id)
+            if state is None:
+                return
+            requests_available, tokens_available = self._refill(state, now)
+
+            new_state = {
+                "requests": requests_available,
+                "tokens": min(self.tokens_per_minute, tokens_available + difference),
+                "updated_at": now,
+            }
+            if self.store.put(self.bucket_id, new_state, state["updated_at"]):
+                return
+
+            time.sleep(random.uniform(0, 0.02))
+
+        logger.warning("Rate limiter bucket %s is contended, skipped settling %d tokens", self.bucket_id, difference)
+
+    def acquire(self, tokens: int, max_wait_seconds: float) -> float:
+        """
+        容量を消費できるまで最大max_wait_seconds秒待機する
+
+        Returns:
+            float: 消費できた場合は0。待機時間内に消費できない場合は容量が回復するまでの秒数
+        """
+        deadline = self.clock() + max_wait_seconds
+        while True:
+            wait_seconds = self.try_acquire(tokens)
+            if wait_seconds <= 0:
+                return 0.0
+            if self.clock() + wait_seconds > deadline:
+                return wait_seconds
+            time.sleep(wait_seconds)
+
+    def _refill(self, state: Optional[Dict[str, float]], now: int):
+        """経過時間に応じて回復させた(リクエスト数, トークン数)"""
+        if state is None:
+            return float(self.requests_per_minute), float(self.tokens_per_minute)
+
+        # コンテナ間の時刻のずれで経過時間が負になる場合は回復させない
+        elapsed_minutes = max(now - state["updated_at"], 0) / 60000
+        return (
+            min(self.requests_per_minute, state["requests"] + elapsed_minutes * self.requests_per_minute),
+            min(self.tokens_per_minute, state["tokens"] + elapsed_minutes * self.tokens_per_minute),
+        )
+
+    @staticmethod
+    def _wait_seconds(available: float, required: float, per_minute: int) -> float:
+        if per_minute <= 0 or available >= required:
+            return 0.0
+        return (required - available) / per_minute * 60
@@ -0,0 +1,15 @@
+import re
+
+# ASCII以外の文字（日本語等）はおおよそ1文字1トークン、ASCIIはおおよそ4文字1トークンとして見積もる
+NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+class TokenUtil:
+    """トークナイザーを使わずにトークン数を見積もるユーティリティクラス（分割・ルーティングの判定用）"""
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        if not text:
+            return 0
+        non_ascii = len(NON_ASCII.findall(text))
+        return non_ascii + (len(text) - non_ascii + 3) // 4
@@ -0,0 +1,271 @@
+import re
+from itertools import repeat
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+from chalicelib.constants import TRANSCRIPT_LOW_CONFIDENCE_MARK
+from chalicelib.utils.token_util import TokenUtil
+
+# 文の区切り（区切り文字の直後で分割する）
+SENTENCE_BOUNDARY = re.compile(r"(?<=[。！？!?])|(?<=\. )|\n+")
+# 話者ラベル（複数ファイルの場合はファイル番号付き。信頼度の低いターンは印付き）
+_LOW_CONFIDENCE_MARK = re.escape(TRANSCRIPT_LOW_CONFIDENCE_MARK)
+SPEAKER_PREFIX = re.compile(rf"^(?:[\w:-]+(?: {_LOW_CONFIDENCE_MARK})?|{_LOW_CONFIDENCE_MARK}): ")
+
+
+class TranscriptUtil:
+    """Amazon TranscribeのJSON結果を扱うユーティリティクラス"""
+
+    # 単語間を空白で区切らない言語
+    NO_SPACE_LANGUAGES = ("ja", "zh")
+
+    # 全文テキストのJSONパス（extract_textと同じ値をS3から逐次読み出す場合に使用）
+    TEXT_PATH = ("results", "transcripts", 0, "transcript")
+
+    # build_speaker_turnsでitemsから列を取り出す単位（件）
+    COLUMN_BLOCK_SIZE = 1024
+
+    @staticmethod
+    def word_separator(language_code: Optional[str]) -> str:
+        """
+        言語コードに応じた単語の区切り文字を返す
+
+        Args:
+            language_code: Transcribeの言語コード（例: ja-JP）
+
+        Returns:
+            str: 区切り文字
+        """
+        if language_code and language_code.split("-")[0].lower() in TranscriptUtil.NO_SPACE_LANGUAGES:
+            return ""
+        return " "
+
+    @staticmethod
+    def extract_text(transcribe_result: Dict[str, Any]) -> str:
+        """
+        Transcribe結果から全文テキストを取得する
+
+        Args:
+            transcribe_result: TranscribeのJSON結果
+
+        Returns:
+            str: 文字起こしテキスト
+        """
+        transcripts = transcribe_result.get("results", {}).get("transcripts", [])
+        if transcripts:
+            return transcripts[0].get("transcript", "")
+        return ""
+
+    @staticmethod
+    def get_duration(transcribe_result: Dict[str, Any]) -> float:
+        """
+        Transcribe結果から音声の長さ（秒）を取得する
+
+        Args:
+            transcribe_result: TranscribeのJSON結果
+
+        Returns:
+            float: 最後の単語の終了時刻（秒）。単語がない場合は0.0
+        """
+        duration = 0.0
+        for item in transcribe_result.get("results", {}).get("items", []):
+            end_time = item.get("end_time")
+            if end_time is not None:
+                duration = max(duration, float(end_time))
+        return duration
+
+    @staticmethod
+    def build_speaker_turns(transcribe_result: Dict[str, Any], separator: str = " ") -> List[Dict[str, Any]]:
+        """
+        話者ラベルと単語列から、話者ごとの発話（ターン）を組み立てる
+
+        itemsの各値は map(dict.get, ...) で列として取り出し（単語ごとのPythonの処理を挟まない）、
+        話者の割り当て・ターンの境界・区切り文字・信頼度の集計をNumPyの配列演算で行う。
+        Pythonのループはターン単位（テキストの連結と、先頭・末尾の単語の時刻の読み出し）のみ。
+
+        Args:
+            transcribe_result: TranscribeのJSON結果
+            separator: 単語の区切り文字
+
+        Returns:
+            List[Dict]: {"speaker", "start_time", "end_time", "text", "confidence"} のリスト。
+            confidenceはターン内の単語の信頼度の平均（信頼度がない場合はNone）
+        """
+        # numpyの読み込みは重いため、ターンを組み立てる時のみ読み込む（API呼び出しのコールドスタートを遅くしない）
+        import numpy as np
+
+        results = transcribe_result.get("results", {})
+        items = results.get("items", [])
+        count = len(items)
+        if not count:
+            return []
+
+        types, contents, confidences, labels = TranscriptUtil._item_columns(items)
+        is_word = np.array(types, dtype=object) != "punctuation"
+        if not is_word.any():
+            return []
+        labels = np.array(labels, dtype=object)
+
+        # 旧形式の出力では単語に話者ラベルが付かないため、開始時刻を含む話者区間から話者を引く
+        segments = results.get("speaker_labels", {}).get("segments", [])
+        unlabeled = np.flatnonzero(np.equal(labels, None) & is_word) if segments else ()
+        if len(unlabeled):
+            segments = sorted(segments, key=lambda segment: float(segment.get("start_time") or 0.0))
+            segment_starts = np.array([segment.get("start_time") or 0.0 for segment in segments], dtype=np.float64)
+            start_times = np.array([items[index].get("start_time") or 0.0 for index in unlabeled.tolist()], dtype=np.float64)
+            segment_index = np.searchsorted(segment_starts, start_times, side="right") - 1
+            segment_labels = np.array([None] + [segment.get("speaker_label") for segment in segments], dtype=object)
+            labels[unlabeled] = segment_labels[segment_index + 1]
+
+        # 句読点は直前の単語の話者とする（最初の単語より前の句読点は捨てる）
+        offset = int(np.argmax(is_word))
+        owner = np.maximum.accumulate(np.where(is_word, np.arange(count), 0))[offset:]
+        speakers = labels[owner]
+        is_word = is_word[offset:]
+
+        # 話者が変わる位置でターンを区切る
+        boundary = np.empty(speakers.size, dtype=bool)
+        boundary[0] = True
+        boundary[1:] = speakers[1:] != speakers[:-1]
+        turn_starts = np.flatnonzero(boundary)
+        turn_ends = np.append(turn_starts[1:], speakers.size)
+        turn_last_words = owner[turn_ends - 1]
+
+        # ターン内の2語目以降の単語の前にのみ区切り文字を入れる（区切り文字と単語を交互に並べ、ターンごとに連結する）
+        pieces = contents[offset:] if offset else contents
+        stride = 1
+        if separator:
+            glued = [""] * (2 * len(pieces))
+            glued[0::2] = np.where(is_word & ~boundary, separator, "").tolist()
+            glued[1::2] = pieces
+            pieces, stride = glued, 2
+
+        # ターンごとの単語の信頼度の平均
+        word_confidences = confidences[offset:]
+        has_confidence = is_word & ~np.isnan(word_confidences)
+        confidence_sums = np.add.reduceat(np.where(has_confidence, word_confidences, 0.0), turn_starts)
+        confidence_counts = np.add.reduceat(has_confidence.astype(np.int64), turn_starts)
+        turn_confidences = np.round(confidence_sums / np.maximum(confidence_counts, 1), 3).tolist()
+
+        turns = []
+        for first, last, last_word_index, turn_confidence, confidence_count in zip(
+            turn_starts.tolist(), turn_ends.tolist(), turn_last_words.tolist(),
+            turn_confidences, confidence_counts.tolist()
+        ):
+            first_word = items[offset + first]
+            last_word = items[last_word_index]
+            turns.append({
+                "speaker": speakers[first],
+                "start_time": float(first_word.get("start_time") or 0.0),
+                "end_time": float(last_word.get("end_time") or last_word.get("start_time") or 0.0),
+                "text": "".join(pieces[first * stride:last * stride]),
+                "confidence": turn_confidence if confidence_count else None,
+            })
+        return turns
+
+    @staticmethod
+    def _item_columns(items: List[Dict[str, Any]]):
+        """
+        itemsから (type, content, confidence, speaker_label) の列を取り出す
+
+        Transcribeの出力はalternativesを必ず持つため、dict.getのmapで取り出す（単語ごとのPythonの処理を挟まない）。
+        列ごとにitems全体を走査すると、長い録音ではitemsがCPUキャッシュに収まらず遅くなるため、
+        COLUMN_BLOCK_SIZE件ずつ全ての列を取り出す。
+
+        Returns:
+            (typeのリスト, contentのリスト, 信頼度の配列（ない場合はNaN）, speaker_labelのリスト)
+        """
+        import numpy as np
+
+        types, contents, labels = [], [], []
+        confidences = np.empty(len(items), dtype=np.float64)
+        for block_start in range(0, len(items), TranscriptUtil.COLUMN_BLOCK_SIZE):
+            block = items[block_start:block_start + TranscriptUtil.COLUMN_BLOCK_SIZE]
+            count = len(block)
+            try:
+                alternatives = list(map(itemgetter(0), map(itemgetter("alternatives"), block)))
+            except (KeyError, IndexError, TypeError):
+                alternatives = [(item.get("alternatives") or [{}])[0] for item in block]
+
+            block_contents = list(map(dict.get, alternatives, repeat("content", count)))
+            if None in block_contents:
+                block_contents = [content or "" for content in block_contents]
+            contents += block_contents
+
+            block_confidences = list(map(dict.get, alternatives, repeat("confidence", count)))
+            if None in block_confidences or "" in block_confidences:
+                block_confidences = [confidence or "nan" for confidence in block_confidences]
+            confidences[block_start:block_start + count] = np.array(block_confidences, dtype=np.float64)
+
+            types += map(dict.get, block, repeat("type", count))
+            labels += map(dict.get, block, repeat("speaker_label", count))
+        return types, contents, confidences, labels
+
+    @staticmethod
+    def format_turns(
+        speaker_turns: List[Dict[str, Any]],
+        low_confidence_threshold: float = 0.0,
+        speaker_namespace: Optional[str] = None
+    ) -> List[str]:
+        """
+        ターンを「話者: 発話」形式の行にする（話者ラベルがないターンは発話のみ）
+
+        信頼度がlow_confidence_threshold未満のターンは、話者ラベルに「(低信頼度)」を付ける。
+        speaker_namespaceを指定した場合は話者ラベルの前に付ける（例: file1:spk_0）。
+        Transcribeの話者ラベルは録音ファイルごとに振られるため、複数ファイルを結合する場合に使用する。
+        """
+        lines = []
+        for turn in speaker_turns:
+            if not turn.get("text"):
+                continue
+            confidence = turn.get("confidence")
+            low_confidence = confidence is not None and confidence < low_confidence_threshold
+            speaker = turn.get("speaker") or ""
+            if speaker and speaker_namespace:
+                speaker = f"{speaker_namespace}:{speaker}"
+            if low_confidence:
+                speaker = f"{speaker} {TRANSCRIPT_LOW_CONFIDENCE_MARK}".strip()
+            lines.append(f"{speaker}: {turn['text']}" if speaker else turn["text"])
+        return lines
+
+    @staticmethod
+    def split_into_chunks(segments: List[str], max_tokens: int) -> List[str]:
+        """
+        発話（ターン）の境界で、見積もりトークン数がmax_tokens以下のチャンクに分割する
+
+        1つのターンがmax_tokensを超える場合のみ、文の境界（それでも超える場合は文字数）で分割する。
+
+        Args:
+            segments: ターンのテキストのリスト（順序を保持する）
+            max_tokens: チャンクあたりの見積もりトークン数の上限
+
+        Returns:
+            List[str]: 改行でターンを連結したチャンクのリスト
+        """
+        pieces = []
+        for segment in segments:
+            if TokenUtil.estimate_tokens(segment) <= max_tokens:
+                pieces.append(segment)
+                continue
+            # 分割後の各部分にも話者を付ける
+            speaker = SPEAKER_PREFIX.match(segment)
+            prefix = speaker.group(0) if speaker else ""
+            max_length = max(max_tokens - TokenUtil.estimate_tokens(prefix), 1)
+            for sentence in SENTENCE_BOUNDARY.split(segment[len(prefix):]):
+                while TokenUtil.estimate_tokens(sentence) > max_length:
+                    # 見積もりは1文字1トークン以下のため、max_length文字ずつ切り出せば上限を超えない
+                    pieces.append(prefix + sentence[:max_length])
+                    sentence = sentence[max_length:]
+                if sentence.strip():
+                    pieces.append(prefix + sentence)
+
+        chunks, current, current_tokens = [], [], 0
+        for piece in pieces:
+            piece_tokens = TokenUtil.estimate_tokens(piece) + 1  # 改行の分
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
@@ -0,0 +1,109 @@
+"""
+ジョブの進捗イベントのストリーミング配信（Server-Sent Events）
+
+API Gateway（REST）はLambdaのレスポンスをバッファリングするため、接続を保ったままイベントを送る配信は
+関数URL（InvokeMode: RESPONSE_STREAM）のLambdaで行う。PythonのLambdaはレスポンスを直接ストリーミングできないため、
+Lambda Web AdapterのもとでこのHTTPサーバーを起動し、書き込んだチャンクをそのままクライアントへ中継させる
+（infra/job_events_stream/Dockerfile、terraform/job_events_stream.tf）。ローカルでは `python job_events_stream.py` で起動する。
+
+    GET /jobs/voice2soap/{job_id}/events?token=...   （events-tokenのAPIで発行したトークン）
+"""
+import json
+import logging
+import os
+import re
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlsplit
+from chalicelib.exceptions.handler import handle_error
+from chalicelib.services.job_event import SSE_HEADERS
+from chalicelib.utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH_REGEX = re.compile(r"^/jobs/voice2soap/(?P<job_id>[^/]+)/events/?$")
+
+
+class JobEventStreamRequestHandler(BaseHTTPRequestHandler):
+    # チャンク転送で送るためHTTP/1.1で応答する
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/":
+            # Lambda Web Adapterの起動確認
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+            return
+
+        match = EVENTS_PATH_REGEX.match(url.path)
+        if not match:
+            self._send_json(HTTPStatus.NOT_FOUND, {"message": "Not found", "status_code": HTTPStatus.NOT_FOUND})
+            return
+
+        query_params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        # EventSourceの再接続時はLast-Event-IDヘッダー、初回接続時はクエリパラメータで再開位置を受け取る
+        last_event_id = self.headers.get("Last-Event-ID") or query_params.get("last_event_id")
+        try:
+            frames = self.server.job_event_service.open_voice2soap_job_event_stream(
+                match.group("job_id"), query_params.get("token"), last_event_id
+            )
+        except Exception as e:
+            response = handle_error(e)
+            self._send_json(response.status_code, response.body)
+            return
+
+        self.send_response(HTTPStatus.OK)
+        for name, value in SSE_HEADERS.items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for frame in frames:
+                self._write_chunk(frame.encode("utf-8"))
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # クライアントが切断した場合は確認を止める
+            logger.info("Client disconnected from job event stream: %s", match.group("job_id"))
+        finally:
+            frames.close()
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status_code: int, body: Dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(job_event_service=None, host: str = "0.0.0.0", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    ストリーミング配信のHTTPサーバーを作成
+
+    Args:
+        job_event_service: 配信に使うJobEventService（テストではInMemoryJobEventRepositoryを渡したもの）
+    """
+    if job_event_service is None:
+        from chalicelib.service_container import ServiceContainer
+        job_event_service = ServiceContainer.get_job_event_service()
+
+    server = ThreadingHTTPServer((host, port), JobEventStreamRequestHandler)
+    server.daemon_threads = True
+    server.job_event_service = job_event_service
+    return server
+
+
+if __name__ == "__main__":
+    setup_logging()
+    # Lambda Web AdapterはAWS_LWA_PORT（既定8080）に転送する
+    server = create_server(port=int(os.environ.get("AWS_LWA_PORT", os.environ.get("PORT", 8080))))
+    logger.info("Job event stream server listening on %s:%s", *server.server_address)
+    server.serve_forever()
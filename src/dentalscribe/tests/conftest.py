@@ -0,0 +1,82 @@
+import os
+
+# chalicelibの設定は読み込み時に環境変数を参照するため、インポートより前に設定する
+os.environ.update({
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "S3_BUCKET": "test-bucket",
+    "SQS_JOB_QUEUE": "test-job-queue",
+    "SQS_JOB_FAILED_QUEUE": "test-job-failed-queue",
+    "BEDROCK_REGION": "us-east-1",
+    "BEDROCK_MODEL_ID": "anthropic.claude-test",
+    "DYNAMODB_JOB_TABLE": "test-jobs",
+    "DYNAMODB_UPLOAD_TABLE": "test-uploads",
+    "DYNAMODB_BEDROCK_CACHE_TABLE": "test-bedrock-cache",
+    "DYNAMODB_RATE_LIMIT_TABLE": "test-rate-limit",
+    "AUTHORIZER_LAMBDA_ARN": "",
+    "JWT_SECRET_KEY": "test-secret-key-for-job-event-tokens",
+})
+
+import boto3
+import pytest
+
+
+def _index(name: str, key: str) -> dict:
+    return {"IndexName": name, "KeySchema": [{"AttributeName": key, "KeyType": "HASH"}], "Projection": {"ProjectionType": "ALL"}}
+
+
+@pytest.fixture(scope="session")
+def aws():
+    """motoによるAWS（DynamoDB・S3・SQS）。テーブル・バケット・キューはセッションで共有する"""
+    from moto import mock_aws
+
+    with mock_aws():
+        dynamodb = boto3.client("dynamodb")
+        dynamodb.create_table(
+            TableName=os.environ["DYNAMODB_JOB_TABLE"],
+            KeySchema=[{"AttributeName": "job_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": name, "AttributeType": "S"} for name in ("job_id", "parent_job_id", "job_type")
+            ],
+            GlobalSecondaryIndexes=[_index("job_type-index", "job_type"), _index("parent_job_id-index", "parent_job_id")],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for table_name, key in (
+            (os.environ["DYNAMODB_UPLOAD_TABLE"], "upload_id"),
+            (os.environ["DYNAMODB_BEDROCK_CACHE_TABLE"], "cache_key"),
+            (os.environ["DYNAMODB_RATE_LIMIT_TABLE"], "bucket_id"),
+        ):
+            dynamodb.create_table(
+                TableName=table_name,
+                KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+        boto3.client("s3").create_bucket(Bucket=os.environ["S3_BUCKET"])
+        sqs = boto3.client("sqs")
+        sqs.create_queue(QueueName=os.environ["SQS_JOB_QUEUE"])
+        sqs.create_queue(QueueName=os.environ["SQS_JOB_FAILED_QUEUE"])
+        yield
+
+
+@pytest.fixture
+def job_queue_messages(aws):
+    """ジョブキューに送信されたメッセージを取り出す関数（取り出したメッセージは削除する）"""
+    import json
+
+    sqs = boto3.client("sqs")
+    queue_url = sqs.get_queue_url(QueueName=os.environ["SQS_JOB_QUEUE"])["QueueUrl"]
+
+    def receive() -> list:
+        messages = []
+        while True:
+            received = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages", [])
+            if not received:
+                return messages
+            for message in received:
+                messages.append(json.loads(message["Body"]))
+                sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"])
+
+    receive()
+    return receive
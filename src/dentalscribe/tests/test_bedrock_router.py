@@ -0,0 +1,277 @@
+import io
+import json
+import threading
+import pytest
+from botocore.exceptions import ClientError
+from chalicelib.clients.aws import AWSClients
+from chalicelib.clients.aws.bedrock_router import BedrockEndpoint, BedrockRouter
+from chalicelib.exceptions import BedrockThrottlingError
+from chalicelib.utils.rate_limiter import InMemoryBucketStore, TokenBucketRateLimiter
+
+
+class FakeClock:
+    """テストで進める時刻（秒）"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    """invoke_modelの応答（または送出するエラー）を返す偽のBedrockクライアント"""
+
+    def __init__(self, response=None, error: Exception = None, block: threading.Event = None):
+        self.response = response
+        self.error = error
+        self.block = block
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        if self.block is not None:
+            self.block.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def client_error(code: str, status_code: int) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status_code}},
+        "InvokeModel",
+    )
+
+
+def endpoint(region: str, client: FakeClient, clock: FakeClock, **limits) -> BedrockEndpoint:
+    rate_limiter = TokenBucketRateLimiter(
+        f"bedrock#{region}#model",
+        limits.get("requests_per_minute", 0),
+        limits.get("tokens_per_minute", 0),
+        store=InMemoryBucketStore(),
+        clock=clock,
+    )
+    return BedrockEndpoint(region, "model", client, rate_limiter)
+
+
+def invoke_model(endpoint: BedrockEndpoint):
+    return endpoint.client.invoke_model(modelId=endpoint.model_id, body="{}")
+
+
+def available_tokens(endpoint: BedrockEndpoint) -> float:
+    return endpoint.rate_limiter.store.get(endpoint.rate_limiter.bucket_id)["tokens"]
+
+
+@pytest.mark.parametrize("error", [client_error("ThrottlingException", 429), client_error("InternalFailure", 503)])
+def test_fails_over_on_throttling_and_5xx(error):
+    clock = FakeClock()
+    primary = endpoint("ap-northeast-1", FakeClient(error=error), clock, tokens_per_minute=1000)
+    secondary = endpoint("us-west-2", FakeClient(response="secondary"), clock)
+    router = BedrockRouter([primary, secondary], cooldown_seconds=30, clock=clock)
+
+    result, responded = router.invoke("invoke", invoke_model, tokens=100)
+
+    assert (result, responded) == ("secondary", secondary)
+    assert primary.unavailable_until == clock.now + 30
+    assert router._ordered_endpoints() == [secondary, primary]
+    # 失敗したリクエストで確保したトークンは全て戻す
+    assert available_tokens(primary) == 1000
+
+    clock.now += 30
+    assert router._ordered_endpoints() == [primary, secondary]
+
+
+def test_non_retryable_error_is_raised_without_failover():
+    clock = FakeClock()
+    primary = endpoint("ap-northeast-1", FakeClient(error=client_error("ValidationException", 400)), clock)
+    secondary = endpoint("us-west-2", FakeClient(response="secondary"), clock)
+    router = BedrockRouter([primary, secondary], clock=clock)
+
+    with pytest.raises(ClientError):
+        router.invoke("invoke", invoke_model)
+
+    assert secondary.client.calls == 0
+    assert primary.unavailable_until == 0
+
+
+def test_last_error_is_raised_when_every_endpoint_fails():
+    clock = FakeClock()
+    endpoints = [endpoint(region, FakeClient(error=client_error("ThrottlingException", 429)), clock)
+                 for region in ("ap-northeast-1", "us-west-2")]
+
+    with pytest.raises(ClientError):
+        BedrockRouter(endpoints, clock=clock).invoke("invoke", invoke_model)
+
+    assert [e.client.calls for e in endpoints] == [1, 1]
+
+
+def test_hedge_delay_uses_percentile_after_minimum_samples():
+    clock = FakeClock()
+    primary = endpoint("ap-northeast-1", FakeClient(), clock)
+    router = BedrockRouter([primary], hedge_percentile=95, hedge_default_delay_seconds=60, clock=clock)
+    histogram = primary.latency("invoke")
+
+    for index in range(BedrockRouter.HEDGE_MIN_SAMPLES - 1):
+        histogram.record(0.5 + index * 0.1)
+    assert router.hedge_delay(primary, "invoke") == 60
+
+    histogram.record(10)
+    assert router.hedge_delay(primary, "invoke") == histogram.percentile(95)
+    assert router.hedge_delay(primary, "invoke") < 60
+
+
+def test_hedged_request_wins_and_loser_is_discarded_and_settled():
+    clock = FakeClock()
+    release = threading.Event()
+    primary = endpoint("ap-northeast-1", FakeClient(response="primary", block=release), clock, tokens_per_minute=1000)
+    secondary = endpoint("us-west-2", FakeClient(response="secondary"), clock, tokens_per_minute=1000)
+    for _ in range(BedrockRouter.HEDGE_MIN_SAMPLES):
+        primary.latency("invoke").record(0.05)
+    router = BedrockRouter([primary, secondary], hedge_percentile=95, clock=clock)
+
+    discarded = []
+    settled = threading.Event()
+
+    def discard(result):
+        discarded.append(result)
+
+    def used_tokens(result):
+        settled.set()
+        return 10
+
+    result, responded = router.invoke("invoke", invoke_model, tokens=100, discard=discard, used_tokens=used_tokens)
+
+    assert (result, responded) == ("secondary", secondary)
+    assert primary.client.calls == 1
+    assert discarded == []
+
+    # 採用しなかった応答は、届いた時点で破棄し使用量で精算する
+    release.set()
+    assert settled.wait(5)
+    assert discarded == ["primary"]
+    assert available_tokens(primary) == 1000 - 10
+    # 採用した応答の精算は呼び出し元が行う
+    assert available_tokens(secondary) == 1000 - 100
+
+
+def test_no_hedge_before_delay():
+    clock = FakeClock()
+    primary = endpoint("ap-northeast-1", FakeClient(response="primary"), clock)
+    secondary = endpoint("us-west-2", FakeClient(response="secondary"), clock)
+    router = BedrockRouter([primary, secondary], hedge_default_delay_seconds=60, clock=clock)
+
+    assert router.invoke("invoke", invoke_model) == ("primary", primary)
+    assert secondary.client.calls == 0
+
+
+def test_skips_endpoint_without_capacity():
+    clock = FakeClock()
+    primary = endpoint("ap-northeast-1", FakeClient(response="primary"), clock, requests_per_minute=1)
+    secondary = endpoint("us-west-2", FakeClient(response="secondary"), clock)
+    assert primary.rate_limiter.try_acquire(0) == 0
+
+    result, responded = BedrockRouter([primary, secondary], clock=clock).invoke("invoke", invoke_model)
+
+    assert (result, responded) == ("secondary", secondary)
+    assert primary.client.calls == 0
+
+
+def test_raises_throttling_error_when_every_endpoint_is_out_of_capacity():
+    clock = FakeClock()
+    endpoints = [endpoint(region, FakeClient(response=region), clock, requests_per_minute=1)
+                 for region in ("ap-northeast-1", "us-west-2")]
+    for e in endpoints:
+        assert e.rate_limiter.try_acquire(0) == 0
+    router = BedrockRouter(endpoints, max_wait_seconds=0, clock=clock)
+
+    with pytest.raises(BedrockThrottlingError) as raised:
+        router.invoke("invoke", invoke_model)
+
+    assert raised.value.retry_after > 0
+    assert [e.client.calls for e in endpoints] == [0, 0]
+
+
+def model_response(text: str) -> dict:
+    body = {"content": [{"type": "text", "text": text}], "usage": {"input_tokens": 10, "output_tokens": 5}}
+    return {"body": io.BytesIO(json.dumps(body).encode("utf-8"))}
+
+
+@pytest.mark.parametrize("secondary_model_id, fallback_model_responses", [("model-a", None), ("model-b", 1)])
+def test_fallback_model_response_is_counted(aws, secondary_model_id, fallback_model_responses):
+    client = AWSClients.get_bedrock(endpoints=f"us-east-1/model-a,us-west-2/{secondary_model_id}")
+    primary, secondary = client.endpoints
+    primary.client = FakeClient(error=client_error("ThrottlingException", 429))
+    secondary.client = FakeClient(response=model_response("secondary"))
+    usage = {}
+
+    text, _, _ = client.generate_text(["prompt"], max_tokens=100, usage=usage)
+
+    # 同じモデルの別リージョンへの切り替えは数えない
+    assert (text, usage.get("fallback_model_responses")) == ("secondary", fallback_model_responses)
+
+
+def test_result_from_fallback_model_is_not_cached(aws, monkeypatch):
+    from chalicelib.models.soap_route import SoapRoute
+    from chalicelib.services.handler.voice2soap import Voice2SoapJobHandler
+
+    handler = Voice2SoapJobHandler()
+    soap_json = json.dumps({section: section for section in ("subjective", "objective", "assessment", "plan")})
+    saved = []
+    monkeypatch.setattr(handler, "_save_cached_soap", lambda *args: saved.append(args))
+
+    for fallback_model_responses in (1, 0):
+        def stream_soap_json(prompt, max_tokens, temperature, on_section, usage, bedrock_client):
+            usage.update(output_tokens=5, fallback_model_responses=fallback_model_responses)
+            return soap_json
+
+        monkeypatch.setattr(handler, "_stream_soap_json", stream_soap_json)
+        handler._generate_soap_with_route(SoapRoute.default(), "transcript", 10, None, None, True, None)
+
+    assert len(saved) == 1
+
+
+class FakeStream:
+    """invoke_model_with_response_streamのイベントストリーム"""
+
+    def __init__(self, events: list):
+        self.events = [{"chunk": {"bytes": json.dumps(event).encode("utf-8")}} for event in events]
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStreamClient:
+    def __init__(self, stream: FakeStream):
+        self.stream = stream
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        return {"body": self.stream}
+
+
+@pytest.mark.parametrize("read_chunks, output_tokens", [(2, 4), (3, 30)])
+def test_stream_settles_output_received_before_close(aws, monkeypatch, read_chunks, output_tokens):
+    stream = FakeStream([
+        {"type": "message_start", "message": {"usage": {"input_tokens": 10}}},
+        *({"type": "content_block_delta", "delta": {"text": "abcdefgh"}} for _ in range(2)),
+        {"type": "message_delta", "usage": {"output_tokens": 30}},
+        {"type": "content_block_delta", "delta": {"text": "abcdefgh"}},
+    ])
+    client = AWSClients.get_bedrock(endpoints="us-east-1/model-stream")
+    endpoint = client.endpoints[0]
+    endpoint.client = FakeStreamClient(stream)
+    settled = []
+    monkeypatch.setattr(endpoint.rate_limiter, "settle", lambda reserved, used: settled.append(used))
+
+    chunks = client.stream_text(["prompt"], max_tokens=100)
+    for _ in range(read_chunks):
+        next(chunks)
+    chunks.close()
+
+    # 使用量（message_delta）が届く前に閉じた場合は、受信したテキストの見積もりを出力として精算する
+    assert stream.closed
+    assert settled == [10 + output_tokens]
@@ -0,0 +1,97 @@
+import boto3
+import pytest
+from chalicelib.clients.aws import AWSClients
+from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.models.job import Job
+from chalicelib.repositories.job import JobRepository
+
+
+@pytest.fixture
+def writes(aws, monkeypatch):
+    """DynamoDBへの書き込み（PutItem/UpdateItem）を記録する"""
+    client = AWSClients.get_dynamodb()
+    calls = []
+    for name in ("put_item", "update_item"):
+        original = getattr(client, name)
+
+        def record(*args, __name=name, __original=original, **kwargs):
+            calls.append((__name, kwargs))
+            return __original(*args, **kwargs)
+
+        monkeypatch.setattr(client, name, record)
+    return calls
+
+
+def create_job() -> Job:
+    job = Job(
+        job_type=JobType.VOICE_TO_SOAP,
+        job_status=JobStatus.IN_PROGRESS,
+        total_child_jobs=2,
+        reported_child_job_ids={"c2", "c1"},
+        child_jobs={"c1": {"index": 0, "upload_id": "upload-0", "status": JobStatus.PENDING.value}},
+        payload="{}",
+    )
+    job.save()
+    return job
+
+
+def test_saving_unchanged_item_issues_no_write(writes):
+    job = JobRepository.find(create_job().job_id)
+    writes.clear()
+
+    assert job.changed_attributes() == {}
+    assert job.save() == {}
+    assert writes == []
+
+
+def test_representation_differences_are_not_changes(writes):
+    job = create_job()
+    # 他の書き込み元による数値の表記・文字列セットの順序の違い、NULLの属性
+    boto3.client("dynamodb").update_item(
+        TableName=Job.table_name(),
+        Key={"job_id": {"S": job.job_id}},
+        UpdateExpression="SET total_child_jobs = :total, reported_child_job_ids = :ids, #error = :null",
+        ExpressionAttributeNames={"#error": "error"},
+        ExpressionAttributeValues={":total": {"N": "02"}, ":ids": {"SS": ["c2", "c1"]}, ":null": {"NULL": True}},
+    )
+    loaded = JobRepository.find(job.job_id)
+    writes.clear()
+
+    assert loaded.changed_attributes() == {}
+    loaded.save()
+    assert writes == []
+
+
+def test_saving_changed_item_writes_only_changed_attributes(writes):
+    job = JobRepository.find(create_job().job_id)
+    writes.clear()
+
+    job.job_status = JobStatus.COMPLETED
+    job.save()
+
+    assert [name for name, _ in writes] == ["update_item"]
+    written = set(writes[0][1]["expression_attribute_names"].values())
+    # updated_atは同じ秒のうちは値が変わらない
+    assert written - {"updated_at"} == {"job_status"}
+    assert JobRepository.find(job.job_id).job_status == JobStatus.COMPLETED
+
+    # 保存後は保存した内容が基準になる
+    writes.clear()
+    job.save()
+    assert writes == []
+
+
+def test_removed_attribute_is_written_as_remove(writes):
+    job = JobRepository.find(create_job().job_id)
+    writes.clear()
+
+    job.child_jobs = None
+    job.save()
+
+    assert "REMOVE" in writes[0][1]["update_expression"]
+    assert JobRepository.find(job.job_id).child_jobs is None
+
+
+def test_new_model_is_written_with_put_item(writes):
+    create_job()
+    assert [name for name, _ in writes] == ["put_item"]
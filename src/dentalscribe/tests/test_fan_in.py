@@ -0,0 +1,144 @@
+import json
+import pytest
+from chalicelib.enums.job import JobEventType, JobStatus, JobType
+from chalicelib.models.job import Job
+from chalicelib.repositories.job import JobRepository
+from chalicelib.repositories.job_event import InMemoryJobEventRepository
+from chalicelib.services.fan_in import FanInCoordinator, FanInResult
+from chalicelib.services.job_event import JobEventService
+
+
+def create_parent_job(child_job_ids, already_completed: int = 0) -> Job:
+    """create_voice2soap_jobと同じ集計値・射影を持つ親ジョブを作成"""
+    parent_job = Job(
+        job_type=JobType.VOICE_TO_SOAP,
+        job_status=JobStatus.IN_PROGRESS,
+        total_child_jobs=len(child_job_ids) + already_completed,
+        completed_child_jobs=already_completed,
+        failed_child_jobs=0,
+        finished_child_jobs=already_completed,
+        pending_child_jobs=len(child_job_ids),
+        child_jobs={
+            child_job_id: {"index": index, "upload_id": f"upload-{index}", "status": JobStatus.PENDING.value}
+            for index, child_job_id in enumerate(child_job_ids)
+        },
+        payload=json.dumps({"upload_ids": [f"upload-{index}" for index in range(len(child_job_ids))]}),
+    )
+    parent_job.save()
+    return parent_job
+
+
+def create_child_job(parent_job_id: str) -> Job:
+    child_job = Job(
+        job_type=JobType.TRANSCRIBE,
+        job_status=JobStatus.COMPLETED,
+        parent_job_id=parent_job_id,
+        payload=json.dumps({"parent_job_id": parent_job_id}),
+    )
+    child_job.save()
+    return child_job
+
+
+def test_is_closer_only_when_all_children_finished():
+    assert not FanInResult("p", completed=1, failed=0, total=2).is_closer
+    assert FanInResult("p", completed=1, failed=1, total=2).is_closer
+    assert not FanInResult("p", completed=0, failed=0, total=0).is_closer
+
+
+def test_duplicate_and_out_of_order_reports_are_counted_once(aws):
+    coordinator = FanInCoordinator()
+    parent_job = create_parent_job(["c1", "c2", "c3"])
+
+    reports = [("c3", JobStatus.COMPLETED), ("c3", JobStatus.COMPLETED), ("c1", JobStatus.FAILED),
+               ("c3", JobStatus.FAILED), ("c2", JobStatus.COMPLETED), ("c1", JobStatus.FAILED)]
+    results = [coordinator.report(parent_job.job_id, child_job_id, status) for child_job_id, status in reports]
+
+    # 重複報告（2回目以降）はNone
+    assert [result is not None for result in results] == [True, False, True, False, True, False]
+    assert [result.is_closer for result in results if result] == [False, False, True]
+    assert results[4] == FanInResult(parent_job.job_id, completed=2, failed=1, total=3)
+
+    saved = JobRepository.find(parent_job.job_id)
+    assert (saved.completed_child_jobs, saved.failed_child_jobs, saved.pending_child_jobs) == (2, 1, 0)
+    assert saved.reported_child_job_ids == {"c1", "c2", "c3"}
+    assert {child_job_id: child["status"] for child_job_id, child in saved.child_jobs.items()} == {
+        "c1": JobStatus.FAILED.value, "c2": JobStatus.COMPLETED.value, "c3": JobStatus.COMPLETED.value,
+    }
+
+
+def test_total_includes_already_completed_uploads(aws):
+    coordinator = FanInCoordinator()
+    parent_job = create_parent_job(["c1"], already_completed=2)
+
+    result = coordinator.report(parent_job.job_id, "c1", JobStatus.COMPLETED)
+
+    assert result == FanInResult(parent_job.job_id, completed=3, failed=0, total=3)
+    assert result.is_closer
+
+
+def test_report_for_legacy_parent_without_projection(aws):
+    parent_job = Job(
+        job_type=JobType.VOICE_TO_SOAP,
+        job_status=JobStatus.IN_PROGRESS,
+        total_child_jobs=2,
+        completed_child_jobs=0,
+        failed_child_jobs=0,
+        payload="{}",
+    )
+    parent_job.save()
+    coordinator = FanInCoordinator()
+
+    first = coordinator.report(parent_job.job_id, "c1", JobStatus.COMPLETED)
+    duplicate = coordinator.report(parent_job.job_id, "c1", JobStatus.COMPLETED)
+    last = coordinator.report(parent_job.job_id, "c2", JobStatus.FAILED)
+
+    assert first == FanInResult(parent_job.job_id, completed=1, failed=0, total=2)
+    assert duplicate is None
+    assert last.is_closer and (last.completed, last.failed) == (1, 1)
+    assert JobRepository.find(parent_job.job_id).child_jobs is None
+
+
+def test_report_for_missing_parent(aws):
+    assert FanInCoordinator().report("missing-parent", "c1", JobStatus.COMPLETED) is None
+
+
+def test_exactly_one_closer_starts_soap_generation(aws, job_queue_messages):
+    from chalicelib.services.job import JobService
+
+    service = JobService()
+    events = InMemoryJobEventRepository()
+    service.job_event_service = JobEventService(events)
+
+    parent_job = create_parent_job([])
+    child_jobs = [create_child_job(parent_job.job_id) for _ in range(3)]
+    parent_job.child_jobs = {
+        child_job.job_id: {"index": index, "upload_id": f"upload-{index}", "status": JobStatus.PENDING.value}
+        for index, child_job in enumerate(child_jobs)
+    }
+    parent_job.total_child_jobs = parent_job.pending_child_jobs = len(child_jobs)
+    parent_job.save()
+    events.create(parent_job.job_id)
+
+    # S3イベントの重複配信を想定し、同じ子ジョブの完了を繰り返し報告する
+    for child_job in [child_jobs[1], child_jobs[0], child_jobs[1], child_jobs[2], child_jobs[2], child_jobs[0]]:
+        service._report_transcribe_job_finished(child_job, JobStatus.COMPLETED)
+
+    messages = job_queue_messages()
+    assert messages == [{
+        "job_id": Job.generate_soap_job_id(parent_job.job_id),
+        "job_type": JobType.GENERATE_SOAP.value,
+        "parent_job_id": parent_job.job_id,
+    }]
+    _, published = events.find_since(parent_job.job_id)
+    assert [event.event_type for event in published] == [JobEventType.TRANSCRIPTION_COMPLETED.value] * 3
+    assert [event.data["completed"] for event in published] == [1, 2, 3]
+
+    # クローザーの通知が重複しても、GENERATE_SOAPジョブは作り直さない
+    service._start_soap_generation(parent_job.job_id)
+    assert job_queue_messages() == []
+
+
+@pytest.mark.parametrize("status", [JobStatus.PENDING, JobStatus.IN_PROGRESS])
+def test_report_rejects_non_terminal_status(aws, status):
+    with pytest.raises(ValueError):
+        JobRepository.increment_child_job_count("parent", "child", status)
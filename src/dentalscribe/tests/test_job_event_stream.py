@@ -0,0 +1,148 @@
+import http.client
+import json
+import os
+import threading
+import time
+import jwt
+import pytest
+from chalicelib.constants import JOB_EVENTS_TOKEN_SCOPE
+from chalicelib.enums.job import JobEventType, JobStatus, JobType
+from chalicelib.exceptions import UnauthorizedError
+from chalicelib.models.job import Job
+from chalicelib.repositories.job_event import InMemoryJobEventRepository, JobEventRepository
+from chalicelib.services.job_event import JobEventService
+
+
+@pytest.fixture
+def repository():
+    repository = InMemoryJobEventRepository()
+    repository.create("job-1")
+    return repository
+
+
+@pytest.fixture
+def service(repository):
+    return JobEventService(repository)
+
+
+def issue_token(service: JobEventService, job_id: str = "job-1") -> str:
+    response = service.issue_voice2soap_job_events_token(job_id)
+    assert response.status_code == 200
+    return response.body["token"]
+
+
+def parse_frames(body: str) -> list:
+    """Server-Sent Eventsのフレームを (event, data) のリストにする（retry・コメント行は除く）"""
+    frames = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "event" in fields:
+            frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def test_token_is_bound_to_job(service, repository):
+    repository.create("job-2")
+    token = issue_token(service)
+
+    assert service.get_voice2soap_job_events("job-1", token).status_code == 200
+    for job_id, token_ in (("job-2", token), ("job-1", None), ("job-1", "invalid")):
+        assert service.get_voice2soap_job_events(job_id, token_).status_code == 401
+    assert service.issue_voice2soap_job_events_token("missing").status_code == 400
+
+
+def test_expired_token_is_rejected(service):
+    token = jwt.encode(
+        {"sub": "job-1", "scope": JOB_EVENTS_TOKEN_SCOPE, "exp": int(time.time()) - 1}, os.environ["JWT_SECRET_KEY"], algorithm="HS256"
+    )
+
+    with pytest.raises(UnauthorizedError, match="Token expired"):
+        service.open_voice2soap_job_event_stream("job-1", token)
+
+
+def test_stream_sends_new_events_until_job_finishes(service, repository, monkeypatch):
+    repository.append("job-1", JobEventType.GENERATION_STARTED)
+    pending = [
+        (JobEventType.SOAP_SECTION, {"sections": {"subjective": "主訴"}}),
+        None,
+        (JobEventType.JOB_COMPLETED, {"soap_data": {"subjective": "主訴"}}),
+    ]
+
+    # 確認の間隔ごとにワーカーがイベントを発行する
+    def sleep(seconds):
+        event = pending.pop(0)
+        if event:
+            repository.append("job-1", *event)
+
+    monkeypatch.setattr("chalicelib.services.job_event.time.sleep", sleep)
+    frames = list(service.open_voice2soap_job_event_stream("job-1", issue_token(service)))
+
+    assert frames[0] == "retry: 2000\n\n"
+    assert [event for event, _ in parse_frames("".join(frames))] == ["generation_started", "soap_section", "job_completed"]
+    assert parse_frames(frames[2])[0][1]["sections"] == {"subjective": "主訴"}
+    assert pending == []
+
+
+def test_stream_resumes_after_last_event_id(service, repository):
+    for event_type in (JobEventType.GENERATION_STARTED, JobEventType.SOAP_RESET, JobEventType.JOB_FAILED):
+        repository.append("job-1", event_type)
+
+    frames = list(service.open_voice2soap_job_event_stream("job-1", issue_token(service), "2"))
+
+    assert "id: 3\nevent: job_failed\n" in "".join(frames)
+    assert [event for event, _ in parse_frames("".join(frames))] == ["job_failed"]
+
+
+def test_stream_server_streams_events(service, repository):
+    from job_events_stream import create_server
+
+    repository.append("job-1", JobEventType.JOB_COMPLETED, {"soap_data": {"plan": "再診"}})
+    server = create_server(service, host="127.0.0.1", port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        def get(path: str, headers: dict = None):
+            connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+            connection.request("GET", path, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.getheader("Content-Type"), response.read().decode("utf-8")
+
+        status, content_type, body = get(f"/jobs/voice2soap/job-1/events?token={issue_token(service)}")
+        assert (status, content_type) == (200, "text/event-stream; charset=utf-8")
+        assert [(event, data["soap_data"]) for event, data in parse_frames(body)] == [("job_completed", {"plan": "再診"})]
+
+        status, _, body = get("/jobs/voice2soap/job-1/events?token=invalid")
+        assert (status, json.loads(body)["message"]) == (401, "Invalid token")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_section_events_carry_new_section_content(aws, monkeypatch):
+    from chalicelib.services.handler.voice2soap import Voice2SoapJobHandler
+
+    parent_job = Job(job_type=JobType.VOICE_TO_SOAP, job_status=JobStatus.IN_PROGRESS, payload="{}")
+    parent_job.save()
+    handler = Voice2SoapJobHandler()
+    published = []
+    monkeypatch.setattr(handler.job_event_service, "publish", lambda job_id, event_type, data=None: published.append((event_type, data)))
+
+    published_sections = {}
+    handler._save_partial_soap_data(parent_job.job_id, {"subjective": "S"}, published_sections)
+    handler._save_partial_soap_data(parent_job.job_id, {"subjective": "S", "objective": "O"}, published_sections)
+    handler._reset_partial_soap_data(parent_job.job_id, published_sections)
+    handler._save_partial_soap_data(parent_job.job_id, {"subjective": "S"}, published_sections)
+
+    assert published == [
+        (JobEventType.SOAP_SECTION, {"sections": {"subjective": "S"}}),
+        (JobEventType.SOAP_SECTION, {"sections": {"objective": "O"}}),
+        (JobEventType.SOAP_RESET, None),
+        (JobEventType.SOAP_SECTION, {"sections": {"subjective": "S"}}),
+    ]
+
+
+def test_exists_reads_job_key(aws):
+    job = Job(job_type=JobType.VOICE_TO_SOAP, job_status=JobStatus.PENDING, payload="{}")
+    job.save()
+
+    assert JobEventRepository.exists(job.job_id)
+    assert not JobEventRepository.exists("missing")
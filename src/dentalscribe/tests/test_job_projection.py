@@ -0,0 +1,99 @@
+import pytest
+from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.models.job import Job
+from chalicelib.repositories.job import JobRepository
+
+
+class FakeTranscriptRepository:
+    """読み込んだ子ジョブを記録する文字起こしテキストの代替"""
+
+    def __init__(self):
+        self.read_job_ids = []
+
+    def get_text(self, job_id: str) -> str:
+        self.read_job_ids.append(job_id)
+        return f"text of {job_id}"
+
+
+def create_parent_job(job_status: JobStatus = JobStatus.IN_PROGRESS) -> Job:
+    parent_job = Job(
+        job_type=JobType.VOICE_TO_SOAP,
+        job_status=job_status,
+        total_child_jobs=2,
+        completed_child_jobs=0,
+        failed_child_jobs=0,
+        finished_child_jobs=0,
+        pending_child_jobs=2,
+        child_jobs={
+            "c1": {"index": 0, "upload_id": "upload-0", "status": JobStatus.PENDING.value},
+            "c2": {"index": 1, "upload_id": "upload-1", "status": JobStatus.PENDING.value},
+        },
+        payload="{}",
+    )
+    parent_job.save()
+    return parent_job
+
+
+def child_statuses(job_id: str) -> dict:
+    return {child_job_id: child["status"] for child_job_id, child in JobRepository.find(job_id).child_jobs.items()}
+
+
+@pytest.mark.parametrize("terminal_status", [JobStatus.COMPLETED, JobStatus.FAILED])
+def test_late_projection_update_does_not_overwrite_terminal_status(aws, terminal_status):
+    parent_job = create_parent_job()
+    JobRepository.increment_child_job_count(parent_job.job_id, "c1", terminal_status)
+
+    JobRepository.update_child_job_projection(parent_job.job_id, "c1", JobStatus.IN_PROGRESS)
+
+    assert child_statuses(parent_job.job_id)["c1"] == terminal_status.value
+
+
+def test_projection_update_applies_to_non_terminal_status(aws):
+    parent_job = create_parent_job()
+
+    JobRepository.update_child_job_projection(parent_job.job_id, "c1", JobStatus.IN_PROGRESS)
+    JobRepository.update_child_job_projection(parent_job.job_id, "missing", JobStatus.IN_PROGRESS)
+
+    assert child_statuses(parent_job.job_id) == {"c1": JobStatus.IN_PROGRESS.value, "c2": JobStatus.PENDING.value}
+
+
+def get_job(parent_job: Job, **kwargs):
+    from chalicelib.services.job import JobService
+
+    service = JobService()
+    service.transcript_repository = FakeTranscriptRepository()
+    body = service.get_voice2soap_job(parent_job.job_id, **kwargs).body
+    return body, service.transcript_repository.read_job_ids
+
+
+def test_polling_in_progress_job_reads_no_transcripts(aws):
+    parent_job = create_parent_job()
+    JobRepository.increment_child_job_count(parent_job.job_id, "c1", JobStatus.COMPLETED)
+
+    body, read_job_ids = get_job(parent_job)
+
+    assert read_job_ids == []
+    assert [(child["job_id"], child["status"], child["transcription_text"]) for child in body["child_jobs"]] == [
+        ("c1", JobStatus.COMPLETED.value, ""), ("c2", JobStatus.PENDING.value, ""),
+    ]
+
+
+def test_include_transcripts_reads_completed_children(aws):
+    parent_job = create_parent_job()
+    JobRepository.increment_child_job_count(parent_job.job_id, "c1", JobStatus.COMPLETED)
+
+    body, read_job_ids = get_job(parent_job, include_transcripts=True)
+
+    assert read_job_ids == ["c1"]
+    assert [child["transcription_text"] for child in body["child_jobs"]] == ["text of c1", ""]
+
+
+def test_terminal_job_includes_transcripts(aws):
+    parent_job = create_parent_job(JobStatus.FAILED)
+    JobRepository.increment_child_job_count(parent_job.job_id, "c1", JobStatus.COMPLETED)
+    JobRepository.increment_child_job_count(parent_job.job_id, "c2", JobStatus.FAILED)
+
+    body, read_job_ids = get_job(parent_job)
+
+    assert read_job_ids == ["c1"]
+    assert [child["transcription_text"] for child in body["child_jobs"]] == ["text of c1", ""]
@@ -0,0 +1,57 @@
+import json
+from chalicelib.utils.json_stream import JsonObjectStreamParser
+
+SOAP = {
+    "subjective": "右下の奥歯が「痛い」と訴え {冷たいもの} でしみる",
+    "objective": {"teeth": [46, 47], "note": "打診痛\"あり\", [軽度]"},
+    "assessment": "C2 \\ 歯髄炎の疑い",
+    "plan": ["麻酔", "CR充填"],
+}
+
+
+def feed_by_character(parser: JsonObjectStreamParser, text: str):
+    """1文字ずつ与え、メンバーと、メンバーが届いた時点で受信済みの文字数を返す"""
+    received = []
+    for index, char in enumerate(text):
+        received.extend((key, value, index + 1) for key, value in parser.feed(char))
+    return received
+
+
+def test_object_parser_yields_members_in_order_with_single_character_chunks():
+    body = json.dumps(SOAP, ensure_ascii=False)
+    text = f"SOAPを作成しました。{{これは対象外}}\n###JSON###\n{body}\n###JSON###\n補足"
+    parser = JsonObjectStreamParser("###JSON###")
+
+    received = feed_by_character(parser, text)
+
+    assert [(key, value) for key, value, _ in received] == list(SOAP.items())
+    # 各メンバーは区切り（「,」または「}」）が届いた時点で返す
+    member_ends = [position for _, _, position in received]
+    assert member_ends == sorted(member_ends) and len(set(member_ends)) == len(SOAP)
+    assert member_ends[-1] == text.index(body) + len(body)
+    assert parser.done and parser.closed
+    assert json.loads(parser.object_text) == SOAP
+
+
+def test_object_parser_ignores_input_after_close():
+    parser = JsonObjectStreamParser()
+
+    assert feed_by_character(parser, '{"a": 1}') == [("a", 1, 8)]
+    assert parser.done
+    assert parser.feed('{"b": 2}') == []
+
+
+def test_object_parser_stops_at_closing_delimiter_before_object_closes():
+    parser = JsonObjectStreamParser("###JSON###")
+
+    received = feed_by_character(parser, '###JSON###{"a": "x", "b": "y###JSON###')
+
+    assert [(key, value) for key, value, _ in received] == [("a", "x")]
+    assert parser.done and not parser.closed
+
+
+def test_object_parser_waits_for_delimiter():
+    parser = JsonObjectStreamParser("###JSON###")
+
+    assert feed_by_character(parser, '{"a": 1}') == []
+    assert not parser.done
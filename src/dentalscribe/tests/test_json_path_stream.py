@@ -0,0 +1,64 @@
+import json
+import pytest
+from chalicelib.utils.json_stream import JsonPathStreamReader
+
+
+def one_byte_chunks(document, consumed: list):
+    """1バイトずつのチャンク。読み出したバイト数をconsumedに記録する"""
+    data = json.dumps(document, ensure_ascii=False).encode("utf-8")
+    for index in range(len(data)):
+        consumed.append(index + 1)
+        yield data[index:index + 1]
+
+
+TRANSCRIPT = {
+    "jobName": "job-1",
+    "results": {
+        "language_code": "ja-JP",
+        "transcripts": [{"transcript": "歯が痛いです。\"冷たい\"ものでしみる {右下}"}, {"transcript": "二つ目"}],
+        "items": [{"alternatives": [{"content": "歯", "confidence": "0.99"}], "type": "pronunciation"}] * 50,
+        "speaker_labels": {"speakers": 2},
+    },
+}
+
+
+@pytest.mark.parametrize("path, expected", [
+    (("results", "transcripts", 0, "transcript"), TRANSCRIPT["results"]["transcripts"][0]["transcript"]),
+    (("results", "transcripts", 1, "transcript"), "二つ目"),
+    (("results", "transcripts"), TRANSCRIPT["results"]["transcripts"]),
+    (("results", "items", 49, "alternatives", 0, "confidence"), "0.99"),
+    (("results", "speaker_labels", "speakers"), 2),
+    (("jobName",), "job-1"),
+])
+def test_path_reader_with_single_byte_chunks(path, expected):
+    assert JsonPathStreamReader(one_byte_chunks(TRANSCRIPT, [])).read(path) == expected
+
+
+@pytest.mark.parametrize("path", [
+    ("results", "missing"),
+    ("results", "transcripts", 2, "transcript"),
+    ("results", "language_code", "nested"),
+    ("results", "transcripts", "transcript"),
+])
+def test_path_reader_returns_default_for_missing_path(path):
+    assert JsonPathStreamReader(one_byte_chunks(TRANSCRIPT, [])).read(path, default="") == ""
+
+
+def test_path_reader_stops_reading_after_value():
+    consumed = []
+    data = json.dumps(TRANSCRIPT, ensure_ascii=False).encode("utf-8")
+
+    text = JsonPathStreamReader(one_byte_chunks(TRANSCRIPT, consumed)).read(("results", "transcripts", 0, "transcript"))
+
+    assert text == TRANSCRIPT["results"]["transcripts"][0]["transcript"]
+    # itemsより前で読み終え、以降のチャンクは読まない
+    assert consumed[-1] < data.index(b'"items"')
+
+
+def test_path_reader_rejects_truncated_json():
+    data = json.dumps(TRANSCRIPT, ensure_ascii=False).encode("utf-8")
+    truncated = data[:data.index("二つ目".encode("utf-8")) + 2]
+    reader = JsonPathStreamReader(truncated[index:index + 1] for index in range(len(truncated)))
+
+    with pytest.raises(ValueError):
+        reader.read(("results", "transcripts", 1, "transcript"))
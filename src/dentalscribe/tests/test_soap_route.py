@@ -0,0 +1,43 @@
+from chalicelib.clients.aws import AWSClients
+from chalicelib.clients.aws.bedrock_router import BedrockEndpoint
+from chalicelib.models.soap_route import SoapRoute
+
+SONNET = "anthropic.claude-sonnet-4-5-20250929-v1:0"
+HAIKU = "anthropic.claude-haiku-4-5-20251001-v1:0"
+
+
+def test_tier_targets_cover_default_regions_then_fall_back_to_default_models():
+    default_targets = [("ap-northeast-1", f"jp.{SONNET}"), ("us-west-2", f"us.{SONNET}")]
+
+    assert BedrockEndpoint.tier_targets(f"jp.{HAIKU}", default_targets) == [
+        ("ap-northeast-1", f"jp.{HAIKU}"),
+        ("us-west-2", f"us.{HAIKU}"),
+        ("ap-northeast-1", f"jp.{SONNET}"),
+        ("us-west-2", f"us.{SONNET}"),
+    ]
+
+
+def test_tier_targets_keep_model_id_for_regional_default():
+    default_targets = [("us-east-1", SONNET)]
+
+    assert BedrockEndpoint.tier_targets(f"us.{HAIKU}", default_targets) == [("us-east-1", f"us.{HAIKU}"), ("us-east-1", SONNET)]
+    # 既定のモデルと同じ呼び出し先は重複させない
+    assert BedrockEndpoint.tier_targets(SONNET, default_targets) == [("us-east-1", SONNET)]
+
+
+def endpoint_names(route: SoapRoute) -> list:
+    client = AWSClients.get_bedrock(route.model_id, route.endpoints)
+    assert client.router.endpoints is client.endpoints
+    return [endpoint.name for endpoint in client.endpoints]
+
+
+def test_routed_clients_have_alternative_endpoints():
+    routes = SoapRoute.parse_rules(
+        '[{"max_input_tokens": 4000, "model_id": "us.%s", "max_tokens": 2048},'
+        ' {"max_input_tokens": 8000, "endpoints": "us-east-1/us.%s,us-west-2/us.%s"}]' % (HAIKU, SONNET, SONNET)
+    )
+
+    assert endpoint_names(routes[0]) == [f"us-east-1/us.{HAIKU}", "us-east-1/anthropic.claude-test"]
+    assert endpoint_names(routes[1]) == [f"us-east-1/us.{SONNET}", f"us-west-2/us.{SONNET}"]
+    assert routes[-1].uses_default_endpoints
+    assert AWSClients.get_bedrock(routes[-1].model_id, routes[-1].endpoints) is AWSClients.get_bedrock()
@@ -0,0 +1,124 @@
+import json
+import pytest
+from chalicelib.clients.aws import AWSClients
+from chalicelib.enums.job import JobStatus, JobType
+from chalicelib.exceptions import SQSError
+from chalicelib.models.job import Job
+from chalicelib.repositories.job import JobRepository
+from chalicelib.repositories.job_event import InMemoryJobEventRepository
+from chalicelib.services.job_event import JobEventService
+
+
+def generate_soap_message(parent_job_id: str) -> dict:
+    return {
+        "job_id": Job.generate_soap_job_id(parent_job_id),
+        "job_type": JobType.GENERATE_SOAP.value,
+        "parent_job_id": parent_job_id,
+    }
+
+
+def test_generate_soap_job_id_is_deterministic(aws):
+    parent_job_id = "parent-1"
+    assert Job.generate_soap_job_id(parent_job_id) == Job.generate_soap_job_id(parent_job_id)
+    assert Job.generate_soap_job_id(parent_job_id) != Job.generate_soap_job_id("parent-2")
+
+    def generate_soap_job() -> Job:
+        return Job(
+            job_id=Job.generate_soap_job_id(parent_job_id),
+            job_type=JobType.GENERATE_SOAP,
+            job_status=JobStatus.PENDING,
+            parent_job_id=parent_job_id,
+            payload=json.dumps({"parent_job_id": parent_job_id}),
+        )
+
+    assert JobRepository.create_if_not_exists(generate_soap_job())
+    assert not JobRepository.create_if_not_exists(generate_soap_job())
+
+
+@pytest.fixture
+def service():
+    from chalicelib.services.job import JobService
+
+    service = JobService()
+    service.job_event_service = JobEventService(InMemoryJobEventRepository())
+    return service
+
+
+@pytest.fixture
+def failing_send(monkeypatch):
+    """SQSのsend_messageを指定回数だけ失敗させる"""
+    client = AWSClients.get_sqs()
+    original = client.send_message
+    failures = {"remaining": 0}
+
+    def send_message(*args, **kwargs):
+        if failures["remaining"] > 0:
+            failures["remaining"] -= 1
+            raise SQSError("Failed to send message")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(client, "send_message", send_message)
+    return failures
+
+
+def create_job_tree(child_count: int):
+    parent_job = Job(job_type=JobType.VOICE_TO_SOAP, job_status=JobStatus.IN_PROGRESS, payload="{}")
+    child_jobs = [
+        Job(job_type=JobType.TRANSCRIBE, job_status=JobStatus.COMPLETED, parent_job_id=parent_job.job_id, payload="{}")
+        for _ in range(child_count)
+    ]
+    parent_job.total_child_jobs = parent_job.pending_child_jobs = child_count
+    parent_job.completed_child_jobs = parent_job.failed_child_jobs = parent_job.finished_child_jobs = 0
+    parent_job.child_jobs = {
+        child_job.job_id: {"index": index, "upload_id": f"upload-{index}", "status": JobStatus.PENDING.value}
+        for index, child_job in enumerate(child_jobs)
+    }
+    for job in [parent_job, *child_jobs]:
+        job.save()
+    return parent_job, child_jobs
+
+
+def test_claimed_job_is_resent_after_send_failure(aws, job_queue_messages, service, failing_send):
+    parent_job, child_jobs = create_job_tree(2)
+    service._report_transcribe_job_finished(child_jobs[0], JobStatus.COMPLETED)
+
+    # クローザーが作成（条件付き書き込み）の後の送信に失敗する
+    failing_send["remaining"] = 1
+    with pytest.raises(SQSError):
+        service._report_transcribe_job_finished(child_jobs[1], JobStatus.COMPLETED)
+
+    claimed = JobRepository.find(Job.generate_soap_job_id(parent_job.job_id))
+    assert claimed.job_status == JobStatus.PENDING and claimed.enqueued_at is None
+    assert job_queue_messages() == []
+
+    # 送信の失敗で再実行された完了通知は重複報告になるが、未送信のジョブを送信し直す
+    service._report_transcribe_job_finished(child_jobs[1], JobStatus.COMPLETED)
+
+    assert job_queue_messages() == [generate_soap_message(parent_job.job_id)]
+    assert JobRepository.find(claimed.job_id).enqueued_at is not None
+
+    # 送信済みの場合は、重複報告やクローザーの通知が重なっても送信しない
+    service._report_transcribe_job_finished(child_jobs[0], JobStatus.COMPLETED)
+    service._start_soap_generation(parent_job.job_id)
+    assert job_queue_messages() == []
+
+
+def test_duplicate_report_before_closer_sends_nothing(aws, job_queue_messages, service):
+    parent_job, child_jobs = create_job_tree(2)
+
+    service._report_transcribe_job_finished(child_jobs[0], JobStatus.COMPLETED)
+    service._report_transcribe_job_finished(child_jobs[0], JobStatus.COMPLETED)
+
+    assert job_queue_messages() == []
+    assert JobRepository.find(Job.generate_soap_job_id(parent_job.job_id)) is None
+
+
+def test_started_job_is_not_resent(aws, job_queue_messages, service):
+    parent_job, child_jobs = create_job_tree(1)
+    service._report_transcribe_job_finished(child_jobs[0], JobStatus.COMPLETED)
+    assert job_queue_messages() == [generate_soap_message(parent_job.job_id)]
+
+    # 処理を開始したジョブ（スロットリングでPENDINGに戻ったものを含め、送信済み）は送信し直さない
+    JobRepository.update_status(Job.generate_soap_job_id(parent_job.job_id), JobStatus.PENDING)
+    service._report_transcribe_job_finished(child_jobs[0], JobStatus.COMPLETED)
+    assert job_queue_messages() == []
@@ -0,0 +1,89 @@
+import uuid
+import boto3
+import pytest
+from chalicelib.constants import TRANSCRIPTION_SOURCE_KEY_PREFIX
+from chalicelib.enums.upload import UploadStatus
+from chalicelib.exceptions import ValidationError
+from chalicelib.models.upload import Upload
+from chalicelib.repositories.upload import UploadRepository
+
+
+@pytest.fixture
+def service(aws):
+    from chalicelib.services.storage import StorageService
+
+    return StorageService()
+
+
+def new_upload_id() -> str:
+    return f"upload-{uuid.uuid4()}"
+
+
+def put_object(key: str, body: bytes = b"audio") -> None:
+    boto3.client("s3").put_object(Bucket="test-bucket", Key=key, Body=body, ContentType="audio/mpeg")
+
+
+def issue_upload(upload_id: str) -> Upload:
+    upload = Upload(
+        upload_id=upload_id,
+        s3_key=f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}.mp3",
+        upload_status=UploadStatus.ISSUED,
+        content_type="audio/mpeg",
+    )
+    upload.save()
+    return upload
+
+
+def test_issued_upload_without_object_is_rejected(service):
+    upload_id = new_upload_id()
+    issue_upload(upload_id)
+
+    with pytest.raises(ValidationError, match="Upload not completed"):
+        service.resolve_upload(upload_id, UploadRepository.find(upload_id))
+
+    assert UploadRepository.find(upload_id).upload_status == UploadStatus.ISSUED
+
+
+def test_issued_upload_with_object_is_confirmed(service):
+    upload_id = new_upload_id()
+    upload = issue_upload(upload_id)
+    put_object(upload.s3_key, b"12345")
+
+    resolved = service.resolve_upload(upload_id, UploadRepository.find(upload_id))
+
+    assert (resolved.upload_status, resolved.size) == (UploadStatus.STORED, 5)
+    assert UploadRepository.find(upload_id).upload_status == UploadStatus.STORED
+
+
+def test_unregistered_upload_is_found_by_prefix_and_registered(service):
+    upload_id = new_upload_id()
+    key = f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}.mp3"
+    put_object(key)
+    # upload_idを接頭辞に持つ別のアップロードは対象にしない
+    put_object(f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}0.mp3")
+
+    resolved = service.resolve_upload(upload_id, None)
+
+    assert (resolved.s3_key, resolved.upload_status, resolved.content_type) == (key, UploadStatus.STORED, "audio/mpeg")
+    registered = UploadRepository.find(upload_id)
+    assert (registered.s3_key, registered.upload_status) == (key, UploadStatus.STORED)
+
+
+def test_missing_upload_is_rejected(service):
+    upload_id = new_upload_id()
+    put_object(f"{TRANSCRIPTION_SOURCE_KEY_PREFIX}{upload_id}0.mp3")
+
+    with pytest.raises(ValidationError, match="Upload not found"):
+        service.resolve_upload(upload_id, None)
+
+    assert UploadRepository.find(upload_id) is None
+
+
+def test_transcribe_job_requires_stored_upload(aws):
+    from chalicelib.services.job import JobService
+
+    upload_id = new_upload_id()
+    issue_upload(upload_id)
+
+    with pytest.raises(ValidationError, match="Upload not completed"):
+        JobService()._prepare_transcribe_job_for_upload(upload_id, UploadRepository.find(upload_id))
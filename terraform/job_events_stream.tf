@@ -0,0 +1,79 @@
+# ジョブの進捗イベントのストリーミング配信（Server-Sent Events）
+# API Gateway（REST）はレスポンスをバッファリングするため、関数URL（RESPONSE_STREAM）のLambdaで配信する。
+# イメージは infra/job_events_stream/Dockerfile でビルドし、ECRにpushしたものを指定する。
+
+data "aws_caller_identity" "current" {}
+
+resource "aws_iam_role" "job_events_stream" {
+  name = "${var.app_name}-${var.environment}-job-events-stream"
+
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect    = "Allow"
+      Principal = { Service = "lambda.amazonaws.com" }
+      Action    = "sts:AssumeRole"
+    }]
+  })
+
+  tags = {
+    Name        = "${var.app_name}-${var.environment}-job-events-stream"
+    Environment = var.environment
+  }
+}
+
+resource "aws_iam_role_policy_attachment" "job_events_stream_logs" {
+  role       = aws_iam_role.job_events_stream.name
+  policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+}
+
+# 親ジョブのイベントの読み込みのみ
+resource "aws_iam_role_policy" "job_events_stream_dynamodb" {
+  name = "job-events-read"
+  role = aws_iam_role.job_events_stream.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect   = "Allow"
+      Action   = ["dynamodb:GetItem"]
+      Resource = "arn:aws:dynamodb:${var.aws_region}:${data.aws_caller_identity.current.account_id}:table/${var.dynamodb_table_name}"
+    }]
+  })
+}
+
+resource "aws_lambda_function" "job_events_stream" {
+  function_name = "${var.app_name}-${var.environment}-job-events-stream"
+  role          = aws_iam_role.job_events_stream.arn
+  package_type  = "Image"
+  image_uri     = var.job_events_stream_image_uri
+  memory_size   = 256
+  # JOB_EVENTS_STREAM_SECONDS（840秒）で接続を閉じ、クライアントに再接続させる
+  timeout = 900
+
+  environment {
+    # Chaliceのステージ（.chalice/config.json）と同じ環境変数。JWT_SECRET_KEYはevents-tokenのAPIと同じ値にする
+    variables = merge(var.job_events_stream_environment, {
+      JWT_SECRET_KEY = var.jwt_secret_key
+    })
+  }
+
+  tags = {
+    Name        = "${var.app_name}-${var.environment}-job-events-stream"
+    Environment = var.environment
+  }
+}
+
+# EventSourceはヘッダーを送れないため、認証はクエリパラメータのトークンでアプリが行う
+resource "aws_lambda_function_url" "job_events_stream" {
+  function_name      = aws_lambda_function.job_events_stream.function_name
+  authorization_type = "NONE"
+  invoke_mode        = "RESPONSE_STREAM"
+
+  cors {
+    allow_origins = var.job_events_stream_allow_origins
+    allow_methods = ["GET"]
+    allow_headers = ["last-event-id"]
+    max_age       = 3600
+  }
+}
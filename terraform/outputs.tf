@@ -20,3 +20,8 @@ output "alarm_names" {
     aws_cloudwatch_metric_alarm.api_gateway_latency.alarm_name,
   ]
 }
+
+output "job_events_stream_url" {
+  description = "Function URL of the job event stream (set as JOB_EVENTS_STREAM_URL of the Chalice stage)"
+  value       = aws_lambda_function_url.job_events_stream.function_url
+}
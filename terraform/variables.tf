@@ -68,3 +68,25 @@ variable "dlq_message_threshold" {
   type        = number
   default     = 1
 }
+
+variable "job_events_stream_image_uri" {
+  description = "ECR image URI of the job event stream Lambda (infra/job_events_stream/Dockerfile)"
+  type        = string
+}
+
+variable "job_events_stream_environment" {
+  description = "Environment variables of the job event stream Lambda (same as the Chalice stage)"
+  type        = map(string)
+}
+
+variable "jwt_secret_key" {
+  description = "Secret key for job event tokens (same as JWT_SECRET_KEY of the Chalice stage)"
+  type        = string
+  sensitive   = true
+}
+
+variable "job_events_stream_allow_origins" {
+  description = "Origins allowed to subscribe to the job event stream"
+  type        = list(string)
+  default     = ["*"]
+}